@@ -0,0 +1,245 @@
+"""阻塞版本 vs zmq.asyncio 版本：并发连接数与延迟
+
+以 req_rep 为例，每个客户端会话一个 REQ 套接字，一问一答发送 requests 个请求，服务器每个请求模拟 service_ms 的 IO 等待：
+- blocking：每个会话一个线程（阻塞的 REQ），服务器是 server.py 那样的 REP 循环，一次只处理一个请求
+- asyncio：所有会话都是同一个线程里的 asyncio 任务，服务器是 async_server.py 那样的 ROUTER + 每个请求一个任务
+
+服务器运行在独立进程中，客户端运行在主进程中。对每个并发会话数统计总耗时、吞吐量、延迟分位数，
+以及客户端进程的线程数和内存（VmRSS）增量，用来比较两种模型能撑起多少并发连接。
+
+    python benchmark/async_bench.py --clients 1,10,100,1000 --output async.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import multiprocessing
+
+import numpy as np
+import zmq
+import zmq.asyncio
+
+from zmq_bench import environment_info, parse_list
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+MODES = ["blocking", "asyncio"]
+
+# 客户端超过这个时间收不到响应就认为测试失败
+RECV_TIMEOUT_MS = 60000
+
+# ---------------------------------------------------------------- 服务器进程
+
+def blocking_server(config, endpoints, service_ms):
+    """REP 循环：收到请求 -> 等待 service_ms -> 响应，一次只处理一个"""
+    context = config.context()
+    socket = context.socket(zmq.REP)
+    socket.bind("tcp://127.0.0.1:*")
+    endpoints.put(socket.getsockopt_string(zmq.LAST_ENDPOINT))
+    while True:
+        message = socket.recv()
+        time.sleep(service_ms / 1000)
+        socket.send(message)
+
+async def async_serve(config, endpoints, service_ms):
+    context = config.context(zmq.asyncio.Context)
+    socket = context.socket(zmq.ROUTER)
+    socket.bind("tcp://127.0.0.1:*")
+    endpoints.put(socket.getsockopt_string(zmq.LAST_ENDPOINT))
+    tasks = set()
+    
+    async def handle(frames):
+        await asyncio.sleep(service_ms / 1000)
+        await socket.send_multipart(frames)
+    
+    while True:
+        task = asyncio.create_task(handle(await socket.recv_multipart()))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+def async_server(config, endpoints, service_ms):
+    """ROUTER + 每个请求一个 asyncio 任务，请求之间互不等待"""
+    asyncio.run(async_serve(config, endpoints, service_ms))
+
+SERVERS = {"blocking": blocking_server, "asyncio": async_server}
+
+# ---------------------------------------------------------------- 客户端
+
+def blocking_conversation(context, endpoint, requests, start, latencies, errors):
+    socket = context.socket(zmq.REQ)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.setsockopt(zmq.RCVTIMEO, RECV_TIMEOUT_MS)
+    socket.connect(endpoint)
+    start.wait()
+    try:
+        for i in range(requests):
+            t0 = time.perf_counter()
+            socket.send(b"x")
+            socket.recv()
+            latencies.append(time.perf_counter() - t0)
+    except zmq.Again:
+        errors.append("超时")
+    finally:
+        socket.close()
+
+def run_blocking_clients(config, endpoint, clients, requests, sampler):
+    """每个会话一个线程；所有线程都创建好套接字后同时开始"""
+    context = config.context()
+    context.set(zmq.MAX_SOCKETS, max(context.get(zmq.MAX_SOCKETS), clients + 16))
+    latencies, errors = [], []
+    start = threading.Event()
+    threads = [threading.Thread(target=blocking_conversation,
+                                args=(context, endpoint, requests, start, latencies, errors))
+               for _ in range(clients)]
+    for t in threads:
+        t.start()
+    sampler.sample()
+    begin = time.perf_counter()
+    start.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - begin
+    context.term()
+    return latencies, errors, elapsed
+
+async def async_conversation(context, endpoint, requests, start, latencies, errors):
+    socket = context.socket(zmq.REQ)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(endpoint)
+    await start.wait()
+    try:
+        for i in range(requests):
+            t0 = time.perf_counter()
+            await socket.send(b"x")
+            await asyncio.wait_for(socket.recv(), RECV_TIMEOUT_MS / 1000)
+            latencies.append(time.perf_counter() - t0)
+    except asyncio.TimeoutError:
+        errors.append("超时")
+    finally:
+        socket.close()
+
+async def async_clients(config, endpoint, clients, requests, sampler):
+    context = config.context(zmq.asyncio.Context)
+    context.set(zmq.MAX_SOCKETS, max(context.get(zmq.MAX_SOCKETS), clients + 16))
+    latencies, errors = [], []
+    start = asyncio.Event()
+    tasks = [asyncio.create_task(async_conversation(context, endpoint, requests, start, latencies, errors))
+             for _ in range(clients)]
+    # 让所有会话先创建好套接字
+    await asyncio.sleep(0)
+    sampler.sample()
+    begin = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - begin
+    context.term()
+    return latencies, errors, elapsed
+
+def run_async_clients(config, endpoint, clients, requests, sampler):
+    """所有会话都是同一个线程里的 asyncio 任务"""
+    return asyncio.run(async_clients(config, endpoint, clients, requests, sampler))
+
+CLIENTS = {"blocking": run_blocking_clients, "asyncio": run_async_clients}
+
+# ---------------------------------------------------------------- 测量
+
+def rss_kb():
+    """当前进程的常驻内存（KB），不是 Linux 时返回 None"""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+class ResourceSampler:
+    """记录会话全部建立、开始发请求之前的线程数和内存增量"""
+    
+    def __init__(self):
+        self.baseline = rss_kb()
+        self.threads = 0
+        self.rss_delta_kb = None
+    
+    def sample(self):
+        self.threads = threading.active_count()
+        rss = rss_kb()
+        if rss is not None and self.baseline is not None:
+            self.rss_delta_kb = rss - self.baseline
+
+def run_case(config, mode, clients, args):
+    mp = multiprocessing.get_context("spawn")
+    endpoints = mp.Queue()
+    server = mp.Process(target=SERVERS[mode], args=(config, endpoints, args.service_ms), daemon=True)
+    server.start()
+    try:
+        endpoint = endpoints.get(timeout=30)
+        sampler = ResourceSampler()
+        latencies, errors, elapsed = CLIENTS[mode](config, endpoint, clients, args.requests, sampler)
+    finally:
+        server.terminate()
+        server.join()
+    
+    us = np.array(latencies) * 1e6
+    p50, p99 = np.percentile(us, [50, 99]) if len(us) else (0.0, 0.0)
+    return {
+        "mode": mode,
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_sec": elapsed,
+        "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {"p50": p50 / 1000, "p99": p99 / 1000, "max": us.max() / 1000 if len(us) else 0.0},
+        "threads": sampler.threads,
+        "rss_delta_kb": sampler.rss_delta_kb,
+    }
+
+def print_result(r):
+    l = r["latency_ms"]
+    rss = f"{r['rss_delta_kb'] / 1024:.1f}" if r["rss_delta_kb"] is not None else "-"
+    errors = f"  失败 {r['errors']}" if r["errors"] else ""
+    print(f"{r['mode']:<10}{r['clients']:>8}{r['requests_per_sec']:>12,.0f}"
+          f"{l['p50']:>10.1f}{l['p99']:>10.1f}{l['max']:>10.1f}{r['threads']:>8}{rss:>10}{errors}")
+
+def main():
+    parser = argparse.ArgumentParser(description="阻塞 vs zmq.asyncio：并发连接数与延迟")
+    parser.add_argument("--modes", default=",".join(MODES), help="逗号分隔的模式")
+    parser.add_argument("--clients", default="1,10,100,1000", help="逗号分隔的并发会话数")
+    parser.add_argument("--requests", type=int, default=3, help="每个会话一问一答的请求数")
+    parser.add_argument("--service-ms", type=float, default=2.0, help="服务器处理每个请求的模拟 IO 等待（毫秒）")
+    parser.add_argument("--output", help="JSON 报告输出路径，默认只打印到终端")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    modes = parse_list(args.modes)
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"未知模式: {mode}")
+    config = ZmqConfig.from_args(args)
+    
+    print(f"{'模式':<8}{'会话数':>5}{'请求/秒':>9}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}{'线程数':>5}{'内存(MB)':>6}")
+    results = []
+    for clients in parse_list(args.clients, int):
+        for mode in modes:
+            result = run_case(config, mode, clients, args)
+            print_result(result)
+            results.append(result)
+    
+    report = {
+        "environment": environment_info(),
+        "config": {"requests": args.requests, "service_ms": args.service_ms, "zmq": config.effective_dict()},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已保存到 {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
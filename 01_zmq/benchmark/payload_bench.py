@@ -0,0 +1,275 @@
+"""大负载吞吐量基准测试：复制收发 vs 零拷贝收发
+
+负载大小从 1KB 到 64MB，在 inproc / ipc / tcp 上比较两种收发方式的 MB/s：
+- copy：send(缓冲区) 把负载复制进 libzmq 的消息，recv() 再复制成 bytes
+- zero_copy：copy=False、track=True 发送 NumPy 缓冲区，发送完成后才复用（zero_copy.BufferPool）；
+  recv(copy=False) 直接读取 zmq.Frame 的内存
+接收端除了检查序号，还会在负载的每一页读一个字节（zero_copy.touch_pages），两种方式都要真正访问收到的内存，
+inproc 零拷贝的结果不只是指针传递的速度。
+
+两种通信模式：
+- push_pull：PUSH 单向连续发送 count 条，接收端收到最后一条时停止计时
+- router_dealer：DEALER 保持 window 个在途请求，ROUTER 回送端原样发回，MB/s 按单程负载计算
+
+两端都是同一进程里的线程（共享 Context）。发送端在每个缓冲区开头写入序号，接收端逐条检查，
+零拷贝发送时如果缓冲区在发送完成前被改写，会体现为序号不符。
+每种大小的消息条数按 --total-mb 计算；套接字高水位按 --queue-mb 限制，避免 64MB 的消息在队列里堆积占满内存。
+
+    python benchmark/payload_bench.py --output payload.json
+    python benchmark/payload_bench.py --patterns push_pull --transports tcp --sizes 64K,1M,16M
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import tempfile
+import threading
+
+import zmq
+
+from zmq_bench import environment_info, parse_list
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+from zero_copy import PAGE_SIZE, STAMP_SIZE, BufferPool, stamp, read_stamp, touch_pages, frame_buffer
+
+PATTERNS = {
+    "push_pull": (zmq.PUSH, zmq.PULL),
+    "router_dealer": (zmq.DEALER, zmq.ROUTER),
+}
+TRANSPORTS = ["inproc", "ipc", "tcp"]
+MODES = ["copy", "zero_copy"]
+UNITS = {"K": 1 << 10, "M": 1 << 20}
+
+# 接收端超过这个时间没有收到消息就认为测试失败
+RECV_TIMEOUT_MS = 10000
+
+def parse_size(text):
+    """"64K"、"16M" 或字节数"""
+    text = text.strip().upper()
+    if text[-1] in UNITS:
+        return int(text[:-1]) * UNITS[text[-1]]
+    return int(text)
+
+def format_size(size):
+    for unit in ("M", "K"):
+        if size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return str(size)
+
+def bind_address(transport):
+    if transport == "inproc":
+        return f"inproc://payload-{uuid.uuid4().hex}"
+    if transport == "ipc":
+        return f"ipc://{tempfile.gettempdir()}/zmq-payload-{uuid.uuid4().hex}.ipc"
+    return "tcp://127.0.0.1:*"
+
+def queue_depth(size, queue_mb):
+    """每个套接字最多排队的消息数：排队的负载不超过 queue_mb，至少 2 条"""
+    return max(2, min(1000, queue_mb * UNITS["M"] // size))
+
+def open_sockets(context, pattern, transport, depth):
+    """返回 (发送端, 接收端)：接收端绑定，发送端连接"""
+    sender_type, receiver_type = PATTERNS[pattern]
+    receiver = context.socket(receiver_type)
+    sender = context.socket(sender_type)
+    for sock in (sender, receiver):
+        sock.setsockopt(zmq.LINGER, 0)
+        sock.setsockopt(zmq.SNDHWM, depth)
+        sock.setsockopt(zmq.RCVHWM, depth)
+        sock.setsockopt(zmq.RCVTIMEO, RECV_TIMEOUT_MS)
+    receiver.bind(bind_address(transport))
+    sender.connect(receiver.getsockopt_string(zmq.LAST_ENDPOINT))
+    return sender, receiver
+
+def send_payload(sock, pool, seq, zero_copy):
+    """取一个缓冲区写入序号后发送；零拷贝时记录 tracker，缓冲区发送完成后才会被再次取出"""
+    index, payload = pool.acquire()
+    stamp(payload, seq)
+    if zero_copy:
+        pool.track(index, sock.send(payload, copy=False, track=True))
+    else:
+        sock.send(payload)
+
+def recv_payload(sock, zero_copy):
+    """接收一条消息，每页读一个字节后返回负载的 memoryview；零拷贝时直接指向 libzmq 的消息内存"""
+    payload = frame_buffer(sock.recv(copy=not zero_copy))
+    touch_pages(payload)
+    return payload
+
+# ---------------------------------------------------------------- push_pull
+
+def pull_receiver(sock, count, zero_copy, ready, result):
+    sock.recv()
+    ready.set()
+    mismatched = 0
+    try:
+        for seq in range(count):
+            if read_stamp(recv_payload(sock, zero_copy)) != seq:
+                mismatched += 1
+        result["end"] = time.perf_counter()
+    except zmq.Again:
+        result["error"] = "接收超时"
+    result["mismatched"] = mismatched
+
+def run_push_pull(sender, receiver, count, pool, zero_copy, window):
+    ready = threading.Event()
+    result = {}
+    thread = threading.Thread(target=pull_receiver, args=(receiver, count, zero_copy, ready, result))
+    thread.start()
+    
+    # 探测消息送达后再开始计时，连接建立的时间不计入
+    sender.send(b"")
+    ready.wait()
+    start = time.perf_counter()
+    for seq in range(count):
+        send_payload(sender, pool, seq, zero_copy)
+    thread.join()
+    
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result["end"] - start, result["mismatched"]
+
+# ---------------------------------------------------------------- router_dealer
+
+def echo_peer(sock, count, zero_copy):
+    """ROUTER 回送端：[身份, 负载] 原样发回；零拷贝时发回的就是收到的 Frame"""
+    copy = not zero_copy
+    try:
+        for _ in range(count + 1):
+            sock.send_multipart(sock.recv_multipart(copy=copy), copy=copy)
+    except zmq.Again:
+        pass
+
+def run_router_dealer(sender, receiver, count, pool, zero_copy, window):
+    thread = threading.Thread(target=echo_peer, args=(receiver, count, zero_copy))
+    thread.start()
+    
+    sender.send(b"")
+    sender.recv()
+    start = time.perf_counter()
+    sent = received = mismatched = 0
+    while received < count:
+        while sent - received < window and sent < count:
+            send_payload(sender, pool, sent, zero_copy)
+            sent += 1
+        if read_stamp(recv_payload(sender, zero_copy)) != received:
+            mismatched += 1
+        received += 1
+    elapsed = time.perf_counter() - start
+    thread.join()
+    return elapsed, mismatched
+
+RUNNERS = {"push_pull": run_push_pull, "router_dealer": run_router_dealer}
+
+# ---------------------------------------------------------------- 测量
+
+def message_count(size, args):
+    return max(args.min_count, min(args.max_count, args.total_mb * UNITS["M"] // size))
+
+def run_case(context, pattern, transport, size, mode, args):
+    count = message_count(size, args)
+    depth = queue_depth(size, args.queue_mb)
+    if pattern == "router_dealer":
+        # ROUTER 达到高水位时直接丢弃消息，高水位不能小于在途请求数
+        depth = max(depth, args.window)
+    zero_copy = mode == "zero_copy"
+    # 零拷贝时缓冲区在发送完成前不能复用，缓冲区要比最多在途的消息多几个，发送端才不会总在等待
+    in_flight = depth * 2 if pattern == "push_pull" else args.window
+    pool = BufferPool(size, min(in_flight, args.max_buffers) + 2)
+    
+    sender, receiver = open_sockets(context, pattern, transport, depth)
+    try:
+        elapsed, mismatched = RUNNERS[pattern](sender, receiver, count, pool, zero_copy, args.window)
+        pool.wait_all()
+    finally:
+        sender.close()
+        receiver.close()
+    
+    return {
+        "pattern": pattern,
+        "transport": transport,
+        "size": size,
+        "mode": mode,
+        "count": count,
+        "hwm": depth,
+        "buffers": len(pool.buffers),
+        "elapsed_sec": elapsed,
+        "msgs_per_sec": count / elapsed,
+        "mb_per_sec": count * size / elapsed / 1e6,
+        "buffer_waits": pool.waits,
+        "mismatched": mismatched,
+    }
+
+def print_row(pattern, transport, size, results):
+    copy, zero = results["copy"], results["zero_copy"]
+    speedup = zero["mb_per_sec"] / copy["mb_per_sec"] if copy["mb_per_sec"] else 0.0
+    notes = []
+    if zero["buffer_waits"]:
+        notes.append(f"等待发送完成 {zero['buffer_waits']} 次")
+    bad = copy["mismatched"] + zero["mismatched"]
+    if bad:
+        notes.append(f"序号不符 {bad}")
+    print(f"{pattern:<14}{transport:<8}{format_size(size):>6}{copy['count']:>8}"
+          f"{copy['mb_per_sec']:>12,.1f}{zero['mb_per_sec']:>12,.1f}{speedup:>8.2f}x  {'，'.join(notes)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="大负载吞吐量基准测试：复制 vs 零拷贝")
+    parser.add_argument("--patterns", default=",".join(PATTERNS), help="逗号分隔的模式")
+    parser.add_argument("--transports", default=",".join(TRANSPORTS), help="逗号分隔的传输方式")
+    parser.add_argument("--sizes", default="1K,4K,16K,64K,256K,1M,4M,16M,64M",
+                        help="逗号分隔的负载大小，可以带 K / M 后缀")
+    parser.add_argument("--total-mb", type=int, default=256, help="每种大小大约传输多少 MB")
+    parser.add_argument("--min-count", type=int, default=8, help="每种大小至少发送的消息条数")
+    parser.add_argument("--max-count", type=int, default=50000, help="每种大小最多发送的消息条数")
+    parser.add_argument("--queue-mb", type=int, default=32, help="每个套接字排队的负载上限（MB），决定高水位")
+    parser.add_argument("--window", type=int, default=4, help="router_dealer 最多同时在途的请求数")
+    parser.add_argument("--max-buffers", type=int, default=16, help="零拷贝发送缓冲区数量的上限")
+    parser.add_argument("--output", help="JSON 报告输出路径，默认只打印到终端")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    patterns = parse_list(args.patterns)
+    transports = parse_list(args.transports)
+    sizes = parse_list(args.sizes, parse_size)
+    for name in patterns:
+        if name not in PATTERNS:
+            parser.error(f"未知模式: {name}")
+    if min(sizes) < STAMP_SIZE:
+        parser.error(f"负载至少为 {STAMP_SIZE} 字节（开头写入序号）")
+    if "ipc" in transports and not zmq.has("ipc"):
+        print("当前平台不支持 ipc 传输，已跳过", file=sys.stderr)
+        transports.remove("ipc")
+    
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    
+    print(f"zmq.COPY_THRESHOLD = {zmq.COPY_THRESHOLD} 字节，小于它的帧即使 copy=False 也会复制")
+    print(f"接收端每 {PAGE_SIZE} 字节读一个字节；inproc 零拷贝不复制负载，MB/s 是指针传递加逐页访问的速度，"
+          f"不是处理整个负载的速度")
+    print(f"{'模式':<12}{'传输':<6}{'大小':>6}{'条数':>6}{'copy MB/s':>12}{'零拷贝 MB/s':>9}{'加速':>6}")
+    results = []
+    for pattern in patterns:
+        for transport in transports:
+            for size in sizes:
+                row = {mode: run_case(context, pattern, transport, size, mode, args) for mode in MODES}
+                print_row(pattern, transport, size, row)
+                results.extend(row.values())
+    context.term()
+    
+    report = {
+        "environment": environment_info(),
+        "config": {"total_mb": args.total_mb, "queue_mb": args.queue_mb, "window": args.window,
+                   "copy_threshold": zmq.COPY_THRESHOLD, "zmq": config.effective_dict()},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已保存到 {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
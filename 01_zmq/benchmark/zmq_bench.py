@@ -0,0 +1,364 @@
+"""ZMQ 各通信模式的吞吐量与延迟基准测试
+
+对 pair / req_rep / push_pull / pub_sub / router_dealer 五种模式，分别在 inproc、ipc、tcp
+三种传输方式上测试：
+- 吞吐量：发送端连续发送 count 条消息，接收端从第一条计时到最后一条，得到 msgs/s 和 MB/s
+- 往返延迟：一问一答发送 latency_count 次，统计 p50 / p99 / p999
+
+inproc 的对端运行在同一进程的线程中（共享 Context），ipc / tcp 的对端运行在独立进程中。
+所有 Context 都按 --zmq-* 参数 / ZMQ_DEMO_* 环境变量（见 zmq_config.py）创建，配置记录在报告里。
+req_rep 只能一问一答，它的吞吐量取自延迟测试（lockstep）。
+单向模式（push_pull、pub_sub）测延迟时，对端用一对反向的同类套接字把消息送回来。
+
+结果以 JSON 输出，便于在不同版本之间对比：
+    python benchmark/zmq_bench.py --output report.json
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import socket as pysocket
+import argparse
+import platform
+import tempfile
+import threading
+import multiprocessing
+from datetime import datetime
+
+import numpy as np
+import zmq
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+# 每种模式：吞吐量测试用的 (发送端, 接收端) 套接字类型；
+# 延迟测试用的 (本端, 对端) 类型，单向模式额外用一对反向套接字回送
+PATTERNS = {
+    "pair": {"throughput": (zmq.PAIR, zmq.PAIR), "latency": (zmq.PAIR, zmq.PAIR), "duplex": True},
+    "req_rep": {"throughput": None, "latency": (zmq.REQ, zmq.REP), "duplex": True},
+    "push_pull": {"throughput": (zmq.PUSH, zmq.PULL), "latency": (zmq.PUSH, zmq.PULL), "duplex": False},
+    "pub_sub": {"throughput": (zmq.PUB, zmq.SUB), "latency": (zmq.PUB, zmq.SUB), "duplex": False},
+    "router_dealer": {"throughput": (zmq.DEALER, zmq.ROUTER), "latency": (zmq.DEALER, zmq.ROUTER), "duplex": True},
+}
+TRANSPORTS = ["inproc", "ipc", "tcp"]
+
+# 对端超过这个时间没有收到消息就认为发送结束（PUB 在高水位时会丢消息）
+IDLE_TIMEOUT_MS = 2000
+
+# inproc 只能在同一个 Context 内使用；主进程里的所有套接字都用这个 Context
+_shared_context = None
+_config = ZmqConfig()
+
+def shared_context():
+    global _shared_context
+    if _shared_context is None:
+        _shared_context = _config.context()
+    return _shared_context
+
+def bind_address(transport):
+    if transport == "inproc":
+        return f"inproc://bench-{uuid.uuid4().hex}"
+    if transport == "ipc":
+        return f"ipc://{tempfile.gettempdir()}/zmq-bench-{uuid.uuid4().hex}.ipc"
+    return "tcp://127.0.0.1:*"
+
+def bind_socket(context, socket_type, transport):
+    """绑定到一个新地址，返回 (套接字, 实际地址)；tcp 使用随机端口"""
+    sock = context.socket(socket_type)
+    sock.setsockopt(zmq.LINGER, 0)
+    if socket_type == zmq.SUB:
+        sock.setsockopt(zmq.SUBSCRIBE, b"")
+    sock.bind(bind_address(transport))
+    return sock, sock.getsockopt_string(zmq.LAST_ENDPOINT)
+
+def connect_socket(context, socket_type, endpoint):
+    sock = context.socket(socket_type)
+    sock.setsockopt(zmq.LINGER, 0)
+    if socket_type == zmq.SUB:
+        sock.setsockopt(zmq.SUBSCRIBE, b"")
+    sock.connect(endpoint)
+    return sock
+
+def recv_payload(sock):
+    """接收一条消息，ROUTER 会多一个身份帧"""
+    if sock.socket_type == zmq.ROUTER:
+        return sock.recv_multipart()
+    return sock.recv()
+
+# ---------------------------------------------------------------- 对端（线程或进程）
+
+def sink_peer(context, transport, ctl, socket_type, count):
+    """吞吐量测试的接收端：报告收到的条数和从第一条到最后一条的耗时
+    
+    发送端先发送空的探测消息，直到接收端确认收到（解决 PUB/SUB 的慢连接者问题），
+    正式消息都非空，所以空消息一律当作探测忽略。
+    """
+    sock, endpoint = bind_socket(context, socket_type, transport)
+    sock.setsockopt(zmq.RCVTIMEO, IDLE_TIMEOUT_MS)
+    ctl.put(endpoint)
+    
+    received = 0
+    start = end = None
+    ready_sent = False
+    try:
+        while received < count:
+            message = recv_payload(sock)
+            payload = message[-1] if isinstance(message, list) else message
+            if not payload:
+                if not ready_sent:
+                    ctl.put("ready")
+                    ready_sent = True
+                continue
+            end = time.perf_counter()
+            if start is None:
+                start = end
+            received += 1
+    except zmq.Again:
+        pass
+    
+    elapsed = (end - start) if received > 1 else 0.0
+    ctl.put({"received": received, "elapsed": elapsed})
+    sock.close()
+
+def echo_peer(context, transport, ctl, socket_type, reverse_type, count):
+    """延迟测试的回送端：把收到的每条消息原样送回
+    
+    双向模式（PAIR / REP / ROUTER）在同一个套接字上回送；
+    单向模式（PULL / SUB）额外绑定一个反向套接字（PUSH / PUB）回送。
+    """
+    sock, endpoint = bind_socket(context, socket_type, transport)
+    sock.setsockopt(zmq.RCVTIMEO, IDLE_TIMEOUT_MS)
+    if reverse_type is not None:
+        back, back_endpoint = bind_socket(context, reverse_type, transport)
+    else:
+        back, back_endpoint = sock, None
+    ctl.put((endpoint, back_endpoint))
+    
+    echoed = 0
+    try:
+        while echoed < count:
+            if sock.socket_type == zmq.ROUTER:
+                frames = sock.recv_multipart()
+                back.send_multipart(frames)
+                payload = frames[-1]
+            else:
+                payload = sock.recv()
+                back.send(payload)
+            if payload:
+                echoed += 1
+    except zmq.Again:
+        pass
+    
+    ctl.put({"echoed": echoed})
+    sock.close()
+    if back is not sock:
+        back.close()
+
+def process_peer(config, target, *args):
+    """ipc / tcp 对端进程的入口：按主进程传来的配置创建自己的 Context"""
+    context = config.context()
+    try:
+        target(context, *args)
+    finally:
+        context.term()
+
+def start_peer(transport, target, *args):
+    """inproc 在线程中启动对端，ipc / tcp 在独立进程中启动"""
+    if transport == "inproc":
+        ctl = queue.Queue()
+        worker = threading.Thread(target=target, args=(shared_context(), transport, ctl) + args, daemon=True)
+    else:
+        mp = multiprocessing.get_context("spawn")
+        ctl = mp.Queue()
+        worker = mp.Process(target=process_peer, args=(_config, target, transport, ctl) + args, daemon=True)
+    worker.start()
+    return worker, ctl
+
+# ---------------------------------------------------------------- 测量
+
+def measure_throughput(pattern, transport, size, count):
+    sender_type, receiver_type = PATTERNS[pattern]["throughput"]
+    worker, ctl = start_peer(transport, sink_peer, receiver_type, count)
+    endpoint = ctl.get(timeout=30)
+    
+    sock = connect_socket(shared_context(), sender_type, endpoint)
+    
+    # 发送探测消息直到接收端确认，连接和订阅都已生效后再开始计时
+    while True:
+        sock.send(b"")
+        try:
+            if ctl.get(timeout=0.01) == "ready":
+                break
+        except queue.Empty:
+            continue
+    
+    payload = b"x" * size
+    for _ in range(count):
+        sock.send(payload, copy=False)
+    
+    report = ctl.get(timeout=60 + IDLE_TIMEOUT_MS / 1000)
+    worker.join()
+    sock.close()
+    
+    received, elapsed = report["received"], report["elapsed"]
+    rate = received / elapsed if elapsed else 0.0
+    return {
+        "mode": "stream",
+        "sent": count,
+        "received": received,
+        "lost": count - received,
+        "elapsed_sec": elapsed,
+        "msgs_per_sec": rate,
+        "mb_per_sec": rate * size / 1e6,
+    }
+
+def measure_latency(pattern, transport, size, count):
+    """一问一答测往返延迟，返回 (延迟统计, lockstep 吞吐量)"""
+    spec = PATTERNS[pattern]
+    local_type, peer_type = spec["latency"]
+    reverse_type = None if spec["duplex"] else local_type
+    worker, ctl = start_peer(transport, echo_peer, peer_type, reverse_type, count)
+    endpoint, back_endpoint = ctl.get(timeout=30)
+    
+    context = shared_context()
+    sock = connect_socket(context, local_type, endpoint)
+    back = connect_socket(context, peer_type, back_endpoint) if back_endpoint else sock
+    poller = zmq.Poller()
+    poller.register(back, zmq.POLLIN)
+    
+    # 预热：探测消息能完整往返一次才开始测量；REQ 必须等到回复，不能重发
+    probe_timeout = -1 if local_type == zmq.REQ else 100
+    while True:
+        sock.send(b"")
+        if poller.poll(probe_timeout):
+            back.recv()
+            break
+    
+    payload = b"x" * size
+    rtts = np.empty(count, dtype=np.int64)
+    start = time.perf_counter()
+    for i in range(count):
+        t0 = time.perf_counter_ns()
+        sock.send(payload, copy=False)
+        # 预热阶段多发的探测消息可能还在路上，回送的空消息直接跳过
+        while True:
+            if not poller.poll(IDLE_TIMEOUT_MS):
+                raise RuntimeError(f"{pattern}/{transport} 第 {i} 条消息超时未返回")
+            if len(back.recv(copy=False)):
+                break
+        rtts[i] = time.perf_counter_ns() - t0
+    elapsed = time.perf_counter() - start
+    
+    ctl.get(timeout=30)
+    worker.join()
+    sock.close()
+    if back is not sock:
+        back.close()
+    
+    p50, p99, p999 = np.percentile(rtts, [50, 99, 99.9]) / 1000
+    latency = {
+        "count": count,
+        "p50": p50,
+        "p99": p99,
+        "p999": p999,
+        "mean": rtts.mean() / 1000,
+        "max": rtts.max() / 1000,
+    }
+    lockstep = {
+        "mode": "lockstep",
+        "sent": count,
+        "received": count,
+        "lost": 0,
+        "elapsed_sec": elapsed,
+        "msgs_per_sec": count / elapsed,
+        "mb_per_sec": count * size / elapsed / 1e6,
+    }
+    return latency, lockstep
+
+def run_case(pattern, transport, size, count, latency_count):
+    latency, lockstep = measure_latency(pattern, transport, size, latency_count)
+    if PATTERNS[pattern]["throughput"]:
+        throughput = measure_throughput(pattern, transport, size, count)
+    else:
+        throughput = lockstep
+    return {
+        "pattern": pattern,
+        "transport": transport,
+        "size": size,
+        "throughput": throughput,
+        "latency_us": latency,
+    }
+
+def environment_info():
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": pysocket.gethostname(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "pyzmq": zmq.pyzmq_version(),
+        "libzmq": zmq.zmq_version(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def print_result(r):
+    t, l = r["throughput"], r["latency_us"]
+    lost = f"  丢失 {t['lost']}" if t["lost"] else ""
+    print(f"{r['pattern']:<14}{r['transport']:<8}{r['size']:>9}"
+          f"{t['msgs_per_sec']:>14,.0f}{t['mb_per_sec']:>10.1f}"
+          f"{l['p50']:>10.1f}{l['p99']:>10.1f}{l['p999']:>10.1f}  {t['mode']}{lost}")
+
+def parse_list(text, convert=str):
+    return [convert(item) for item in text.split(",") if item]
+
+def main():
+    parser = argparse.ArgumentParser(description="ZMQ 通信模式吞吐量与延迟基准测试")
+    parser.add_argument("--patterns", default=",".join(PATTERNS), help="逗号分隔的模式")
+    parser.add_argument("--transports", default=",".join(TRANSPORTS), help="逗号分隔的传输方式")
+    parser.add_argument("--sizes", default="64,1024,65536", help="逗号分隔的消息大小（字节，至少 1）")
+    parser.add_argument("--count", type=int, default=100000, help="吞吐量测试的消息条数")
+    parser.add_argument("--latency-count", type=int, default=10000, help="延迟测试的往返次数")
+    parser.add_argument("--output", help="JSON 报告输出路径，默认只打印到终端")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    global _config
+    _config = ZmqConfig.from_args(args)
+    
+    patterns = parse_list(args.patterns)
+    transports = parse_list(args.transports)
+    sizes = parse_list(args.sizes, int)
+    for name in patterns:
+        if name not in PATTERNS:
+            parser.error(f"未知模式: {name}")
+    if min(sizes) < 1:
+        parser.error("消息大小至少为 1 字节（空消息用作探测）")
+    if "ipc" in transports and not zmq.has("ipc"):
+        print("当前平台不支持 ipc 传输，已跳过", file=sys.stderr)
+        transports.remove("ipc")
+    
+    print(f"{'模式':<12}{'传输':<6}{'大小':>9}{'msgs/s':>14}{'MB/s':>10}"
+          f"{'p50(us)':>10}{'p99(us)':>10}{'p999(us)':>10}")
+    results = []
+    for pattern in patterns:
+        for transport in transports:
+            for size in sizes:
+                result = run_case(pattern, transport, size, args.count, args.latency_count)
+                print_result(result)
+                results.append(result)
+    
+    report = {
+        "environment": environment_info(),
+        "config": {"count": args.count, "latency_count": args.latency_count, "sizes": sizes,
+                   "zmq": _config.effective_dict()},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已保存到 {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""PAIR 对等节点的全双工模式
+
+原来的两个节点严格轮流：发一条、收一条、睡一秒。全双工模式下两端各自连续发送 count 条消息，
+同时接收对方的消息：PAIR 套接字不是线程安全的，所以收发都在同一个线程里，用 Poller 同时等待可读和可写，
+可读时一次取完已到达的消息，可写时一次最多发 batch 条（NOBLOCK，发到高水位为止）。
+
+消息格式：[序号（8 字节大端）, 负载]。PAIR 不会丢消息也不会乱序，接收端逐条检查序号，
+序号异常计数应当始终为 0。开始计时之前两端先互发一条 [HELLO]，确认连接已经建立；
+结束后再互发一条 [BYE]：先跑完的一端如果直接关闭套接字，还在路上的消息会随连接一起丢掉，
+收到对方的 BYE 说明对方已经收完了自己发的全部消息，这时才能关闭。
+"""
+
+import time
+
+import zmq
+
+HELLO = b"HELLO"
+BYE = b"BYE"
+
+class DuplexPeer:
+    """在一个 PAIR 套接字上同时发送和接收 count 条消息"""
+    
+    def __init__(self, socket, count, size=64, batch=100, idle_timeout=5.0, verbose=False):
+        self.socket = socket
+        self.count = count
+        self.payload = b"x" * size
+        self.batch = batch
+        self.idle_timeout = idle_timeout
+        self.verbose = verbose
+        self.sent = 0
+        self.received = 0
+        self.out_of_order = 0
+        self.elapsed = 0.0
+    
+    def handshake(self, timeout=None):
+        """互发 HELLO：收到对方的 HELLO 说明两个方向都已经连通"""
+        self.socket.send(HELLO)
+        if timeout is not None and not self.socket.poll(timeout * 1000):
+            raise TimeoutError("等待对等节点超时")
+        if self.socket.recv() != HELLO:
+            raise RuntimeError("对等节点没有使用全双工模式")
+    
+    def goodbye(self, timeout=None):
+        """互发 BYE：对方发 BYE 时已经收完了全部消息，之后关闭套接字不会丢消息"""
+        self.socket.send(BYE)
+        if timeout is not None and not self.socket.poll(timeout * 1000):
+            raise TimeoutError("等待对等节点结束超时")
+        if self.socket.recv() != BYE:
+            raise RuntimeError("对等节点结束时发来了多余的消息")
+    
+    def on_message(self, frames):
+        seq, _ = frames
+        if int.from_bytes(seq, "big") != self.received:
+            self.out_of_order += 1
+        self.received += 1
+        if self.verbose and self.received % max(1, self.count // 10) == 0:
+            print(f"已接收 {self.received}/{self.count}")
+    
+    def receive_ready(self):
+        """一次取完已到达的消息"""
+        while self.received < self.count:
+            try:
+                frames = self.socket.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+            self.on_message(frames)
+    
+    def send_ready(self):
+        """最多发 batch 条，发送队列满了就停下，等下一次可写"""
+        for _ in range(self.batch):
+            if self.sent >= self.count:
+                return
+            try:
+                self.socket.send_multipart([self.sent.to_bytes(8, "big"), self.payload], zmq.NOBLOCK)
+            except zmq.Again:
+                return
+            self.sent += 1
+    
+    def run(self):
+        """收发直到两个方向都完成，返回统计"""
+        poller = zmq.Poller()
+        poller.register(self.socket, zmq.POLLIN | zmq.POLLOUT)
+        start = time.perf_counter()
+        while self.sent < self.count or self.received < self.count:
+            events = dict(poller.poll(self.idle_timeout * 1000)).get(self.socket, 0)
+            if not events:
+                print(f"{self.idle_timeout} 秒内既不能发送也没有收到消息，停止")
+                break
+            if events & zmq.POLLIN:
+                self.receive_ready()
+            if events & zmq.POLLOUT:
+                self.send_ready()
+                if self.sent >= self.count:
+                    # 发完以后只等待接收，否则可写事件会让 poll 立即返回、空转
+                    poller.modify(self.socket, zmq.POLLIN)
+        self.elapsed = time.perf_counter() - start
+        return self.stats()
+    
+    def stats(self):
+        elapsed = self.elapsed or float("inf")
+        size = len(self.payload)
+        return {
+            "sent": self.sent,
+            "received": self.received,
+            "out_of_order": self.out_of_order,
+            "elapsed_sec": self.elapsed,
+            "send_per_sec": self.sent / elapsed,
+            "recv_per_sec": self.received / elapsed,
+            "duplex_per_sec": (self.sent + self.received) / elapsed,
+            "duplex_mb_per_sec": (self.sent + self.received) * size / elapsed / 1e6,
+        }
+
+def print_stats(name, stats):
+    print(f"{name}: 发送 {stats['sent']}，接收 {stats['received']}，耗时 {stats['elapsed_sec']:.2f} 秒")
+    print(f"  发送 {stats['send_per_sec']:,.0f} 条/秒，接收 {stats['recv_per_sec']:,.0f} 条/秒，"
+          f"双向合计 {stats['duplex_per_sec']:,.0f} 条/秒（{stats['duplex_mb_per_sec']:.1f} MB/s），"
+          f"序号异常 {stats['out_of_order']}")
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""PAIR 全双工吞吐量：inproc（同一进程的两个线程）vs ipc / tcp（两个进程）
+
+两端都用 duplex.DuplexPeer 同时发送和接收 count 条消息，报告每一端的发送 / 接收速率、
+双向合计的条数和 MB/s，以及序号异常数（应为 0）。
+
+    python pair/duplex_benchmark.py --sizes 64,1024,65536 --count 200000
+"""
+
+import os
+import sys
+import zmq
+import uuid
+import queue
+import argparse
+import tempfile
+import threading
+import multiprocessing
+
+from duplex import DuplexPeer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+TRANSPORTS = ["inproc", "ipc", "tcp"]
+
+def bind_address(transport):
+    if transport == "inproc":
+        return f"inproc://duplex-{uuid.uuid4().hex}"
+    if transport == "ipc":
+        return f"ipc://{tempfile.gettempdir()}/zmq-duplex-{uuid.uuid4().hex}.ipc"
+    return "tcp://127.0.0.1:*"
+
+def peer(context, role, address, count, size, results):
+    """一端：bind 端把实际地址放进 results，connect 端从 address 拿到地址"""
+    socket = context.socket(zmq.PAIR)
+    socket.setsockopt(zmq.LINGER, 1000)
+    if role == "bind":
+        socket.bind(address)
+        results.put(("endpoint", socket.getsockopt_string(zmq.LAST_ENDPOINT)))
+    else:
+        socket.connect(address)
+    duplex = DuplexPeer(socket, count, size)
+    duplex.handshake(timeout=30)
+    stats = duplex.run()
+    duplex.goodbye(timeout=30)
+    results.put((role, stats))
+    socket.close()
+
+def process_peer(config, *args):
+    """ipc / tcp 对端进程的入口"""
+    context = config.context()
+    try:
+        peer(context, *args)
+    finally:
+        context.term()
+
+def run_once(transport, count, size, config):
+    address = bind_address(transport)
+    if transport == "inproc":
+        # inproc 只能在同一个 Context 内使用，两端是同一进程里的两个线程
+        context = config.context()
+        results = queue.Queue()
+        start = lambda role, addr: threading.Thread(
+            target=peer, args=(context, role, addr, count, size, results))
+    else:
+        context = None
+        mp = multiprocessing.get_context("spawn")
+        results = mp.Queue()
+        start = lambda role, addr: mp.Process(
+            target=process_peer, args=(config, role, addr, count, size, results))
+    
+    binder = start("bind", address)
+    binder.start()
+    _, endpoint = results.get(timeout=30)
+    connector = start("connect", endpoint)
+    connector.start()
+    
+    stats = dict(results.get(timeout=600) for _ in range(2))
+    binder.join()
+    connector.join()
+    if context is not None:
+        context.term()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="PAIR 全双工吞吐量基准测试")
+    parser.add_argument("--transports", default=",".join(TRANSPORTS), help="逗号分隔的传输方式")
+    parser.add_argument("--sizes", default="64,1024,65536", help="逗号分隔的消息大小（字节）")
+    parser.add_argument("--count", type=int, default=100000, help="每个方向的消息数")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    transports = [t for t in args.transports.split(",") if t]
+    if "ipc" in transports and not zmq.has("ipc"):
+        print("当前平台不支持 ipc 传输，已跳过", file=sys.stderr)
+        transports.remove("ipc")
+    config = ZmqConfig.from_args(args)
+    
+    print(f"{'传输':<6}{'大小':>8}{'A发送/秒':>12}{'A接收/秒':>12}{'B发送/秒':>12}{'B接收/秒':>12}"
+          f"{'双向合计/秒':>12}{'MB/s':>9}{'序号异常':>6}")
+    for transport in transports:
+        for size in [int(s) for s in args.sizes.split(",") if s]:
+            stats = run_once(transport, args.count, size, config)
+            a, b = stats["bind"], stats["connect"]
+            # 两端同时开始、同时结束，双向合计取两端各自发送速率之和
+            total = a["send_per_sec"] + b["send_per_sec"]
+            errors = a["out_of_order"] + b["out_of_order"] + 2 * args.count - a["received"] - b["received"]
+            print(f"{transport:<8}{size:>8}{a['send_per_sec']:>14,.0f}{a['recv_per_sec']:>14,.0f}"
+                  f"{b['send_per_sec']:>14,.0f}{b['recv_per_sec']:>14,.0f}{total:>16,.0f}"
+                  f"{total * size / 1e6:>10.1f}{errors:>8}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
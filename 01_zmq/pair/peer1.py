@@ -1,18 +1,49 @@
+import os
+import sys
 import zmq
 import time
+import argparse
+
+from duplex import DuplexPeer, print_stats
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+def run_duplex(socket, args):
+    """全双工模式：同时发送和接收 args.count 条消息（见 duplex.py）"""
+    peer = DuplexPeer(socket, args.count, args.size, verbose=True)
+    print("等待对等节点...")
+    peer.handshake()
+    print_stats("对等节点1", peer.run())
+    # 等对方也收完再关闭，否则还在路上的消息会丢失
+    peer.goodbye()
+    socket.close()
 
 def main():
+    parser = argparse.ArgumentParser(description="PAIR 对等节点1")
+    parser.add_argument("--duplex", action="store_true", help="全双工模式：两端同时收发，对端也要用 --duplex 启动")
+    parser.add_argument("--count", type=int, default=100000, help="全双工模式下每个方向的消息数")
+    parser.add_argument("--size", type=int, default=64, help="全双工模式下每条消息的负载字节数")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
     # 创建 ZMQ 上下文
-    context = zmq.Context()
+    config = ZmqConfig.from_args(args)
+    context = config.context()
     
     # 创建 PAIR 套接字
     socket = context.socket(zmq.PAIR)
     
     # 绑定到端口 5555
-    socket.bind("tcp://*:5555")
+    socket.bind(config.bind_endpoint(5555))
     
     print("对等节点1已启动...")
     
+    if args.duplex:
+        run_duplex(socket, args)
+        context.term()
+        return
+    
     while True:
         # 发送消息
         message = "来自对等节点1的消息"
@@ -26,4 +57,4 @@ def main():
         time.sleep(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
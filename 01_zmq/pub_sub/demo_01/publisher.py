@@ -1,16 +1,22 @@
+import os
+import sys
 import zmq
 import time
 import random
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from zmq_config import ZmqConfig
+
 def main():
     # 创建 ZMQ 上下文
-    context = zmq.Context()
+    config = ZmqConfig.from_env()
+    context = config.context()
     
     # 创建 PUB 套接字
     socket = context.socket(zmq.PUB)
     
     # 绑定到端口 5555
-    socket.bind("tcp://*:5555")
+    socket.bind(config.bind_endpoint(5555))
     
     print("发布者已启动...")
     
@@ -30,4 +36,4 @@ def main():
         time.sleep(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,15 +1,20 @@
+import os
 import zmq
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from zmq_config import ZmqConfig
+
 def main():
     # 创建 ZMQ 上下文
-    context = zmq.Context()
+    config = ZmqConfig.from_env()
+    context = config.context()
     
     # 创建 SUB 套接字
     socket = context.socket(zmq.SUB)
     
     # 连接到发布者
-    socket.connect("tcp://localhost:5555")
+    socket.connect(config.connect_endpoint(5555))
     
     # 设置要订阅的主题
     # 可以订阅多个主题，使用空格分隔
@@ -24,4 +29,4 @@ def main():
         print(f"收到消息: {message}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
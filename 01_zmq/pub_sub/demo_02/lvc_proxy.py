@@ -0,0 +1,148 @@
+import os
+import sys
+import zmq
+import time
+import argparse
+
+from tick_codec import CODEC_BINARY, CODEC_TEXT, PUB_PORT, TICK_DTYPE
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from zmq_config import ZmqConfig
+
+def message_topic(frames):
+    """取消息的股票代码：single 文本模式是第一帧的第一个词，其余是第一帧"""
+    if len(frames) == 1:
+        return frames[0].bytes.split(b" ", 1)[0]
+    return frames[0].bytes
+
+def latest_tick(frames):
+    """把一条（可能是批量的）消息缩减为只含最新一条行情的消息"""
+    if len(frames) == 1:
+        return [frames[0].bytes]
+    topic, codec = frames[0].bytes, frames[1].bytes
+    if codec == CODEC_BINARY:
+        # 二进制负载是定长记录拼接，最后 20 字节就是最新一条
+        return [topic, codec, frames[2].buffer[-TICK_DTYPE.itemsize:].tobytes()]
+    if codec == CODEC_TEXT:
+        return [topic, codec, frames[-1].bytes]
+    return [frame.bytes for frame in frames]
+
+class LastValueCache:
+    """最新值缓存 + 合并（conflation）
+    
+    上游的每条消息只更新缓存并把股票标记为"脏"，按 conflate_ms 周期把脏股票的最新值发往下游。
+    一个周期内同一只股票的多次更新只发送最后一次，下游的消息速率最多是 股票数 / 周期，
+    跟不上的订阅者不会积压历史行情，高水位丢弃的也只是已经过时的值。
+    
+    合并对所有订阅者一视同仁：周期是全局的，跟得上的订阅者也只能收到每个周期的最新值，中间的行情同样被丢掉。
+    XPUB 把一条消息扇出给所有匹配的订阅者，看不到是哪个订阅者落后了，没法只对落后的订阅者合并；
+    需要每一条行情的订阅者应该直接连接发布者，只有能接受按周期采样的订阅者才连接这个代理。
+    """
+    
+    def __init__(self, frontend, backend, conflate_ms=100):
+        self.frontend = frontend
+        self.backend = backend
+        self.conflate = conflate_ms / 1000
+        self.cache = {}
+        # 用字典当有序集合，保证按更新顺序发送
+        self.dirty = {}
+        self.received = 0
+        self.sent = 0
+        self.snapshots = 0
+    
+    def on_upstream(self, frames):
+        topic = message_topic(frames)
+        self.cache[topic] = latest_tick(frames)
+        self.dirty[topic] = None
+        self.received += 1
+    
+    def on_subscription(self, message):
+        """新订阅到达时立即发送匹配前缀的缓存快照"""
+        # 订阅消息第一个字节 1 表示订阅、0 表示取消订阅，后面是订阅前缀
+        if not message or message[0] != 1:
+            return
+        prefix = message[1:]
+        # XPUB 的发送会到达所有匹配的订阅者，老订阅者也会再收到一次最新值，
+        # 对"最新值"语义没有影响
+        for topic, frames in self.cache.items():
+            if topic.startswith(prefix):
+                self.backend.send_multipart(frames)
+                self.snapshots += 1
+    
+    def flush(self):
+        for topic in self.dirty:
+            self.backend.send_multipart(self.cache[topic])
+        self.sent += len(self.dirty)
+        self.dirty.clear()
+    
+    def run(self, report_interval=5.0):
+        poller = zmq.Poller()
+        poller.register(self.frontend, zmq.POLLIN)
+        poller.register(self.backend, zmq.POLLIN)
+        
+        next_flush = time.monotonic() + self.conflate
+        next_report = time.monotonic() + report_interval
+        last_received = last_sent = 0
+        
+        while True:
+            timeout = max(0.0, next_flush - time.monotonic())
+            events = dict(poller.poll(timeout * 1000))
+            
+            if self.backend in events:
+                self.on_subscription(self.backend.recv())
+            
+            if self.frontend in events:
+                # 一次取完已到达的上游消息，但不超过合并周期
+                while time.monotonic() < next_flush:
+                    try:
+                        frames = self.frontend.recv_multipart(zmq.NOBLOCK, copy=False)
+                    except zmq.Again:
+                        break
+                    self.on_upstream(frames)
+            
+            now = time.monotonic()
+            if now >= next_flush:
+                self.flush()
+                next_flush = now + self.conflate
+            
+            if now >= next_report:
+                received = self.received - last_received
+                sent = self.sent - last_sent
+                ratio = received / sent if sent else 0.0
+                print(f"上游 {received / report_interval:,.0f} 条/秒，下游 {sent / report_interval:,.0f} 条/秒，"
+                      f"合并比 {ratio:.1f}，缓存 {len(self.cache)} 只股票，快照 {self.snapshots} 条")
+                last_received, last_sent = self.received, self.sent
+                next_report = now + report_interval
+
+def main():
+    parser = argparse.ArgumentParser(description="最新值缓存代理（XSUB/XPUB）")
+    parser.add_argument("--upstream", default=None, help="发布者地址，默认连接 --zmq-host 上的发布者端口")
+    parser.add_argument("--port", type=int, default=5558, help="订阅者连接的端口")
+    parser.add_argument("--conflate-ms", type=float, default=100,
+                        help="合并周期（毫秒），对所有订阅者生效，跟得上的订阅者也只收到每个周期的最新值")
+    parser.add_argument("--sndhwm", type=int, default=1000, help="下游每个订阅者的发送高水位")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    # 创建 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    
+    # 前端：XSUB 连接发布者，订阅全部股票以维护完整缓存
+    frontend = context.socket(zmq.XSUB)
+    upstream = args.upstream or config.connect_endpoint(PUB_PORT)
+    frontend.connect(upstream)
+    frontend.send(b"\x01")
+    
+    # 后端：XPUB 供订阅者连接；VERBOSE 让重复的订阅也能被看到，以便给每个新订阅者发快照
+    backend = context.socket(zmq.XPUB)
+    backend.setsockopt(zmq.XPUB_VERBOSE, 1)
+    backend.setsockopt(zmq.SNDHWM, args.sndhwm)
+    backend.bind(config.bind_endpoint(args.port))
+    
+    print(f"最新值缓存代理已启动: {upstream} -> {config.bind_endpoint(args.port)}，合并周期 {args.conflate_ms}ms")
+    
+    LastValueCache(frontend, backend, conflate_ms=args.conflate_ms).run()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,143 @@
+import os
+import sys
+import zmq
+import time
+import argparse
+
+import numpy as np
+
+from tick_codec import PUB_PORT, META_PORT, check_message, decode_message, negotiate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from zmq_config import ZmqConfig
+
+class RollingWindows:
+    """每只股票一个预分配的环形缓冲区，保存最近 window 条价格
+    
+    所有缓冲区放在同一个 (股票数, window) 的二维数组里，运行期间不再分配内存。
+    行情没有成交量字段，所以均价是窗口内等权平均（相当于所有成交量相同的 VWAP）。
+    """
+    
+    def __init__(self, symbols, window=100):
+        self.symbols = list(symbols)
+        self.rows = {stock: i for i, stock in enumerate(self.symbols)}
+        self.window = window
+        self.prices = np.full((len(self.symbols), window), np.nan)
+        # 下一次写入的位置、累计行情数、本周期内的行情数
+        self.positions = np.zeros(len(self.symbols), dtype=np.int64)
+        self.totals = np.zeros(len(self.symbols), dtype=np.int64)
+        self.updates = np.zeros(len(self.symbols), dtype=np.int64)
+    
+    def push(self, stock, prices):
+        """写入一只股票的一批价格"""
+        row = self.rows[stock]
+        prices = np.asarray(prices, dtype=np.float64)
+        n = len(prices)
+        # 一批超过窗口长度时只有最后 window 条有意义
+        kept = prices[-self.window:]
+        start = self.positions[row] + n - len(kept)
+        slots = (start + np.arange(len(kept))) % self.window
+        self.prices[row, slots] = kept
+        self.positions[row] = (self.positions[row] + n) % self.window
+        self.totals[row] += n
+        self.updates[row] += n
+    
+    def summary(self):
+        """返回本周期有更新的股票的统计，并清零周期计数"""
+        rows = np.flatnonzero(self.updates)
+        if len(rows) == 0:
+            return []
+        windows = self.prices[rows]
+        last = self.prices[rows, (self.positions[rows] - 1) % self.window]
+        means = np.nanmean(windows, axis=1)
+        lows = np.nanmin(windows, axis=1)
+        highs = np.nanmax(windows, axis=1)
+        result = [
+            (self.symbols[row], int(self.updates[row]), last[i], means[i], lows[i], highs[i])
+            for i, row in enumerate(rows.tolist())
+        ]
+        self.updates[:] = 0
+        return result
+
+def print_summary(summary, elapsed, window):
+    """打印一个周期的聚合结果"""
+    ticks = sum(item[1] for item in summary)
+    print(f"--- {time.strftime('%H:%M:%S')} 本周期 {ticks} 条行情，{ticks / elapsed:,.0f} 条/秒 ---")
+    for stock, updates, last, mean, low, high in summary:
+        print(f"{stock:>8}: 最新 ${last:.2f}  {window}条均价 ${mean:.2f}  "
+              f"最低 ${low:.2f}  最高 ${high:.2f}  (+{updates})")
+
+def main():
+    parser = argparse.ArgumentParser(description="多股票订阅者（按周期输出滚动统计）")
+    parser.add_argument("symbols", nargs="*", default=["AAPL", "MSFT"], help="要订阅的股票代码（精确匹配）")
+    parser.add_argument("--window", type=int, default=100, help="每只股票保留的最近价格条数")
+    parser.add_argument("--interval", type=float, default=1.0, help="输出聚合结果的间隔（秒）")
+    parser.add_argument("--port", type=int, default=PUB_PORT,
+                        help="发布者端口（连接最新值缓存代理时用 5558），主机由 --zmq-host 指定")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    symbols = set(args.symbols)
+    windows = RollingWindows(sorted(symbols), window=args.window)
+    
+    # 创建 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    
+    # 创建 SUB 套接字
+    socket = context.socket(zmq.SUB)
+    socket.connect(config.connect_endpoint(args.port))
+    
+    # ZMQ 的订阅是前缀匹配，"A" 也会收到 "AAPL"，所以收到后再按集合精确过滤
+    for stock in symbols:
+        socket.setsockopt_string(zmq.SUBSCRIBE, stock)
+    
+    codec, known = negotiate(context, config.connect_endpoint(META_PORT))
+    codec_name = codec.decode() if codec else "按消息标记"
+    if known is not None and not symbols <= set(known):
+        parser.error(f"发布者没有这些股票: {', '.join(sorted(symbols - set(known)))}")
+    print(f"多股票订阅者已启动，订阅: {', '.join(sorted(symbols))}，编码: {codec_name}")
+    
+    poller = zmq.Poller()
+    poller.register(socket, zmq.POLLIN)
+    last_report = time.monotonic()
+    dropped = {}
+    
+    while True:
+        deadline = last_report + args.interval
+        timeout = max(0.0, deadline - time.monotonic())
+        if poller.poll(timeout * 1000):
+            # 一次取完所有已到达的消息，避免每条消息都进出一次 poll；
+            # 到了输出时间就先停下，保证消息源源不断时也能按时输出
+            while time.monotonic() < deadline:
+                try:
+                    frames = socket.recv_multipart(zmq.NOBLOCK, copy=False)
+                except zmq.Again:
+                    break
+                stock, message_codec, ticks = decode_message(frames)
+                if stock not in symbols:
+                    continue
+                # 与协商结果不符的消息丢弃，每只股票只提示一次，之后只计数
+                problem = check_message(stock, message_codec, ticks, codec, known)
+                if problem:
+                    if stock not in dropped:
+                        print(f"丢弃 {stock} 的消息: {problem}", file=sys.stderr)
+                    dropped[stock] = dropped.get(stock, 0) + 1
+                    continue
+                if isinstance(ticks, np.ndarray):
+                    windows.push(stock, ticks["price"])
+                else:
+                    windows.push(stock, [price for price, _ in ticks])
+        
+        now = time.monotonic()
+        if now - last_report >= args.interval:
+            summary = windows.summary()
+            if summary:
+                print_summary(summary, now - last_report, args.window)
+            if dropped:
+                print(f"累计丢弃: {', '.join(f'{stock} {n} 条' for stock, n in sorted(dropped.items()))}",
+                      file=sys.stderr)
+            last_report = now
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
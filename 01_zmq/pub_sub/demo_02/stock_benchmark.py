@@ -0,0 +1,107 @@
+import os
+import sys
+import zmq
+import time
+import argparse
+import threading
+
+from stock_publisher import StockTickGenerator, make_symbols, publish_single, publish_batched
+from tick_codec import CODEC_TEXT, CODEC_BINARY, count_ticks as message_tick_count
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from zmq_config import ZmqConfig
+
+# 结束标记：单独一帧，订阅者收到后停止计时
+END_MARKER = b"__END__"
+
+def count_ticks(context, endpoint, ready, result):
+    """订阅者线程：统计收到的行情条数和消息条数"""
+    socket = context.socket(zmq.SUB)
+    # 关闭高水位限制，保证基准测试中不丢消息
+    socket.setsockopt(zmq.RCVHWM, 0)
+    socket.connect(endpoint)
+    socket.setsockopt(zmq.SUBSCRIBE, b"")
+    ready.set()
+    
+    ticks = 0
+    messages = 0
+    start = None
+    while True:
+        frames = socket.recv_multipart(copy=False)
+        if start is None:
+            start = time.perf_counter()
+        if frames[0].bytes == END_MARKER:
+            break
+        messages += 1
+        ticks += message_tick_count(frames)
+    
+    result["elapsed"] = time.perf_counter() - start
+    result["ticks"] = ticks
+    result["messages"] = messages
+    socket.close()
+
+def run_once(mode, codec, count, batch_size, linger_ms, symbols, config):
+    """用 inproc 传输跑一轮，返回吞吐统计"""
+    context = config.context()
+    endpoint = f"inproc://stock-bench-{mode}-{codec.decode()}-{count}"
+    
+    publisher = context.socket(zmq.PUB)
+    publisher.setsockopt(zmq.SNDHWM, 0)
+    publisher.bind(endpoint)
+    
+    ready = threading.Event()
+    result = {}
+    subscriber = threading.Thread(target=count_ticks, args=(context, endpoint, ready, result))
+    subscriber.start()
+    ready.wait()
+    # 等待订阅关系传播到发布者（慢连接者问题）
+    time.sleep(0.2)
+    
+    start = time.perf_counter()
+    if mode == "single":
+        publish_single(publisher, count=count, interval=0, verbose=False, codec=codec)
+    else:
+        publish_batched(publisher, count=count, batch_size=batch_size,
+                        linger_ms=linger_ms, verbose=False, codec=codec,
+                        generator=StockTickGenerator(make_symbols(symbols)))
+    publisher.send(END_MARKER)
+    subscriber.join()
+    elapsed = time.perf_counter() - start
+    
+    publisher.close()
+    context.term()
+    
+    return {
+        "mode": f"{mode}/{codec.decode()}",
+        "count": count,
+        "received": result["ticks"],
+        "messages": result["messages"],
+        "elapsed": elapsed,
+        "ticks_per_sec": result["ticks"] / elapsed,
+        "msgs_per_sec": result["messages"] / elapsed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="股票行情发布吞吐量基准测试")
+    parser.add_argument("--counts", default="1000,100000,1000000", help="逗号分隔的行情条数")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--linger-ms", type=float, default=10)
+    parser.add_argument("--symbols", type=int, default=5, help="batch 模式的股票数量")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size 至少为 1")
+    
+    counts = [int(c) for c in args.counts.split(",")]
+    config = ZmqConfig.from_args(args)
+    
+    print(f"{'模式':<14}{'行情数':>10}{'收到':>10}{'消息数':>10}{'耗时(s)':>10}"
+          f"{'行情/秒':>14}{'消息/秒':>14}")
+    for count in counts:
+        for mode, codec in (("single", CODEC_TEXT), ("batch", CODEC_TEXT), ("batch", CODEC_BINARY)):
+            r = run_once(mode, codec, count, args.batch_size, args.linger_ms, args.symbols, config)
+            print(f"{r['mode']:<14}{r['count']:>10}{r['received']:>10}{r['messages']:>10}"
+                  f"{r['elapsed']:>10.3f}{r['ticks_per_sec']:>14,.0f}{r['msgs_per_sec']:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,56 +1,308 @@
+import os
+import sys
 import zmq
+import math
 import time
-import random
+import argparse
+import threading
 from datetime import datetime
 
-def generate_stock_data():
-    """生成模拟的股票数据"""
-    stocks = {
-        "AAPL": 150.0,
-        "GOOGL": 2800.0,
-        "MSFT": 300.0,
-        "AMZN": 3300.0,
-        "TSLA": 900.0
-    }
+import numpy as np
+
+from tick_codec import CODEC_TEXT, CODEC_BINARY, PUB_PORT, META_PORT, TICK_DTYPE, encode_tick, serve_metadata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from zmq_config import ZmqConfig
+
+# 股票编号表，二进制编码中用编号代替股票代码
+SYMBOLS = ["AAPL", "GOOGL", "MSFT", "AMZN", "TSLA"]
+SYMBOL_IDS = {stock: i for i, stock in enumerate(SYMBOLS)}
+INITIAL_PRICES = [150.0, 2800.0, 300.0, 3300.0, 900.0]
+
+def make_symbols(count):
+    """生成股票代码表：前 5 个是示例股票，其余是合成代码 T00005、T00006..."""
+    return SYMBOLS[:count] + [f"T{i:05d}" for i in range(len(SYMBOLS), count)]
+
+class StockTickGenerator:
+    """保持价格状态的行情生成器
+    
+    价格保存在 NumPy 数组里，跨调用持续随机游走（对数收益率服从正态分布）。
+    next_batch(n) 一次生成 n 条行情，全部是向量化运算，没有逐条的 Python 循环。
+    """
+    
+    def __init__(self, symbols=None, volatility=0.001, seed=None):
+        self.symbols = list(symbols) if symbols else list(SYMBOLS)
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        # 示例股票使用固定初始价，合成股票在 10~500 之间随机取初始价
+        prices = self.rng.uniform(10.0, 500.0, len(self.symbols))
+        for i, stock in enumerate(self.symbols[:len(SYMBOLS)]):
+            if stock in SYMBOL_IDS:
+                prices[i] = INITIAL_PRICES[SYMBOL_IDS[stock]]
+        self.prices = prices
+        # next_tick 使用的随机数缓冲，按块预先生成，避免每条行情都调用一次 NumPy
+        self._pending = []
     
-    # 随机选择一个股票
-    stock = random.choice(list(stocks.keys()))
-    # 生成随机价格变动（-2% 到 +2%）
-    change = random.uniform(-0.02, 0.02)
-    new_price = stocks[stock] * (1 + change)
-    stocks[stock] = new_price
+    def next_tick(self):
+        """生成一条行情，返回 (股票编号, 价格)，供逐条发布使用"""
+        if not self._pending:
+            symbol_ids = self.rng.integers(0, len(self.symbols), 4096).tolist()
+            returns = self.rng.normal(0.0, self.volatility, 4096).tolist()
+            self._pending = list(zip(symbol_ids, returns))
+            self._pending.reverse()
+        symbol_id, log_return = self._pending.pop()
+        price = float(self.prices[symbol_id]) * math.exp(log_return)
+        self.prices[symbol_id] = price
+        return symbol_id, price
+    
+    def next_batch(self, n):
+        """生成 n 条行情，返回按股票编号排序的 TICK_DTYPE 数组
+        
+        同一只股票在一批里出现多次时，价格按出现顺序依次累积变动，
+        批末的价格写回状态，下一批从这里继续游走。
+        """
+        symbol_ids = self.rng.integers(0, len(self.symbols), n)
+        log_returns = self.rng.normal(0.0, self.volatility, n)
+        
+        # 按股票编号稳定排序，同一股票的行情连续排列且保持生成顺序
+        order = np.argsort(symbol_ids, kind="stable")
+        symbol_ids = symbol_ids[order]
+        log_returns = log_returns[order]
+        
+        # 分组累计收益率：整体 cumsum 减去每组起点之前的累计值
+        starts = np.flatnonzero(np.r_[True, symbol_ids[1:] != symbol_ids[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+        cumulative = np.cumsum(log_returns)
+        offsets = np.repeat(cumulative[starts] - log_returns[starts], sizes)
+        prices = self.prices[symbol_ids] * np.exp(cumulative - offsets)
+        
+        # 每组最后一条就是该股票的最新价格
+        ends = starts + sizes - 1
+        self.prices[symbol_ids[ends]] = prices[ends]
+        
+        ticks = np.empty(n, dtype=TICK_DTYPE)
+        ticks["symbol_id"] = symbol_ids
+        ticks["price"] = prices
+        ticks["ts_ns"] = time.time_ns()
+        return ticks
+
+def split_by_symbol(ticks):
+    """把按股票编号排序的行情数组切成 (编号, 连续切片) 序列，切片不复制数据"""
+    symbol_ids = ticks["symbol_id"]
+    starts = np.flatnonzero(np.r_[True, symbol_ids[1:] != symbol_ids[:-1]])
+    ends = np.r_[starts[1:], len(ticks)]
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        yield int(symbol_ids[start]), ticks[start:end]
+
+# 示例股票的默认生成器，价格状态在多次调用之间保留
+_default_generator = StockTickGenerator(SYMBOLS, volatility=0.01)
+
+def generate_stock_data():
+    """生成模拟的股票数据（一条）"""
+    symbol_id, price = _default_generator.next_tick()
     
     return {
-        "stock": stock,
-        "price": round(new_price, 2),
+        "stock": SYMBOLS[symbol_id],
+        "price": round(price, 2),
         "timestamp": datetime.now().strftime("%H:%M:%S")
     }
 
-def main():
-    # 创建 ZMQ 上下文
-    context = zmq.Context()
+class TickBatcher:
+    """按股票代码把行情攒成多帧消息批量发送
     
-    # 创建 PUB 套接字
-    socket = context.socket(zmq.PUB)
+    消息格式：[股票代码, 编码标记, 负载帧...]（见 tick_codec.py）
+    第一帧是股票代码，SUB 端的前缀订阅只匹配第一帧，所以过滤行为不变。
+    某个代码攒够 batch_size 条，或者最早的一条已经等待超过 linger_ms，就整批发出。
+    文本编码每条行情一帧；二进制编码把整批记录拼成一帧，
+    二进制负载可以是多条记录的连续切片（count 表示其中的行情条数）。
+    """
+    
+    def __init__(self, socket, batch_size=100, linger_ms=10, codec=CODEC_TEXT):
+        # batch_size 小于 1 时 add() 每轮只能放进 0 条，会一直发送空消息
+        assert batch_size >= 1, f"batch_size 至少为 1，当前为 {batch_size}"
+        self.socket = socket
+        self.codec = codec
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        # 字典保持插入顺序，发送后会删除对应的键，所以第一个键就是等待最久的缓冲区
+        self.buffers = {}
+        self.buffered_ticks = {}
+        self.first_tick_time = {}
+        self.sent_messages = 0
+        self.sent_ticks = 0
+    
+    def add(self, stock, payload, count=1):
+        """加入行情，必要时触发发送
+        
+        count > 1 时 payload 是 count 条连续记录（可以按记录切片的数组），
+        超出当前缓冲区剩余容量的部分拆到下一条消息，每条消息最多 batch_size 条行情。
+        """
+        while True:
+            buffer = self.buffers.get(stock)
+            if buffer is None:
+                buffer = self.buffers[stock] = []
+                self.buffered_ticks[stock] = 0
+                self.first_tick_time[stock] = time.monotonic()
+            room = self.batch_size - self.buffered_ticks[stock]
+            if count <= room:
+                break
+            buffer.append(payload[:room])
+            self.buffered_ticks[stock] += room
+            payload, count = payload[room:], count - room
+            self._flush_stock(stock)
+        if not count:
+            return
+        buffer.append(payload)
+        self.buffered_ticks[stock] += count
+        
+        if self.buffered_ticks[stock] >= self.batch_size:
+            self._flush_stock(stock)
+        else:
+            self.flush_expired()
     
-    # 绑定到端口 5555
-    socket.bind("tcp://*:5555")
+    def flush_expired(self):
+        """发送等待时间超过 linger 的缓冲区"""
+        now = time.monotonic()
+        while self.buffers:
+            stock = next(iter(self.buffers))
+            if now - self.first_tick_time[stock] < self.linger:
+                break
+            self._flush_stock(stock)
     
-    print("股票数据发布者已启动...")
+    def flush(self):
+        """发送所有缓冲区"""
+        for stock in list(self.buffers):
+            self._flush_stock(stock)
     
-    while True:
+    def _flush_stock(self, stock):
+        payloads = self.buffers.pop(stock)
+        count = self.buffered_ticks.pop(stock)
+        del self.first_tick_time[stock]
+        if self.codec == CODEC_BINARY:
+            frames = [b"".join(payloads)]
+        else:
+            frames = payloads
+        self.socket.send_multipart([stock.encode('utf-8'), self.codec] + frames)
+        self.sent_messages += 1
+        self.sent_ticks += count
+
+def encode_payload(data, codec):
+    """按编码生成一条行情的负载"""
+    if codec == CODEC_BINARY:
+        return encode_tick(SYMBOL_IDS[data['stock']], data['price'], time.time_ns())
+    return f"{data['price']} {data['timestamp']}".encode('utf-8')
+
+def publish_single(socket, count=None, interval=1.0, verbose=True, codec=CODEC_TEXT):
+    """逐条发布：每条行情一次发送"""
+    sent = 0
+    while count is None or sent < count:
         # 生成股票数据
         data = generate_stock_data()
         
-        # 构建消息（格式：股票代码 价格 时间戳）
-        message = f"{data['stock']} {data['price']} {data['timestamp']}"
+        if codec == CODEC_TEXT:
+            # 构建消息（格式：股票代码 价格 时间戳）
+            message = f"{data['stock']} {data['price']} {data['timestamp']}"
+            
+            # 发送消息
+            socket.send_string(message)
+        else:
+            message = f"{data['stock']} {data['price']}"
+            socket.send_multipart([data['stock'].encode('utf-8'), codec, encode_payload(data, codec)])
+        sent += 1
+        if verbose:
+            print(f"已发布: {message}")
         
-        # 发送消息
-        socket.send_string(message)
-        print(f"已发布: {message}")
+        if interval:
+            time.sleep(interval)
+    return sent
+
+def publish_batched(socket, count=None, batch_size=100, linger_ms=10, verbose=True, codec=CODEC_TEXT,
+                    generator=None, chunk_size=10000):
+    """批量发布：每次向量化生成 chunk_size 条行情，按股票代码攒成多帧消息后再发送"""
+    generator = generator or StockTickGenerator()
+    symbols = generator.symbols
+    batcher = TickBatcher(socket, batch_size=batch_size, linger_ms=linger_ms, codec=codec)
+    generated = 0
+    report_time = time.monotonic()
+    report_ticks = 0
+    
+    while count is None or generated < count:
+        n = chunk_size if count is None else min(chunk_size, count - generated)
+        ticks = generator.next_batch(n)
+        generated += n
         
-        # 等待一秒
-        time.sleep(1)
+        if codec == CODEC_BINARY:
+            # 二进制编码直接把连续切片交给 batcher，发送时再拼接
+            for symbol_id, group in split_by_symbol(ticks):
+                batcher.add(symbols[symbol_id], group, len(group))
+        else:
+            timestamp = datetime.fromtimestamp(ticks["ts_ns"][0] / 1e9).strftime("%H:%M:%S")
+            for symbol_id, group in split_by_symbol(ticks):
+                stock = symbols[symbol_id]
+                for price in group["price"].tolist():
+                    batcher.add(stock, f"{price:.2f} {timestamp}".encode('utf-8'))
+        
+        # 高速模式下不逐条打印，每秒汇报一次速率
+        if verbose:
+            now = time.monotonic()
+            if now - report_time >= 1.0:
+                rate = (batcher.sent_ticks - report_ticks) / (now - report_time)
+                print(f"已发布 {batcher.sent_ticks} 条行情，{batcher.sent_messages} 条消息，"
+                      f"速率 {rate:,.0f} 条/秒")
+                report_time = now
+                report_ticks = batcher.sent_ticks
+    
+    batcher.flush()
+    return batcher.sent_ticks, batcher.sent_messages
+
+def main():
+    parser = argparse.ArgumentParser(description="股票数据发布者")
+    parser.add_argument("--mode", choices=["single", "batch"], default="single",
+                        help="single: 每秒发布一条；batch: 高速批量多帧发布")
+    parser.add_argument("--batch-size", type=int, default=100, help="每条多帧消息最多包含的行情数")
+    parser.add_argument("--linger-ms", type=float, default=10, help="缓冲区最长等待时间（毫秒）")
+    parser.add_argument("--count", type=int, default=None, help="发布的行情总数，默认无限")
+    parser.add_argument("--interval", type=float, default=1.0, help="single 模式的发布间隔（秒）")
+    parser.add_argument("--codec", choices=["text", "binary"], default="text",
+                        help="text: 文本行情；binary: 定长二进制记录")
+    parser.add_argument("--symbols", type=int, default=len(SYMBOLS),
+                        help="batch 模式的股票数量，超过 5 只时补充合成代码")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="batch 模式每次向量化生成的行情数")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size 至少为 1")
+    codec = CODEC_BINARY if args.codec == "binary" else CODEC_TEXT
+    symbols = make_symbols(args.symbols) if args.mode == "batch" else SYMBOLS
+    
+    # 创建 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    
+    # 创建 PUB 套接字
+    socket = context.socket(zmq.PUB)
+    
+    # 绑定到行情端口
+    socket.bind(config.bind_endpoint(PUB_PORT))
+    
+    # 在后台线程中提供编码协商服务
+    meta_thread = threading.Thread(target=serve_metadata,
+                                   args=(context, config.bind_endpoint(META_PORT), codec, symbols),
+                                   daemon=True)
+    meta_thread.start()
+    
+    print(f"股票数据发布者已启动，编码: {codec.decode()}...")
+    
+    if args.mode == "single":
+        publish_single(socket, count=args.count, interval=args.interval, codec=codec)
+    else:
+        ticks, messages = publish_batched(socket, count=args.count,
+                                          batch_size=args.batch_size,
+                                          linger_ms=args.linger_ms,
+                                          codec=codec,
+                                          generator=StockTickGenerator(symbols),
+                                          chunk_size=args.chunk_size)
+        print(f"发布完成: {ticks} 条行情，{messages} 条消息")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,41 +1,71 @@
+import os
 import zmq
 import sys
+from datetime import datetime
+
+from tick_codec import CODEC_BINARY, PUB_PORT, META_PORT, check_message, decode_message, negotiate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from zmq_config import ZmqConfig
+
+def print_tick(stock, price, timestamp, last_price):
+    """打印一条行情及其相对上一条的涨跌幅"""
+    if last_price is not None:
+        change = price - last_price
+        change_percent = (change / last_price) * 100
+        change_symbol = "↑" if change > 0 else "↓" if change < 0 else "="
+        print(f"[{timestamp}] {stock}: ${price:.2f} {change_symbol} {abs(change_percent):.2f}%")
+    else:
+        print(f"[{timestamp}] {stock}: ${price:.2f}")
 
 def main():
     # 创建 ZMQ 上下文
-    context = zmq.Context()
+    config = ZmqConfig.from_env()
+    context = config.context()
     
     # 创建 SUB 套接字
     socket = context.socket(zmq.SUB)
     
-    # 连接到发布者
-    socket.connect("tcp://localhost:5555")
+    # 连接到发布者（第二个参数可以指定端口，例如连接最新值缓存代理的 5558）
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else PUB_PORT
+    socket.connect(config.connect_endpoint(port))
     
     # 获取要订阅的股票代码
     stock_code = sys.argv[1] if len(sys.argv) > 1 else "AAPL"
     socket.setsockopt_string(zmq.SUBSCRIBE, stock_code)
     
-    print(f"股票订阅者已启动，正在订阅股票: {stock_code}")
+    # 与发布者协商编码（发布者没有协商服务时按消息里的编码标记解码）
+    codec, symbols = negotiate(context, config.connect_endpoint(META_PORT))
+    codec_name = codec.decode() if codec else "按消息标记"
+    if symbols is not None and stock_code not in symbols:
+        sys.exit(f"发布者没有股票 {stock_code}，可订阅: {', '.join(symbols[:20])}")
+    
+    print(f"股票订阅者已启动，正在订阅股票: {stock_code}，编码: {codec_name}")
     
     # 用于计算价格变化
     last_price = None
     
     while True:
-        # 接收消息
-        message = socket.recv_string()
-        stock, price, timestamp = message.split()
-        price = float(price)
-        
-        # 计算价格变化
-        if last_price is not None:
-            change = price - last_price
-            change_percent = (change / last_price) * 100
-            change_symbol = "↑" if change > 0 else "↓" if change < 0 else "="
-            print(f"[{timestamp}] {stock}: ${price:.2f} {change_symbol} {abs(change_percent):.2f}%")
-        else:
-            print(f"[{timestamp}] {stock}: ${price:.2f}")
+        # 接收消息（single 文本模式是一帧，其余是 [股票代码, 编码, 负载...] 多帧）
+        # copy=False 时二进制负载直接在帧的内存上解码，不复制
+        frames = socket.recv_multipart(copy=False)
+        stock, message_codec, ticks = decode_message(frames)
+        # 订阅是前缀匹配，"A" 也会收到 "AAPL"；与协商结果不符的消息丢弃并提示
+        if stock != stock_code:
+            continue
+        problem = check_message(stock, message_codec, ticks, codec, symbols)
+        if problem:
+            print(f"丢弃 {stock} 的消息: {problem}", file=sys.stderr)
+            continue
+        if message_codec == CODEC_BINARY:
+            ticks = [(tick["price"], datetime.fromtimestamp(tick["ts_ns"] / 1e9).strftime("%H:%M:%S.%f")[:-3])
+                     for tick in ticks]
         
-        last_price = price
+        for price, timestamp in ticks:
+            # 计算价格变化
+            print_tick(stock, price, timestamp, last_price)
+            
+            last_price = price
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""股票行情编解码
+
+batch / 二进制模式下的消息格式：[股票代码, 编码标记, 负载帧...]
+- text: 每个负载帧是一条 "价格 时间戳" 文本
+- bin1: 一个负载帧，由若干条定长二进制记录拼接而成
+
+single 文本模式仍然是一帧 "股票代码 价格 时间戳"，保持与最初的示例兼容。
+"""
+
+import struct
+
+import numpy as np
+import zmq
+
+CODEC_TEXT = b"text"
+CODEC_BINARY = b"bin1"
+SUPPORTED_CODECS = (CODEC_BINARY, CODEC_TEXT)
+
+# 定长记录：股票编号(uint32) + 价格(float64) + 纳秒时间戳(int64)，小端无填充，共 20 字节
+TICK_DTYPE = np.dtype([("symbol_id", "<u4"), ("price", "<f8"), ("ts_ns", "<i8")])
+TICK_STRUCT = struct.Struct("<Idq")
+assert TICK_DTYPE.itemsize == TICK_STRUCT.size
+
+# 发布者的行情端口和元数据端口，订阅者通过元数据端口协商编码并获取股票编号表
+PUB_PORT = 5555
+META_PORT = 5557
+
+def encode_tick(symbol_id, price, ts_ns):
+    """把一条行情打包成二进制记录"""
+    return TICK_STRUCT.pack(symbol_id, price, ts_ns)
+
+def decode_ticks(frame):
+    """把收到的二进制帧零拷贝地解释为行情数组
+    
+    frame 可以是 recv_multipart(copy=False) 得到的 zmq.Frame，也可以是 bytes。
+    返回的数组直接引用帧的内存（只读），不会复制数据。
+    """
+    buffer = frame.buffer if isinstance(frame, zmq.Frame) else frame
+    return np.frombuffer(buffer, dtype=TICK_DTYPE)
+
+def _frame_bytes(frame):
+    return frame.bytes if isinstance(frame, zmq.Frame) else frame
+
+def decode_message(frames):
+    """解码一条消息，返回 (股票代码, 编码, 行情)
+    
+    文本编码返回 [(价格, 时间戳字符串), ...]，二进制编码返回 TICK_DTYPE 数组。
+    """
+    if len(frames) == 1:
+        stock, price, timestamp = _frame_bytes(frames[0]).decode('utf-8').split()
+        return stock, CODEC_TEXT, [(float(price), timestamp)]
+    
+    stock = _frame_bytes(frames[0]).decode('utf-8')
+    codec = _frame_bytes(frames[1])
+    if codec == CODEC_BINARY:
+        return stock, codec, decode_ticks(frames[2])
+    if codec == CODEC_TEXT:
+        ticks = []
+        for frame in frames[2:]:
+            price, timestamp = _frame_bytes(frame).decode('utf-8').split()
+            ticks.append((float(price), timestamp))
+        return stock, codec, ticks
+    raise ValueError(f"未知的行情编码: {codec!r}")
+
+def check_message(stock, message_codec, ticks, codec=None, symbols=None):
+    """按协商结果检查一条解码后的消息，有问题时返回原因，否则返回 None
+    
+    codec 和 symbols 是 negotiate() 的返回值；没有协商成功（None）时不做对应的检查。
+    二进制记录里带的是股票编号，用编号表确认它们都属于消息的股票代码。
+    """
+    if codec is not None and message_codec != codec:
+        return f"编码标记 {message_codec.decode()} 与协商的 {codec.decode()} 不一致"
+    if symbols is not None and message_codec == CODEC_BINARY and len(ticks):
+        ids = ticks["symbol_id"]
+        first = int(ids[0])
+        if ids.min() != ids.max() or first >= len(symbols) or symbols[first] != stock:
+            return f"二进制记录的股票编号与 {stock} 不符"
+    return None
+
+def count_ticks(frames):
+    """不解码负载，只统计一条消息里的行情条数"""
+    if len(frames) == 1:
+        return 1
+    if _frame_bytes(frames[1]) == CODEC_BINARY:
+        return len(frames[2]) // TICK_DTYPE.itemsize
+    return len(frames) - 2
+
+def serve_metadata(context, endpoint, codec, symbols):
+    """发布者端的协商服务（REP），在后台线程中运行
+    
+    订阅者发送它支持的编码列表（逗号分隔），如果发布者使用的编码在列表中，
+    就回复编码和股票编号表，否则回复错误信息。
+    """
+    socket = context.socket(zmq.REP)
+    socket.bind(endpoint)
+    while True:
+        try:
+            accepted = socket.recv().split(b",")
+        except zmq.ContextTerminated:
+            break
+        if codec in accepted:
+            reply = {"codec": codec.decode(), "symbols": symbols}
+        else:
+            reply = {"error": f"发布者使用 {codec.decode()} 编码，订阅者不支持"}
+        socket.send_json(reply)
+    socket.close()
+
+def negotiate(context, endpoint, accepted=SUPPORTED_CODECS, timeout_ms=1000):
+    """订阅者端：向发布者协商编码，返回 (编码, 股票编号表)
+    
+    订阅者用编码表确认要订阅的股票存在，用编码和编号表通过 check_message() 检查收到的消息。
+    发布者没有启动协商服务时（例如旧版本），返回 (None, None)，
+    之后按每条消息里的编码标记解码。
+    """
+    socket = context.socket(zmq.REQ)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.setsockopt(zmq.RCVTIMEO, timeout_ms)
+    socket.connect(endpoint)
+    try:
+        socket.send(b",".join(accepted))
+        reply = socket.recv_json()
+    except zmq.Again:
+        return None, None
+    finally:
+        socket.close()
+    
+    if "error" in reply:
+        raise RuntimeError(reply["error"])
+    return reply["codec"].encode(), reply["symbols"]
\ No newline at end of file
@@ -0,0 +1,127 @@
+import os
+import sys
+import zmq
+import time
+import random
+import asyncio
+import argparse
+import zmq.asyncio
+import socket as pysocket
+from zmq.utils.monitor import recv_monitor_message
+
+from protocol import (VENTILATOR_PORT, SINK_PORT, SYNC_PORT, parse_task,
+                      ready_message, credit_message, result_message)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+async def process_task(frames, sink, worker_id, verbose=True):
+    """处理一个任务并把结果发给收集器；任务在 await 期间让出事件循环"""
+    batch_id, task_id, message = parse_task(frames)
+    if verbose:
+        print(f"收到任务: {message}")
+    
+    # 模拟 IO 型任务：随机耗时 0.5~2 秒
+    start = time.perf_counter()
+    await asyncio.sleep(random.uniform(0.5, 2.0))
+    elapsed = time.perf_counter() - start
+    if verbose:
+        print(f"任务处理完成: {message}")
+    
+    # 发送结果
+    await sink.send_multipart(result_message(batch_id, task_id, worker_id, elapsed))
+
+class AsyncWorker:
+    """一个进程、一个线程同时处理最多 concurrency 个任务
+    
+    同步的 worker.py 一次只能处理一个任务，要并行就得开多个进程；IO 型任务大部分时间在等待，
+    这里每个任务是一个 asyncio 任务，用信号量限制同时处理的数量，超出的任务留在 ZMQ 的接收队列里。
+    PULL 模式与 worker.py 一样在握手后向推送者报到；信用模式下发放的信用数就是 concurrency。
+    """
+    
+    def __init__(self, context, config, concurrency, credit=False, verbose=True):
+        self.context = context
+        self.concurrency = concurrency
+        self.credit = credit
+        self.verbose = verbose
+        self.worker_id = f"{pysocket.gethostname()}-{os.getpid()}"
+        self.slots = asyncio.Semaphore(concurrency)
+        self.tasks = set()
+        
+        # 创建 PUSH 套接字，把结果发给收集器
+        self.sink = context.socket(zmq.PUSH)
+        self.sink.connect(config.connect_endpoint(SINK_PORT))
+        
+        if credit:
+            # 创建 DEALER 套接字，推送者的 ROUTER 按身份把任务发过来
+            self.socket = context.socket(zmq.DEALER)
+            self.sync = None
+        else:
+            # 创建 PULL 套接字，握手完成后通过 PUSH 套接字向推送者报到
+            self.socket = context.socket(zmq.PULL)
+            self.sync = context.socket(zmq.PUSH)
+            self.sync.setsockopt(zmq.LINGER, 0)
+            self.sync.connect(config.connect_endpoint(SYNC_PORT))
+        self.socket.connect(config.connect_endpoint(VENTILATOR_PORT))
+        self.monitor = self.socket.get_monitor_socket(zmq.EVENT_HANDSHAKE_SUCCEEDED)
+    
+    async def watch_handshakes(self):
+        """每次与推送者握手成功后报到（信用模式下重新发放信用）"""
+        while True:
+            await recv_monitor_message(self.monitor)
+            if self.credit:
+                await self.socket.send_multipart(credit_message(self.worker_id, self.concurrency))
+            else:
+                await self.sync.send_multipart(ready_message(self.worker_id))
+            if self.verbose:
+                print(f"已连接推送者，可以同时处理 {self.concurrency} 个任务")
+    
+    async def run_task(self, frames):
+        try:
+            await process_task(frames, self.sink, self.worker_id, self.verbose)
+            if self.credit:
+                await self.socket.send_multipart(credit_message(self.worker_id, 1))
+        finally:
+            self.slots.release()
+    
+    async def run(self):
+        watcher = asyncio.create_task(self.watch_handshakes())
+        try:
+            while True:
+                # 有空位才接收下一个任务
+                await self.slots.acquire()
+                frames = await self.socket.recv_multipart()
+                task = asyncio.create_task(self.run_task(frames))
+                # 保留任务的引用，否则可能在完成前被垃圾回收
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+        finally:
+            watcher.cancel()
+
+async def run(args):
+    # 创建 asyncio 版本的 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context(zmq.asyncio.Context)
+    worker = AsyncWorker(context, config, args.concurrency, args.credit, not args.quiet)
+    print(f"异步工作器 {worker.worker_id} 已启动，最多同时处理 {args.concurrency} 个任务...")
+    try:
+        await worker.run()
+    finally:
+        context.destroy(linger=0)
+
+def main():
+    parser = argparse.ArgumentParser(description="PUSH/PULL 异步工作器（zmq.asyncio）")
+    parser.add_argument("--concurrency", type=int, default=100, help="同时处理的任务数上限")
+    parser.add_argument("--credit", action="store_true",
+                        help="基于信用的流控，信用数等于 --concurrency（推送者也要用 --credit 启动）")
+    parser.add_argument("--quiet", action="store_true", help="不打印每个任务")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("工作器已停止")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,162 @@
+import os
+import sys
+import zmq
+import time
+import argparse
+import threading
+
+import numpy as np
+
+from ventilator import CreditDispatcher
+from protocol import RESULT, parse_task, task_message, credit_message, result_message
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+TASKS = "inproc://tasks"
+RESULTS = "inproc://results"
+
+def make_durations(count, mean_ms, skew, seed):
+    """对数正态分布的任务耗时（毫秒），均值固定为 mean_ms，skew 是对数标准差，越大长尾越重"""
+    rng = np.random.default_rng(seed)
+    # 对数正态分布的均值是 exp(mu + sigma^2 / 2)
+    mu = np.log(mean_ms) - skew ** 2 / 2
+    return rng.lognormal(mu, skew, count) if skew else np.full(count, float(mean_ms))
+
+def process(frames, sink, worker_id, factor):
+    """按任务描述里的耗时 sleep，factor > 1 表示慢工作器"""
+    batch_id, task_id, duration = parse_task(frames)
+    start = time.perf_counter()
+    time.sleep(float(duration) * factor / 1000)
+    sink.send_multipart(result_message(batch_id, task_id, worker_id, time.perf_counter() - start))
+
+def pull_worker(context, worker_id, factor, ready, stop):
+    """PULL 工作器：PUSH 轮流分发任务"""
+    socket = context.socket(zmq.PULL)
+    socket.connect(TASKS)
+    sink = context.socket(zmq.PUSH)
+    sink.connect(RESULTS)
+    ready.release()
+    while not stop.is_set():
+        if not socket.poll(100):
+            continue
+        process(socket.recv_multipart(), sink, worker_id, factor)
+    socket.close()
+    sink.close()
+
+def credit_worker(context, worker_id, factor, credits, ready, stop):
+    """DEALER 工作器：先发放 credits 个信用，每完成一个任务归还一个"""
+    socket = context.socket(zmq.DEALER)
+    socket.connect(TASKS)
+    sink = context.socket(zmq.PUSH)
+    sink.connect(RESULTS)
+    socket.send_multipart(credit_message(worker_id, credits))
+    ready.release()
+    while not stop.is_set():
+        if not socket.poll(100):
+            continue
+        process(socket.recv_multipart(), sink, worker_id, factor)
+        socket.send_multipart(credit_message(worker_id, 1))
+    socket.close()
+    sink.close()
+
+def run_once(durations, factors, credits, config):
+    """跑一个批次，返回 (总耗时, 每个工作器的忙碌时间)；credits 为 0 表示 PUSH 轮询
+    
+    factors 是每个工作器的耗时倍数，长度就是工作器数。
+    """
+    context = config.context()
+    results = context.socket(zmq.PULL)
+    results.bind(RESULTS)
+    if credits:
+        socket = context.socket(zmq.ROUTER)
+        dispatcher = CreditDispatcher(socket)
+        send = dispatcher.send
+    else:
+        socket = context.socket(zmq.PUSH)
+        send = socket.send_multipart
+    socket.bind(TASKS)
+    
+    # inproc 的 connect 在 bind 之后是同步完成的，所有工作器连上（信用模式下已发出信用）之后再发任务
+    ready = threading.Semaphore(0)
+    stop = threading.Event()
+    threads = []
+    for i, factor in enumerate(factors):
+        worker_id = f"worker-{i}"
+        if credits:
+            t = threading.Thread(target=credit_worker, args=(context, worker_id, factor, credits, ready, stop))
+        else:
+            t = threading.Thread(target=pull_worker, args=(context, worker_id, factor, ready, stop))
+        t.start()
+        threads.append(t)
+    for _ in factors:
+        ready.acquire()
+    
+    busy = {}
+    received = 0
+    start = time.perf_counter()
+    for task_id, duration in enumerate(durations):
+        send(task_message("bench", task_id, f"{duration:.3f}"))
+        # 信用模式下 send 会阻塞等待信用，期间顺便收结果，避免结果管道积压
+        while results.poll(0):
+            collect(results, busy)
+            received += 1
+    while received < len(durations):
+        collect(results, busy)
+        received += 1
+    makespan = time.perf_counter() - start
+    
+    stop.set()
+    for t in threads:
+        t.join()
+    socket.close()
+    results.close()
+    context.term()
+    return makespan, busy
+
+def collect(results, busy):
+    frames = results.recv_multipart()
+    assert frames[0] == RESULT
+    worker_id, elapsed = frames[3].decode('utf-8'), float(frames[4])
+    busy[worker_id] = busy.get(worker_id, 0.0) + elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="PUSH 轮询与基于信用的流控在任务耗时倾斜时的总耗时对比")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--slow-workers", type=int, default=0, help="慢工作器数量")
+    parser.add_argument("--slow-factor", type=float, default=4.0, help="慢工作器处理同一个任务的耗时倍数")
+    parser.add_argument("--tasks", type=int, default=500, help="每个批次的任务数")
+    parser.add_argument("--mean-ms", type=float, default=5, help="任务平均耗时（毫秒）")
+    parser.add_argument("--skews", default="0,0.5,1.0,1.5", help="任务耗时的对数标准差，逗号分隔")
+    parser.add_argument("--credits", default="1,2,4", help="每个工作器发放的信用数，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="每种组合重复的次数，取总耗时的中位数")
+    parser.add_argument("--seed", type=int, default=1)
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    skews = [float(s) for s in args.skews.split(",")]
+    credit_levels = [int(c) for c in args.credits.split(",")]
+    config = ZmqConfig.from_args(args)
+    
+    factors = [args.slow_factor if i < args.slow_workers else 1.0 for i in range(args.workers)]
+    # 每个工作器的处理速度，用于计算总耗时的下界
+    speed = sum(1 / f for f in factors)
+    
+    print(f"{args.workers} 个工作器（其中 {args.slow_workers} 个慢 {args.slow_factor} 倍），"
+          f"{args.tasks} 个任务，平均耗时 {args.mean_ms}ms，每种组合取 {args.repeat} 次的中位数")
+    print(f"{'倾斜':>6}{'分发方式':>12}{'总耗时(s)':>12}{'/下界':>8}{'最忙/最闲':>10}")
+    for skew in skews:
+        durations = make_durations(args.tasks, args.mean_ms, skew, args.seed)
+        # 总耗时的下界：总工作量按速度分给所有工作器，且不能短于最长的单个任务
+        bound = max(durations.sum() / speed, durations.max()) / 1000
+        for credits in [0] + credit_levels:
+            runs = sorted((run_once(durations, factors, credits, config) for _ in range(args.repeat)),
+                          key=lambda r: r[0])
+            makespan, busy = runs[len(runs) // 2]
+            mode = f"credit={credits}" if credits else "push"
+            loads = list(busy.values()) + [0.0] * (args.workers - len(busy))
+            imbalance = max(loads) / min(loads) if min(loads) else float("inf")
+            print(f"{skew:>6.1f}{mode:>12}{makespan:>12.3f}{makespan / bound:>8.2f}{imbalance:>10.2f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,146 @@
+import os
+import sys
+import zmq
+import signal
+import argparse
+import threading
+import multiprocessing
+
+from sink import BatchSink, print_report
+from worker import HANDLERS, run_worker
+from protocol import SINK_PORT
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+def available_cpus():
+    """当前进程可以使用的 CPU 编号（受 taskset / cgroup 限制）"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def worker_process(cpu, handler, credit, iterations, config):
+    """工作器进程入口：可选绑定 CPU，收到 SIGTERM 时正常退出"""
+    # SIGTERM 默认直接杀死进程，改成抛出 SystemExit，让 run_worker 关闭 Context
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    # Ctrl+C 由启动器统一处理
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    run_worker(handler, credit, iterations, verbose=False, config=config)
+
+class Supervisor:
+    """启动并看管 N 个工作器进程，意外退出的进程按原来的 CPU 重启"""
+    
+    def __init__(self, count, cpus, args, max_restarts=5):
+        # spawn：子进程不继承父进程的 ZMQ Context 和套接字
+        self.mp = multiprocessing.get_context("spawn")
+        self.cpus = cpus
+        self.args = args
+        self.max_restarts = max_restarts
+        self.processes = [None] * count
+        self.restarts = [0] * count
+    
+    def start(self, slot):
+        cpu = self.cpus[slot % len(self.cpus)] if self.cpus else None
+        p = self.mp.Process(target=worker_process, args=(cpu,) + self.args,
+                            name=f"worker-{slot}", daemon=True)
+        p.start()
+        self.processes[slot] = p
+        pinned = f"，绑定 CPU {cpu}" if cpu is not None else ""
+        print(f"工作器 {slot} 已启动（pid {p.pid}{pinned}）")
+    
+    def start_all(self):
+        for slot in range(len(self.processes)):
+            self.start(slot)
+    
+    def check(self):
+        """重启意外退出的进程；重启次数用完的进程不再重启"""
+        for slot, p in enumerate(self.processes):
+            if p is None or p.is_alive():
+                continue
+            if self.restarts[slot] >= self.max_restarts:
+                print(f"工作器 {slot} 已重启 {self.restarts[slot]} 次，不再重启")
+                self.processes[slot] = None
+                continue
+            self.restarts[slot] += 1
+            print(f"工作器 {slot}（pid {p.pid}）意外退出，退出码 {p.exitcode}，"
+                  f"第 {self.restarts[slot]} 次重启")
+            self.start(slot)
+    
+    def shutdown(self, timeout=5.0):
+        """先发 SIGTERM 让工作器自己退出，超时后强制结束"""
+        alive = [p for p in self.processes if p is not None and p.is_alive()]
+        for p in alive:
+            p.terminate()
+        for p in alive:
+            p.join(timeout)
+            if p.is_alive():
+                p.kill()
+                p.join()
+        print(f"{len(alive)} 个工作器已退出，共重启 {sum(self.restarts)} 次")
+
+def collect_batches(socket, batches, timeout, done):
+    """在后台线程里运行结果收集器，收齐 batches 个批次后通知主线程"""
+    sink = BatchSink(socket)
+    try:
+        for _ in range(batches):
+            batch_id, total, workers, started = sink.wait_for_batch()
+            print(f"批次 {batch_id} 开始，共 {total} 个任务，{workers} 个工作器已报到")
+            print_report(sink.collect(batch_id, total, started, timeout=timeout, expected_workers=workers))
+    except zmq.ContextTerminated:
+        pass
+    finally:
+        socket.close()
+        done.set()
+
+def main():
+    parser = argparse.ArgumentParser(description="PUSH/PULL 工作器启动器：多进程工作器 + 结果收集器")
+    parser.add_argument("--workers", type=int, default=len(available_cpus()), help="工作器进程数，默认等于可用的 CPU 数")
+    parser.add_argument("--pin", action="store_true", help="把每个工作器进程绑定到一个 CPU（仅 Linux）")
+    parser.add_argument("--handler", choices=sorted(HANDLERS), default="cpu", help="任务处理函数")
+    parser.add_argument("--iterations", type=int, default=2000000, help="cpu 处理函数每个任务的循环次数")
+    parser.add_argument("--credit", type=int, default=0, help="基于信用的流控（推送者也要用 --credit 启动）")
+    parser.add_argument("--batches", type=int, default=1, help="收集多少个批次后关闭所有工作器")
+    parser.add_argument("--timeout", type=float, default=10.0, help="多少秒没有新结果就认为批次未完成")
+    parser.add_argument("--max-restarts", type=int, default=5, help="每个工作器最多重启的次数")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    cpus = None
+    if args.pin:
+        if hasattr(os, "sched_setaffinity"):
+            cpus = available_cpus()
+        else:
+            print("当前平台不支持绑定 CPU，忽略 --pin")
+    
+    # 创建 ZMQ 上下文，工作器进程使用同一份配置
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    
+    # 收集器与 sink.py 相同：PULL 绑定收集器端口
+    socket = context.socket(zmq.PULL)
+    socket.bind(config.bind_endpoint(SINK_PORT))
+    
+    done = threading.Event()
+    collector = threading.Thread(target=collect_batches, args=(socket, args.batches, args.timeout, done))
+    collector.start()
+    
+    supervisor = Supervisor(args.workers, cpus, (args.handler, args.credit, args.iterations, config),
+                            max_restarts=args.max_restarts)
+    supervisor.start_all()
+    print(f"启动器已启动，{args.workers} 个工作器，等待推送者发送 {args.batches} 个批次...")
+    
+    try:
+        while not done.wait(0.5):
+            supervisor.check()
+    except KeyboardInterrupt:
+        print("收到中断，正在关闭...")
+    finally:
+        supervisor.shutdown()
+        # 终止 Context 会让还在等待的收集器线程退出
+        context.term()
+        collector.join()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""PUSH/PULL 流水线中推送者、工作器和结果收集器之间的消息格式
+
+工作器的 PULL 套接字每次与推送者完成握手后，向推送者的同步端口报到：
+    [READY, 工作器 ID]
+推送者等到指定数量的工作器报到后才开始发任务，避免先连上的工作器拿走开头的所有任务。
+推送者在发任务之前先向收集器（sink.py）发送批次开始信号：
+    [BATCH, 批次 ID, 任务数, 报到的工作器数]
+任务消息（推送者 -> 工作器）：
+    [批次 ID, 任务 ID, 任务描述]
+大负载模式（--payload-size）在最后多一个二进制负载帧，开头 8 字节是任务 ID（见 zero_copy.py）：
+    [批次 ID, 任务 ID, 任务描述, 负载]
+结果消息（工作器 -> 收集器）：
+    [RESULT, 批次 ID, 任务 ID, 工作器 ID, 处理耗时(秒)]
+数字都用 ASCII 文本编码，方便用 print 调试。
+
+基于信用的流控模式（--credit）下，推送者绑定 ROUTER、工作器用 DEALER 连接，
+工作器启动时发放 N 个信用，之后每完成一个任务归还一个：
+    [CREDIT, 工作器 ID, 信用数]
+推送者只把任务发给还有信用的工作器，第一条信用消息同时充当报到。
+"""
+
+READY = b"READY"
+BATCH = b"BATCH"
+RESULT = b"RESULT"
+CREDIT = b"CREDIT"
+
+# 推送者、收集器和推送者同步端口，地址由 ZmqConfig 的 bind_endpoint / connect_endpoint 生成
+VENTILATOR_PORT = 5555
+SINK_PORT = 5556
+SYNC_PORT = 5557
+
+def ready_message(worker_id):
+    return [READY, worker_id.encode('utf-8')]
+
+def credit_message(worker_id, credits):
+    return [CREDIT, worker_id.encode('utf-8'), str(credits).encode('utf-8')]
+
+def batch_message(batch_id, total, workers=0):
+    return [BATCH, batch_id.encode('utf-8'), str(total).encode('utf-8'), str(workers).encode('utf-8')]
+
+def task_message(batch_id, task_id, description):
+    return [batch_id.encode('utf-8'), str(task_id).encode('utf-8'), description.encode('utf-8')]
+
+def parse_task(frames):
+    """返回 (批次 ID, 任务 ID, 任务描述)；frames 可以是 bytes，也可以是 copy=False 收到的 zmq.Frame"""
+    batch_id, task_id, description = (bytes(frame) for frame in frames[:3])
+    return batch_id.decode('utf-8'), int(task_id), description.decode('utf-8')
+
+def task_payload(frames):
+    """大负载模式的负载帧，没有负载时返回 None"""
+    return frames[3] if len(frames) > 3 else None
+
+def result_message(batch_id, task_id, worker_id, elapsed):
+    return [RESULT, batch_id.encode('utf-8'), str(task_id).encode('utf-8'),
+            worker_id.encode('utf-8'), f"{elapsed:.6f}".encode('utf-8')]
\ No newline at end of file
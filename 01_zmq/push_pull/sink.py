@@ -0,0 +1,183 @@
+import os
+import sys
+import zmq
+import time
+import argparse
+import statistics
+from collections import defaultdict, deque
+
+from protocol import BATCH, RESULT, SINK_PORT
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+class BatchSink:
+    """结果收集器：按批次收集工作器的结果，批次完成后给出耗时统计
+    
+    推送者在发任务之前先发批次开始信号，收集器以收到信号的时间作为批次开始时间。
+    工作器的结果可能比开始信号先到（不同的连接之间没有顺序保证），先按批次 ID 暂存；
+    上一个批次还没收齐时下一个批次的开始信号也可能先到，同样暂存。
+    """
+    
+    def __init__(self, socket):
+        self.socket = socket
+        # 批次 ID -> [(收到时间, 任务 ID, 工作器 ID, 处理耗时), ...]
+        self.early = defaultdict(list)
+        # 收集上一个批次期间收到的开始信号：(批次 ID, 任务数, 工作器数, 开始时间)
+        self.batches = deque()
+    
+    def recv(self, timeout=None):
+        """接收一条消息；超时返回 None"""
+        if not self.socket.poll(None if timeout is None else timeout * 1000):
+            return None
+        return self.socket.recv_multipart()
+    
+    def wait_for_batch(self):
+        """等待批次开始信号，返回 (批次 ID, 任务数, 报到的工作器数, 开始时间)"""
+        while not self.batches:
+            frames = self.recv()
+            if frames[0] == BATCH:
+                self.start(frames)
+            elif frames[0] == RESULT:
+                self.stash(frames)
+        return self.batches.popleft()
+    
+    def start(self, frames):
+        _, batch_id, total, workers = frames
+        self.batches.append((batch_id.decode('utf-8'), int(total), int(workers), time.perf_counter()))
+    
+    def stash(self, frames):
+        _, batch_id, task_id, worker_id, elapsed = frames
+        self.early[batch_id.decode('utf-8')].append(
+            (time.perf_counter(), int(task_id), worker_id.decode('utf-8'), float(elapsed)))
+    
+    def collect(self, batch_id, total, started, timeout=10.0, expected_workers=0):
+        """收集一个批次的全部结果；timeout 秒内没有新结果就放弃，返回统计报告"""
+        results = {}
+        for received, task_id, worker_id, elapsed in self.early.pop(batch_id, []):
+            results[task_id] = (received, worker_id, elapsed)
+        
+        while len(results) < total:
+            frames = self.recv(timeout)
+            if frames is None:
+                print(f"{timeout} 秒内没有收到新结果，批次未完成")
+                break
+            if frames[0] == BATCH:
+                self.start(frames)
+                continue
+            if frames[1].decode('utf-8') != batch_id:
+                # 上一个批次的迟到结果，或者下一个批次提前到达的结果
+                self.stash(frames)
+                continue
+            task_id = int(frames[2])
+            results[task_id] = (time.perf_counter(), frames[3].decode('utf-8'), float(frames[4]))
+        
+        return summarize(batch_id, total, started, results, expected_workers)
+
+def distribution(results, expected_workers=0):
+    """任务在工作器之间分布得是否均匀
+    
+    expected_workers 是推送者那边报到的工作器数，一个任务都没拿到的工作器按 0 计入。
+    first_round 是前 n 个任务（n 为工作器数）分到了几个不同的工作器：
+    慢连接问题会让开头的任务全部落到最先连上的工作器上。
+    """
+    counts = defaultdict(int)
+    for _, worker_id, _ in results.values():
+        counts[worker_id] += 1
+    n = max(expected_workers, len(counts))
+    if not n:
+        return None
+    per_worker = list(counts.values()) + [0] * (n - len(counts))
+    mean = statistics.mean(per_worker)
+    first = sorted(results)[:n]
+    return {
+        "workers": n,
+        "idle_workers": n - len(counts),
+        "min": min(per_worker),
+        "max": max(per_worker),
+        "mean": mean,
+        "cv": statistics.pstdev(per_worker) / mean if mean else 0.0,
+        "max_over_mean": max(per_worker) / mean if mean else 0.0,
+        "first_round": len({results[task_id][1] for task_id in first}),
+    }
+
+def summarize(batch_id, total, started, results, expected_workers=0):
+    """整理批次统计：总耗时、每个工作器的吞吐量和利用率、拖后腿的工作器和任务"""
+    wall = max((r[0] for r in results.values()), default=started) - started
+    workers = {}
+    for task_id, (received, worker_id, elapsed) in results.items():
+        w = workers.setdefault(worker_id, {"tasks": 0, "busy": 0.0, "finished": 0.0})
+        w["tasks"] += 1
+        w["busy"] += elapsed
+        w["finished"] = max(w["finished"], received - started)
+    for w in workers.values():
+        w["throughput"] = w["tasks"] / wall if wall else 0.0
+        w["utilization"] = w["busy"] / wall if wall else 0.0
+    
+    # 拖后腿的工作器：完成时间明显晚于其他工作器的中位数
+    median_finish = statistics.median(w["finished"] for w in workers.values()) if workers else 0.0
+    stragglers = sorted((wid for wid, w in workers.items() if w["finished"] > median_finish * 1.25),
+                        key=lambda wid: -workers[wid]["finished"])
+    slowest = sorted(results.items(), key=lambda item: -item[1][2])[:5]
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        "completed": len(results),
+        "missing": sorted(set(range(total)) - set(results)),
+        "wall": wall,
+        "throughput": len(results) / wall if wall else 0.0,
+        "workers": workers,
+        "median_finish": median_finish,
+        "stragglers": stragglers,
+        "slowest_tasks": [(task_id, worker_id, elapsed) for task_id, (_, worker_id, elapsed) in slowest],
+        "distribution": distribution(results, expected_workers),
+    }
+
+def print_report(report):
+    print(f"批次 {report['batch_id']}：完成 {report['completed']}/{report['total']} 个任务，"
+          f"总耗时 {report['wall']:.2f} 秒，吞吐量 {report['throughput']:.1f} 任务/秒")
+    print(f"{'工作器':<24}{'任务数':>8}{'任务/秒':>10}{'利用率':>8}{'完成时间(s)':>12}")
+    for worker_id, w in sorted(report["workers"].items()):
+        print(f"{worker_id:<24}{w['tasks']:>8}{w['throughput']:>10.2f}"
+              f"{w['utilization']:>8.0%}{w['finished']:>12.2f}")
+    print(f"工作器完成时间中位数 {report['median_finish']:.2f} 秒，"
+          f"尾部等待 {report['wall'] - report['median_finish']:.2f} 秒")
+    d = report["distribution"]
+    if d:
+        print(f"任务分布：每个工作器 {d['min']}~{d['max']} 个，平均 {d['mean']:.1f}，"
+              f"变异系数 {d['cv']:.2f}，最多/平均 {d['max_over_mean']:.2f}，"
+              f"前 {d['workers']} 个任务分到 {d['first_round']} 个工作器，没拿到任务的工作器 {d['idle_workers']} 个")
+    if report["stragglers"]:
+        print(f"拖后腿的工作器: {', '.join(report['stragglers'])}")
+    print("最慢的任务: " + ", ".join(f"#{task_id}({worker_id}, {elapsed:.2f}s)"
+                                     for task_id, worker_id, elapsed in report["slowest_tasks"]))
+    if report["missing"]:
+        print(f"缺少结果的任务: {report['missing']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="PUSH/PULL 结果收集器")
+    parser.add_argument("--timeout", type=float, default=10.0, help="多少秒没有新结果就认为批次未完成")
+    parser.add_argument("--batches", type=int, default=0, help="收集多少个批次后退出，0 表示一直运行")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    # 创建 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    
+    # 创建 PULL 套接字，接收推送者的批次信号和工作器的结果
+    socket = context.socket(zmq.PULL)
+    socket.bind(config.bind_endpoint(SINK_PORT))
+    
+    print("结果收集器已启动...")
+    
+    sink = BatchSink(socket)
+    done = 0
+    while not args.batches or done < args.batches:
+        batch_id, total, workers, started = sink.wait_for_batch()
+        print(f"批次 {batch_id} 开始，共 {total} 个任务，{workers} 个工作器已报到")
+        print_report(sink.collect(batch_id, total, started, timeout=args.timeout, expected_workers=workers))
+        done += 1
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,34 +1,207 @@
+import os
+import sys
 import zmq
 import time
+import uuid
 import random
+import argparse
+from collections import deque
+
+from protocol import VENTILATOR_PORT, SINK_PORT, SYNC_PORT, batch_message, task_message
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+from zero_copy import STAMP_SIZE, BufferPool, stamp
+
+def wait_for_workers(sync, required, timeout=None):
+    """等待 required 个不同的工作器报到，返回报到的工作器 ID 列表
+    
+    工作器在 PULL 套接字握手完成后才报到，所以报到的工作器都已经在 PUSH 的轮询列表里。
+    同一个工作器可能报到多次（例如上一个推送者退出前刚发出的报到），按工作器 ID 去重。
+    """
+    workers = []
+    deadline = time.monotonic() + timeout if timeout else None
+    while len(workers) < required:
+        remaining = deadline - time.monotonic() if deadline else None
+        if remaining is not None and (remaining <= 0 or not sync.poll(remaining * 1000)):
+            print(f"等待超时，只有 {len(workers)}/{required} 个工作器报到")
+            break
+        _, worker_id = sync.recv_multipart()
+        worker_id = worker_id.decode('utf-8')
+        if worker_id not in workers:
+            workers.append(worker_id)
+            print(f"工作器 {worker_id} 已报到（{len(workers)}/{required}）")
+    return workers
+
+class CreditDispatcher:
+    """基于信用的任务分发（ROUTER）
+    
+    PUSH 按轮询分发任务，不管工作器手上还有多少任务没处理，任务耗时不均时，
+    分到长任务的工作器后面排着的任务只能干等。这里每个工作器先发放 N 个信用，
+    每完成一个任务归还一个；推送者只把任务发给还有信用的工作器，
+    在有信用的工作器之间轮流分发，没有信用时等待工作器归还。
+    
+    ROUTER_MANDATORY 让发给已经断开的工作器（例如崩溃后被启动器重启）的任务报错而不是被静默丢弃，
+    这时删除该工作器的信用，把任务发给下一个工作器。
+    """
+    
+    def __init__(self, socket):
+        self.socket = socket
+        self.socket.setsockopt(zmq.ROUTER_MANDATORY, 1)
+        # 套接字身份 -> 剩余信用
+        self.credits = {}
+        # 套接字身份 -> 工作器 ID
+        self.workers = {}
+        # 还有信用的工作器，每个只出现一次
+        self.ready = deque()
+    
+    def handle_credit(self):
+        """接收一条信用消息：[套接字身份, CREDIT, 工作器 ID, 信用数]"""
+        identity, _, worker_id, credits = self.socket.recv_multipart()
+        if identity not in self.workers:
+            self.workers[identity] = worker_id.decode('utf-8')
+            self.credits[identity] = 0
+        if self.credits[identity] == 0:
+            self.ready.append(identity)
+        self.credits[identity] += int(credits)
+    
+    def wait_for_workers(self, required, timeout=None):
+        """等待 required 个工作器发放信用，返回工作器 ID 列表"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while len(self.workers) < required:
+            remaining = deadline - time.monotonic() if deadline else None
+            if remaining is not None and (remaining <= 0 or not self.socket.poll(remaining * 1000)):
+                print(f"等待超时，只有 {len(self.workers)}/{required} 个工作器报到")
+                break
+            known = len(self.workers)
+            self.handle_credit()
+            if len(self.workers) > known:
+                print(f"工作器 {list(self.workers.values())[-1]} 已报到（{len(self.workers)}/{required}）")
+        return list(self.workers.values())
+    
+    def send(self, frames, copy=True, track=False):
+        """把任务发给下一个有信用的工作器，没有信用时阻塞等待；track=True 时返回 MessageTracker"""
+        # 先处理已经到达的信用，让 ready 尽量反映最新状态
+        while self.socket.poll(0):
+            self.handle_credit()
+        while True:
+            while not self.ready:
+                self.handle_credit()
+            identity = self.ready.popleft()
+            self.credits[identity] -= 1
+            if self.credits[identity]:
+                self.ready.append(identity)
+            try:
+                return self.socket.send_multipart([identity] + frames, copy=copy, track=track)
+            except zmq.ZMQError as e:
+                if e.errno != zmq.EHOSTUNREACH:
+                    raise
+                self.drop(identity)
+    
+    def drop(self, identity):
+        """工作器已断开：删除它剩余的信用"""
+        print(f"工作器 {self.workers.pop(identity)} 已断开，丢弃它的信用")
+        del self.credits[identity]
+        if identity in self.ready:
+            self.ready.remove(identity)
 
 def main():
+    parser = argparse.ArgumentParser(description="PUSH/PULL 推送者")
+    parser.add_argument("--tasks", type=int, default=10, help="本批次的任务数")
+    parser.add_argument("--interval", type=float, default=0.5, help="两个任务之间的间隔（秒）")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="开始发任务前需要报到的工作器数；0 表示不等待，沿用固定等待 1 秒")
+    parser.add_argument("--sync-timeout", type=float, default=0, help="等待工作器报到的超时（秒），0 表示一直等")
+    parser.add_argument("--credit", action="store_true",
+                        help="基于信用的流控：只把任务发给还有信用的工作器（工作器也要用 --credit 启动）")
+    parser.add_argument("--payload-size", type=int, default=0,
+                        help=f"大负载模式：每个任务附带的二进制负载字节数（至少 {STAMP_SIZE}），0 表示不附带")
+    parser.add_argument("--zero-copy", action="store_true",
+                        help="大负载模式下用 copy=False 发送负载，并在发送完成后才复用缓冲区")
+    parser.add_argument("--buffers", type=int, default=4, help="大负载模式轮流复用的缓冲区数量")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    if args.payload_size and args.payload_size < STAMP_SIZE:
+        parser.error(f"--payload-size 至少为 {STAMP_SIZE} 字节")
+    
     # 创建 ZMQ 上下文
-    context = zmq.Context()
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    
+    if args.credit:
+        # 创建 ROUTER 套接字，按工作器身份定向发送
+        socket = context.socket(zmq.ROUTER)
+        dispatcher = CreditDispatcher(socket)
+        send = dispatcher.send
+        sync = None
+    else:
+        # 创建 PULL 套接字接收工作器报到，要在任务端口之前绑定，工作器握手后报到时它已经可用
+        sync = context.socket(zmq.PULL)
+        sync.bind(config.bind_endpoint(SYNC_PORT))
+        
+        # 创建 PUSH 套接字
+        socket = context.socket(zmq.PUSH)
+        send = socket.send_multipart
     
-    # 创建 PUSH 套接字
-    socket = context.socket(zmq.PUSH)
+    # 绑定任务端口
+    socket.bind(config.bind_endpoint(VENTILATOR_PORT))
     
-    # 绑定到端口 5555
-    socket.bind("tcp://*:5555")
+    # 连接结果收集器，用于发送批次开始信号
+    sink = context.socket(zmq.PUSH)
+    sink.connect(config.connect_endpoint(SINK_PORT))
     
     print("推送者已启动...")
     
     # 等待所有工作器连接
     print("等待工作器连接...")
-    time.sleep(1)
+    if args.credit:
+        # 工作器的第一条信用消息就是报到
+        workers = dispatcher.wait_for_workers(args.workers, args.sync_timeout)
+    elif args.workers:
+        workers = wait_for_workers(sync, args.workers, args.sync_timeout)
+    else:
+        # 不同步时只能固定等待，先连上的工作器会拿走开头的任务
+        time.sleep(1)
+        workers = []
+    
+    # 通知收集器批次开始，收集器从这一刻开始计时
+    batch_id = uuid.uuid4().hex[:8]
+    sink.send_multipart(batch_message(batch_id, args.tasks, len(workers)))
+    
+    pool = BufferPool(args.payload_size, args.buffers) if args.payload_size else None
     
     # 发送任务
-    for task_id in range(10):
+    for task_id in range(args.tasks):
         # 生成随机工作负载
         workload = random.randint(1, 100)
         message = f"任务 #{task_id} 工作负载: {workload}"
+        frames = task_message(batch_id, task_id, message)
         
         # 发送任务
-        socket.send_string(message)
+        if pool is None:
+            send(frames)
+        else:
+            # 零拷贝时 libzmq 直接引用缓冲区，要等它上一次的发送完成后才能写入新数据
+            index, payload = pool.acquire()
+            stamp(payload, task_id)
+            tracker = send(frames + [payload], copy=not args.zero_copy, track=args.zero_copy)
+            if args.zero_copy:
+                pool.track(index, tracker)
         print(f"已发送: {message}")
         
-        time.sleep(0.5)
+        if args.interval:
+            time.sleep(args.interval)
+    
+    print(f"批次 {batch_id} 的 {args.tasks} 个任务已全部发送")
+    if pool is not None and args.zero_copy:
+        print(f"复用缓冲区时等待发送完成 {pool.waits} 次")
+    
+    # 关闭时等待队列中的消息发送完毕
+    socket.close(linger=-1)
+    sink.close(linger=-1)
+    if sync is not None:
+        sync.close(linger=0)
+    context.term()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,27 +1,155 @@
+import sys
+import os
 import zmq
+import zlib
 import time
 import random
+import argparse
+import functools
+import socket as pysocket
+from zmq.utils.monitor import recv_monitor_message
 
-def main():
-    # 创建 ZMQ 上下文
-    context = zmq.Context()
+from protocol import (VENTILATOR_PORT, SINK_PORT, SYNC_PORT, parse_task, task_payload,
+                      ready_message, credit_message, result_message)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+from zero_copy import frame_buffer, read_stamp
+
+def handle_sleep(iterations):
+    """模拟 IO 型任务：随机耗时 0.5~2 秒"""
+    time.sleep(random.uniform(0.5, 2.0))
+
+def handle_cpu(iterations):
+    """模拟 CPU 型任务：纯 Python 循环，持有 GIL，只有多进程才能用满多个核"""
+    total = 0
+    for i in range(iterations):
+        total += i * i
+    return total
+
+HANDLERS = {"sleep": handle_sleep, "cpu": handle_cpu}
+
+def process_task(frames, sink, worker_id, work, verbose=True):
+    """处理一个任务并把结果发给收集器"""
+    # 接收任务
+    batch_id, task_id, message = parse_task(frames)
+    if verbose:
+        print(f"收到任务: {message}")
     
+    # 大负载模式：直接在收到的消息内存上计算校验和，copy=False 接收时不复制
+    payload = task_payload(frames)
+    if payload is not None:
+        payload = frame_buffer(payload)
+        crc = zlib.crc32(payload)
+        if read_stamp(payload) != task_id:
+            print(f"任务 #{task_id} 的负载序号不匹配，发送端可能在发送完成前改写了缓冲区")
+        if verbose:
+            print(f"负载 {payload.nbytes} 字节，CRC32 {crc:08x}")
+    
+    # 模拟处理任务
+    start = time.perf_counter()
+    work()
+    elapsed = time.perf_counter() - start
+    if verbose:
+        print(f"任务处理完成: {message}")
+    
+    # 发送结果
+    sink.send_multipart(result_message(batch_id, task_id, worker_id, elapsed))
+
+def run_pull(context, config, sink, worker_id, work, verbose=True, copy=True):
+    """PULL 模式：推送者轮流分发任务"""
     # 创建 PULL 套接字
     socket = context.socket(zmq.PULL)
     
     # 连接到推送者
-    socket.connect("tcp://localhost:5555")
+    socket.connect(config.connect_endpoint(VENTILATOR_PORT))
     
-    print("工作器已启动...")
+    # 监听 PULL 套接字的握手事件：握手完成说明推送者已经能把任务发给这个工作器
+    monitor = socket.get_monitor_socket(zmq.EVENT_HANDSHAKE_SUCCEEDED)
+    
+    # 创建 PUSH 套接字，握手完成后向推送者报到
+    sync = context.socket(zmq.PUSH)
+    sync.setsockopt(zmq.LINGER, 0)
+    sync.connect(config.connect_endpoint(SYNC_PORT))
+    
+    poller = zmq.Poller()
+    poller.register(socket, zmq.POLLIN)
+    poller.register(monitor, zmq.POLLIN)
     
     while True:
-        # 接收任务
-        message = socket.recv_string()
-        print(f"收到任务: {message}")
-        
-        # 模拟处理任务
-        time.sleep(random.uniform(0.5, 2.0))
-        print(f"任务处理完成: {message}")
+        events = dict(poller.poll())
+        if monitor in events:
+            # 每个新启动的推送者都会触发一次握手，都要重新报到
+            recv_monitor_message(monitor)
+            sync.send_multipart(ready_message(worker_id))
+            if verbose:
+                print("已连接推送者，已报到")
+        if socket in events:
+            process_task(socket.recv_multipart(copy=copy), sink, worker_id, work, verbose)
+
+def run_credit(context, config, sink, worker_id, work, credits, verbose=True, copy=True):
+    """信用模式：先发放 credits 个信用，每完成一个任务归还一个"""
+    # 创建 DEALER 套接字，推送者的 ROUTER 按身份把任务发过来
+    socket = context.socket(zmq.DEALER)
+    socket.connect(config.connect_endpoint(VENTILATOR_PORT))
+    
+    # 监听握手事件：推送者重启后要重新发放信用
+    monitor = socket.get_monitor_socket(zmq.EVENT_HANDSHAKE_SUCCEEDED)
+    
+    poller = zmq.Poller()
+    poller.register(socket, zmq.POLLIN)
+    poller.register(monitor, zmq.POLLIN)
+    
+    while True:
+        events = dict(poller.poll())
+        if monitor in events:
+            recv_monitor_message(monitor)
+            socket.send_multipart(credit_message(worker_id, credits))
+            if verbose:
+                print(f"已连接推送者，发放 {credits} 个信用")
+        if socket in events:
+            process_task(socket.recv_multipart(copy=copy), sink, worker_id, work, verbose)
+            socket.send_multipart(credit_message(worker_id, 1))
+
+def run_worker(handler="sleep", credit=0, iterations=2000000, verbose=True, config=None, zero_copy=False):
+    """运行一个工作器，直到进程被终止；config 为 None 时从环境变量读取 ZMQ 配置
+    
+    zero_copy=True 时用 copy=False 接收任务，负载帧以 memoryview 的形式交给处理流程，不复制。
+    """
+    # 创建 ZMQ 上下文
+    config = config or ZmqConfig.from_env()
+    context = config.context()
+    
+    # 创建 PUSH 套接字，把结果发给收集器
+    sink = context.socket(zmq.PUSH)
+    sink.connect(config.connect_endpoint(SINK_PORT))
+    
+    worker_id = f"{pysocket.gethostname()}-{os.getpid()}"
+    if verbose:
+        print(f"工作器 {worker_id} 已启动...")
+    
+    work = functools.partial(HANDLERS[handler], iterations)
+    try:
+        if credit:
+            run_credit(context, config, sink, worker_id, work, credit, verbose, copy=not zero_copy)
+        else:
+            run_pull(context, config, sink, worker_id, work, verbose, copy=not zero_copy)
+    finally:
+        # 被终止时丢弃还没发出的消息，不阻塞退出
+        context.destroy(linger=0)
+
+def main():
+    parser = argparse.ArgumentParser(description="PUSH/PULL 工作器")
+    parser.add_argument("--credit", type=int, default=0,
+                        help="基于信用的流控，最多同时持有的任务数；0 表示 PULL 模式（推送者轮流分发）")
+    parser.add_argument("--handler", choices=sorted(HANDLERS), default="sleep", help="任务处理函数")
+    parser.add_argument("--iterations", type=int, default=2000000, help="cpu 处理函数每个任务的循环次数")
+    parser.add_argument("--zero-copy", action="store_true", help="用 copy=False 接收任务，大负载不复制")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    run_worker(args.handler, args.credit, args.iterations, config=ZmqConfig.from_args(args),
+               zero_copy=args.zero_copy)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import os
+import sys
+import zmq
+import time
+import asyncio
+import argparse
+import statistics
+import zmq.asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+async def conversation(context, endpoint, client_id, requests, interval, latencies, verbose=True):
+    """一个客户端会话：自己的 REQ 套接字，一问一答发送 requests 个请求"""
+    # 创建 REQ 套接字（请求套接字）
+    socket = context.socket(zmq.REQ)
+    socket.setsockopt(zmq.LINGER, 0)
+    
+    # 连接到服务器
+    socket.connect(endpoint)
+    
+    try:
+        for request in range(requests):
+            # 发送请求
+            message = f"客户端 {client_id} 请求 #{request + 1}"
+            start = time.perf_counter()
+            await socket.send_string(message)
+            
+            # 等待响应，等待期间其他会话继续运行
+            response = await socket.recv_string()
+            latencies.append(time.perf_counter() - start)
+            if verbose:
+                print(f"收到响应: {response}")
+            
+            if interval:
+                await asyncio.sleep(interval)
+    finally:
+        socket.close()
+
+async def run(args):
+    # 创建 asyncio 版本的 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context(zmq.asyncio.Context)
+    endpoint = args.endpoint or config.connect_endpoint(args.port)
+    # 每个会话一个套接字，默认最多 1023 个
+    context.set(zmq.MAX_SOCKETS, max(context.get(zmq.MAX_SOCKETS), args.clients + 16))
+    
+    print(f"启动 {args.clients} 个客户端会话，每个发送 {args.requests} 个请求...")
+    latencies = []
+    verbose = not args.quiet
+    start = time.perf_counter()
+    await asyncio.gather(*(conversation(context, endpoint, i, args.requests, args.interval, latencies, verbose)
+                           for i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    context.term()
+    
+    ms = sorted(l * 1000 for l in latencies)
+    quantiles = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else [ms[0]] * 99
+    print(f"完成 {len(ms)} 个请求，耗时 {elapsed:.2f} 秒，吞吐量 {len(ms) / elapsed:.1f} 请求/秒")
+    print(f"延迟(ms): 平均 {statistics.mean(ms):.1f}  p50 {quantiles[49]:.1f}  "
+          f"p99 {quantiles[98]:.1f}  最大 {ms[-1]:.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="REQ/REP 异步客户端：一个线程里运行多个并发会话")
+    parser.add_argument("--port", type=int, default=5555, help="服务器端口，主机由 --zmq-host / ZMQ_DEMO_HOST 指定")
+    parser.add_argument("--endpoint", default=None, help="完整的服务器地址，指定后忽略 --port")
+    parser.add_argument("--clients", type=int, default=1, help="并发会话数，每个会话一个 REQ 套接字")
+    parser.add_argument("--requests", type=int, default=5, help="每个会话发送的请求数")
+    parser.add_argument("--interval", type=float, default=1.0, help="同一会话两个请求之间的间隔（秒）")
+    parser.add_argument("--quiet", action="store_true", help="不打印每个响应")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import os
+import sys
+import zmq
+import asyncio
+import argparse
+import zmq.asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+async def handle_request(socket, envelope, message, delay, verbose=True):
+    """处理一个请求：等待期间事件循环继续接收和处理其他客户端的请求"""
+    # 模拟处理时间（IO 等待）
+    await asyncio.sleep(delay)
+    
+    # 发送响应（带上 envelope，ROUTER 据此把响应交给对应的 REQ 客户端）
+    response = f"服务器已处理您的请求: {message}"
+    await socket.send_multipart(envelope + [response.encode('utf-8')])
+    if verbose:
+        print(f"已响应: {message}")
+
+async def serve(socket, delay, verbose=True, concurrency=0):
+    """接收循环：每个请求交给一个独立的任务处理，不等它完成就去接收下一个请求
+    
+    REP 套接字必须一问一答，只能串行处理；ROUTER 可以同时持有任意多个未回复的请求。
+    REQ 客户端的请求经过 ROUTER 后是 [客户端身份, 空帧, 内容]，响应原样带上前两帧，
+    所以原来的 client.py 不用修改。
+    concurrency 大于 0 时最多同时处理这么多请求，超出的请求留在 ROUTER 的接收队列里。
+    """
+    slots = asyncio.Semaphore(concurrency) if concurrency else None
+    tasks = set()
+    
+    async def run_request(envelope, message):
+        try:
+            await handle_request(socket, envelope, message, delay, verbose)
+        finally:
+            if slots is not None:
+                slots.release()
+    
+    while True:
+        if slots is not None:
+            await slots.acquire()
+        frames = await socket.recv_multipart()
+        envelope, content = frames[:-1], frames[-1]
+        message = content.decode('utf-8')
+        if verbose:
+            print(f"收到请求: {message}（处理中 {len(tasks) + 1}）")
+        
+        task = asyncio.create_task(run_request(envelope, message))
+        # 保留任务的引用，否则可能在完成前被垃圾回收
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+async def run(args):
+    # 创建 asyncio 版本的 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context(zmq.asyncio.Context)
+    
+    # 创建 ROUTER 套接字，代替 REP
+    socket = context.socket(zmq.ROUTER)
+    
+    # 绑定端口
+    socket.bind(config.bind_endpoint(args.port))
+    
+    print("异步服务器启动，等待客户端连接...")
+    
+    try:
+        await serve(socket, args.delay, not args.quiet, args.concurrency)
+    finally:
+        socket.close(linger=0)
+        context.term()
+
+def main():
+    parser = argparse.ArgumentParser(description="REQ/REP 异步服务器（zmq.asyncio + ROUTER）")
+    parser.add_argument("--port", type=int, default=5555, help="监听端口")
+    parser.add_argument("--delay", type=float, default=1.0, help="每个请求的模拟处理时间（秒）")
+    parser.add_argument("--concurrency", type=int, default=0, help="同时处理的请求数上限，0 表示不限制")
+    parser.add_argument("--quiet", action="store_true", help="不打印每个请求")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("服务器已停止")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
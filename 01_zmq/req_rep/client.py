@@ -1,30 +1,172 @@
+import os
+import sys
 import zmq
 import time
+import argparse
+from collections import Counter
 
-def main():
-    # 创建 ZMQ 上下文
-    context = zmq.Context()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+class LazyPirateClient:
+    """带超时和重试的 REQ 客户端（Lazy Pirate）
+    
+    阻塞的 recv_string 在服务器变慢或重启时会一直等下去。这里发送请求后用 poll 等待响应，
+    超时后关闭套接字（LINGER 0 丢弃没发出去的请求）、重新连接并重发，最多重试 retries 次。
+    REQ 套接字必须收到响应才能发下一个请求，所以超时后只能重建套接字；
+    旧套接字上迟到的响应随套接字一起丢弃，但服务器可能已经把同一个请求处理了两次。
+    timeout 为 None 时退化成原来的阻塞等待。
+    """
+    
+    def __init__(self, context, endpoint, timeout=2.5, retries=3):
+        self.context = context
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.retries = retries
+        self.socket = None
+        self.connect()
+    
+    def connect(self):
+        # 创建 REQ 套接字（请求套接字）
+        self.socket = self.context.socket(zmq.REQ)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        
+        # 连接到服务器
+        self.socket.connect(self.endpoint)
+    
+    def reset(self):
+        """超时后丢弃当前套接字，重新连接"""
+        self.socket.close()
+        self.connect()
+    
+    def request(self, message):
+        """发送请求并等待响应，返回 (响应, 尝试次数, 最后一次尝试的耗时)；重试用完时响应和耗时为 None"""
+        for attempt in range(1, self.retries + 2):
+            start = time.perf_counter()
+            self.socket.send_string(message)
+            if self.timeout is None or self.socket.poll(self.timeout * 1000):
+                return self.socket.recv_string(), attempt, time.perf_counter() - start
+            if attempt <= self.retries:
+                print(f"{self.timeout} 秒内没有收到响应，重新连接后第 {attempt} 次重试...")
+            self.reset()
+        return None, self.retries + 1, None
     
-    # 创建 REQ 套接字（请求套接字）
-    socket = context.socket(zmq.REQ)
+    def close(self):
+        self.socket.close()
+
+class RequestStats:
+    """记录每个请求的尝试次数和延迟，用于对照实测的服务器延迟调整超时"""
     
-    # 连接到服务器
-    socket.connect("tcp://localhost:5555")
+    def __init__(self):
+        self.attempts = Counter()
+        # 成功的那次尝试的耗时：反映服务器本身的延迟
+        self.latencies = []
+        # 从第一次发送到收到响应的总耗时：包括超时和重试
+        self.totals = []
+        self.failed = 0
+    
+    def record(self, attempts, latency, total):
+        if latency is None:
+            self.failed += 1
+            return
+        self.attempts[attempts] += 1
+        self.latencies.append(latency)
+        self.totals.append(total)
+
+def latency_histogram(latencies):
+    """按 1, 2, 4, 8... 毫秒分桶，返回 [(桶上限 ms, 数量), ...]"""
+    buckets = Counter()
+    for latency in latencies:
+        ms = latency * 1000
+        edge = 1
+        while edge < ms:
+            edge *= 2
+        buckets[edge] += 1
+    return sorted(buckets.items())
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def print_report(stats, timeout, retries, width=40):
+    total = sum(stats.attempts.values()) + stats.failed
+    if not total:
+        return
+    print(f"\n共 {total} 个请求，成功 {total - stats.failed}，重试 {retries} 次后仍失败 {stats.failed}")
+    
+    print("尝试次数分布:")
+    peak = max(list(stats.attempts.values()) + [stats.failed])
+    for attempts in range(1, retries + 2):
+        count = stats.attempts.get(attempts, 0)
+        print(f"  {attempts:>3} 次 {count:>6}  {'#' * round(count / peak * width)}")
+    if stats.failed:
+        print(f"  失败   {stats.failed:>6}  {'#' * round(stats.failed / peak * width)}")
+    
+    if not stats.latencies:
+        return
+    print("成功尝试的延迟分布（服务器延迟）:")
+    histogram = latency_histogram(stats.latencies)
+    peak = max(count for _, count in histogram)
+    cumulative = 0
+    for edge, count in histogram:
+        cumulative += count
+        print(f"  <= {edge:>6} ms {count:>6}  累计 {cumulative / len(stats.latencies):>6.1%}  "
+              f"{'#' * round(count / peak * width)}")
+    
+    p50, p99 = percentile(stats.latencies, 0.50), percentile(stats.latencies, 0.99)
+    print(f"服务器延迟 p50 {p50 * 1000:.1f}ms  p99 {p99 * 1000:.1f}ms  最大 {max(stats.latencies) * 1000:.1f}ms；"
+          f"含重试的总延迟 p99 {percentile(stats.totals, 0.99) * 1000:.1f}ms")
+    if timeout is not None:
+        retried = total - stats.attempts.get(1, 0)
+        print(f"超时 {timeout * 1000:.0f}ms 下 {retried / total:.1%} 的请求发生过重试；"
+              f"超时低于服务器延迟的 p99 时会把正常的慢请求当成失败重发")
+
+def main():
+    parser = argparse.ArgumentParser(description="REQ/REP 客户端（Lazy Pirate：超时重试）")
+    parser.add_argument("--port", type=int, default=5555, help="服务器端口，主机由 --zmq-host / ZMQ_DEMO_HOST 指定")
+    parser.add_argument("--endpoint", default=None, help="完整的服务器地址，指定后忽略 --port")
+    parser.add_argument("--requests", type=int, default=5, help="请求总数")
+    parser.add_argument("--interval", type=float, default=1.0, help="两个请求之间的间隔（秒）")
+    parser.add_argument("--timeout", type=float, default=2.5, help="等待响应的超时（秒），0 表示一直等")
+    parser.add_argument("--retries", type=int, default=3, help="超时后重试的次数")
+    parser.add_argument("--quiet", action="store_true", help="不打印每个请求和响应")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    # 创建 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    timeout = args.timeout or None
+    client = LazyPirateClient(context, args.endpoint or config.connect_endpoint(args.port), timeout, args.retries)
+    stats = RequestStats()
     
     print("客户端已启动，准备发送请求...")
     
-    for request in range(5):
-        # 发送请求
-        message = f"请求 #{request + 1}"
-        print(f"发送请求: {message}")
-        socket.send_string(message)
-        
-        # 等待响应
-        response = socket.recv_string()
-        print(f"收到响应: {response}")
-        
-        # 等待一秒再发送下一个请求
-        time.sleep(1)
+    try:
+        for request in range(args.requests):
+            # 发送请求
+            message = f"请求 #{request + 1}"
+            if not args.quiet:
+                print(f"发送请求: {message}")
+            
+            # 等待响应，超时重试
+            start = time.perf_counter()
+            response, attempts, latency = client.request(message)
+            stats.record(attempts, latency, time.perf_counter() - start)
+            if response is None:
+                print(f"{message} 重试 {args.retries} 次后仍没有响应，放弃")
+            elif not args.quiet:
+                print(f"收到响应: {response}")
+            
+            # 等待一段时间再发送下一个请求
+            if args.interval:
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+        context.term()
+        print_report(stats, timeout, args.retries)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
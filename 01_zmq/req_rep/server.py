@@ -1,29 +1,134 @@
+import os
+import sys
 import zmq
 import time
+import asyncio
+import argparse
+import threading
+import zmq.asyncio
 
-def main():
-    # 创建 ZMQ 上下文
-    context = zmq.Context()
-    
+from async_server import serve as serve_async
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+HANDLERS_ENDPOINT = "inproc://handlers"
+MODES = ["rep", "threads", "asyncio"]
+
+def handle_request(message, delay):
+    """处理一个请求，返回响应"""
+    # 模拟处理时间
+    time.sleep(delay)
+    return f"服务器已处理您的请求: {message}"
+
+def serve_rep(context, endpoint, delay, verbose=True):
+    """原来的单个 REP 套接字：一次只处理一个请求，N 个客户端同时请求时最后一个要等 N 倍的处理时间"""
     # 创建 REP 套接字（响应套接字）
     socket = context.socket(zmq.REP)
     
-    # 绑定到端口 5555
-    socket.bind("tcp://*:5555")
-    
-    print("服务器启动，等待客户端连接...")
+    # 绑定端口
+    socket.bind(endpoint)
     
     while True:
         # 等待客户端请求
         message = socket.recv_string()
-        print(f"收到请求: {message}")
-        
-        # 模拟处理时间
-        time.sleep(1)
+        if verbose:
+            print(f"收到请求: {message}")
         
         # 发送响应
-        response = f"服务器已处理您的请求: {message}"
-        socket.send_string(response)
+        socket.send_string(handle_request(message, delay))
+
+def handler_thread(context, delay, verbose=True):
+    """处理线程：REP 套接字连接内部的 DEALER，一问一答地处理分给自己的请求"""
+    socket = context.socket(zmq.REP)
+    socket.connect(HANDLERS_ENDPOINT)
+    name = threading.current_thread().name
+    while True:
+        try:
+            message = socket.recv_string()
+        except zmq.ContextTerminated:
+            break
+        if verbose:
+            print(f"[{name}] 收到请求: {message}")
+        socket.send_string(handle_request(message, delay))
+    socket.close()
+
+def serve_threads(context, endpoint, delay, pool, verbose=True):
+    """ROUTER 前端 + 线程池：多个请求同时处理
+    
+    REQ 客户端的请求经过 ROUTER 后是 [客户端身份, 空帧, 内容]，zmq.proxy 把它原样交给 inproc 的 DEALER，
+    DEALER 在 pool 个处理线程的 REP 套接字之间轮流分发；REP 剥掉信封交给处理函数，响应时再把信封加回去，
+    所以原来的 client.py 不用修改。
+    """
+    # 创建 ROUTER 套接字，代替 REP 面向客户端
+    frontend = context.socket(zmq.ROUTER)
+    frontend.bind(endpoint)
+    
+    # 创建 DEALER 套接字，把请求分给处理线程；inproc 要先绑定再让线程连接
+    backend = context.socket(zmq.DEALER)
+    backend.bind(HANDLERS_ENDPOINT)
+    
+    for i in range(pool):
+        threading.Thread(target=handler_thread, args=(context, delay, verbose),
+                         name=f"handler-{i}", daemon=True).start()
+    
+    try:
+        zmq.proxy(frontend, backend)
+    except zmq.ContextTerminated:
+        pass
+    finally:
+        frontend.close()
+        backend.close()
+
+async def serve_asyncio(context, endpoint, delay, pool, verbose=True):
+    """ROUTER 前端 + asyncio 任务（见 async_server.py），最多同时处理 pool 个请求"""
+    socket = context.socket(zmq.ROUTER)
+    socket.bind(endpoint)
+    try:
+        await serve_async(socket, delay, verbose, concurrency=pool)
+    finally:
+        socket.close(linger=0)
+
+def run_server(mode="rep", port=5555, delay=1.0, pool=10, config=None, verbose=True):
+    """按 mode 运行服务器，直到进程被终止；config 为 None 时从环境变量读取 ZMQ 配置"""
+    config = config or ZmqConfig.from_env()
+    endpoint = config.bind_endpoint(port)
+    if mode == "asyncio":
+        # 创建 asyncio 版本的 ZMQ 上下文
+        context = config.context(zmq.asyncio.Context)
+        try:
+            asyncio.run(serve_asyncio(context, endpoint, delay, pool, verbose))
+        finally:
+            context.destroy(linger=0)
+        return
+    
+    # 创建 ZMQ 上下文
+    context = config.context()
+    try:
+        if mode == "threads":
+            serve_threads(context, endpoint, delay, pool, verbose)
+        else:
+            serve_rep(context, endpoint, delay, verbose)
+    finally:
+        context.destroy(linger=0)
+
+def main():
+    parser = argparse.ArgumentParser(description="REQ/REP 服务器")
+    parser.add_argument("--mode", choices=MODES, default="rep",
+                        help="rep：单个 REP 套接字串行处理；threads：ROUTER + 线程池；asyncio：ROUTER + asyncio 任务")
+    parser.add_argument("--port", type=int, default=5555, help="监听端口")
+    parser.add_argument("--delay", type=float, default=1.0, help="每个请求的模拟处理时间（秒）")
+    parser.add_argument("--pool", type=int, default=10, help="threads / asyncio 模式下同时处理的请求数")
+    parser.add_argument("--quiet", action="store_true", help="不打印每个请求")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    print("服务器启动，等待客户端连接...")
+    
+    try:
+        run_server(args.mode, args.port, args.delay, args.pool, ZmqConfig.from_args(args), not args.quiet)
+    except KeyboardInterrupt:
+        print("服务器已停止")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
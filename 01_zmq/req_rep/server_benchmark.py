@@ -0,0 +1,107 @@
+"""REQ/REP 服务器的延迟与客户端数量
+
+每种服务器模式（server.py 的 --mode）在独立进程中运行，主进程里启动 N 个客户端线程，
+每个客户端用自己的 REQ 套接字一问一答发送 requests 个请求，统计每个请求的往返延迟：
+单个 REP 套接字串行处理，延迟随客户端数线性增长；ROUTER + 处理池在客户端数不超过池大小时延迟基本不变。
+
+    python req_rep/server_benchmark.py --clients 1,2,4,8,16,32,64 --pool 16
+"""
+
+import os
+import sys
+import zmq
+import time
+import argparse
+import threading
+import statistics
+import multiprocessing
+
+from server import MODES, run_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+def client_thread(context, endpoint, requests, start, latencies):
+    """一个 REQ 客户端：等所有客户端都连上后一起开始"""
+    socket = context.socket(zmq.REQ)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(endpoint)
+    start.wait()
+    for i in range(requests):
+        t0 = time.perf_counter()
+        socket.send_string(f"请求 #{i}")
+        socket.recv()
+        latencies.append(time.perf_counter() - t0)
+    socket.close()
+
+def wait_for_server(context, endpoint, timeout=30.0):
+    """发一个探测请求，收到响应说明服务器已经在处理请求"""
+    socket = context.socket(zmq.REQ)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(endpoint)
+    socket.send_string("探测")
+    ready = socket.poll(timeout * 1000)
+    socket.close()
+    if not ready:
+        raise RuntimeError(f"服务器 {endpoint} 没有响应")
+
+def run_once(mode, clients, args, config):
+    mp = multiprocessing.get_context("spawn")
+    server = mp.Process(target=run_server,
+                        args=(mode, args.port, args.delay_ms / 1000, args.pool, config, False), daemon=True)
+    server.start()
+    context = config.context()
+    endpoint = config.connect_endpoint(args.port)
+    try:
+        wait_for_server(context, endpoint)
+        latencies = []
+        start = threading.Event()
+        threads = [threading.Thread(target=client_thread, args=(context, endpoint, args.requests, start, latencies))
+                   for _ in range(clients)]
+        for t in threads:
+            t.start()
+        begin = time.perf_counter()
+        start.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - begin
+    finally:
+        server.terminate()
+        server.join()
+        context.destroy(linger=0)
+    
+    ms = sorted(l * 1000 for l in latencies)
+    quantiles = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else [ms[0]] * 99
+    return {
+        "throughput": len(ms) / elapsed,
+        "p50": quantiles[49],
+        "p99": quantiles[98],
+        "max": ms[-1],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="REQ/REP 服务器延迟与客户端数量的关系")
+    parser.add_argument("--modes", default=",".join(MODES), help="逗号分隔的服务器模式")
+    parser.add_argument("--clients", default="1,2,4,8,16,32,64", help="逗号分隔的客户端数")
+    parser.add_argument("--requests", type=int, default=5, help="每个客户端发送的请求数")
+    parser.add_argument("--delay-ms", type=float, default=20.0, help="每个请求的模拟处理时间（毫秒）")
+    parser.add_argument("--pool", type=int, default=16, help="threads / asyncio 模式同时处理的请求数")
+    parser.add_argument("--port", type=int, default=5565, help="测试服务器使用的端口")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    modes = [m for m in args.modes.split(",") if m]
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"未知模式: {mode}")
+    config = ZmqConfig.from_args(args)
+    
+    print(f"处理时间 {args.delay_ms:.0f}ms，处理池 {args.pool}，每个客户端 {args.requests} 个请求")
+    print(f"{'模式':<10}{'客户端':>6}{'请求/秒':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    for clients in [int(c) for c in args.clients.split(",") if c]:
+        for mode in modes:
+            r = run_once(mode, clients, args, config)
+            print(f"{mode:<10}{clients:>8}{r['throughput']:>12.1f}{r['p50']:>10.1f}{r['p99']:>10.1f}{r['max']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import os
+import sys
+import zmq
+import asyncio
+import argparse
+import zmq.asyncio
+
+from protocol import READY, BACKEND_PORT
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+async def handle_request(socket, envelope, content, delay, verbose=True):
+    """处理一个请求并发送响应；等待期间其他请求继续处理"""
+    request = content.decode('utf-8')
+    if verbose:
+        print(f"收到请求: {request}")
+    
+    # 处理请求（模拟 IO 等待）
+    await asyncio.sleep(delay)
+    
+    # 发送响应（带上 envelope）
+    response = f"已处理: {request}".encode('utf-8')
+    await socket.send_multipart(envelope + [response])
+
+async def serve(socket, concurrency, delay, verbose=True):
+    """接收循环：最多 concurrency 个请求同时处理
+    
+    与 threaded_worker.py 一样先发送 concurrency 个 READY，负载均衡代理最多同时分配这么多请求给这个进程，
+    每个响应同时归还一个空位；区别是这里不开线程，每个请求是一个 asyncio 任务。
+    旧的 zmq.proxy 代理不看 READY，信号量保证同时处理的请求不超过 concurrency 个，多出来的留在接收队列里。
+    """
+    for _ in range(concurrency):
+        await socket.send(READY)
+    
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+    
+    async def run_request(frames):
+        try:
+            # envelope 是内容之前的所有帧：客户端身份，以及流水线客户端附带的关联 ID
+            await handle_request(socket, frames[:-1], frames[-1], delay, verbose)
+        finally:
+            slots.release()
+    
+    while True:
+        await slots.acquire()
+        frames = await socket.recv_multipart()
+        if len(frames) < 2:
+            # 负载均衡代理发来的心跳等控制消息，这个工作器不处理
+            slots.release()
+            continue
+        task = asyncio.create_task(run_request(frames))
+        # 保留任务的引用，否则可能在完成前被垃圾回收
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+async def run(args):
+    # 创建 asyncio 版本的 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context(zmq.asyncio.Context)
+    
+    # 创建 DEALER 套接字连接代理的后端
+    socket = context.socket(zmq.DEALER)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(config.connect_endpoint(BACKEND_PORT))
+    
+    print(f"异步工作器已启动，最多同时处理 {args.concurrency} 个请求...")
+    try:
+        await serve(socket, args.concurrency, args.delay, not args.quiet)
+    finally:
+        socket.close()
+        context.term()
+
+def main():
+    parser = argparse.ArgumentParser(description="ROUTER/DEALER 异步工作器（zmq.asyncio）")
+    parser.add_argument("--concurrency", type=int, default=100, help="同时处理的请求数上限")
+    parser.add_argument("--delay", type=float, default=1.0, help="每个请求的模拟处理时间（秒）")
+    parser.add_argument("--quiet", action="store_true", help="不打印每个请求")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("工作器已停止")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,17 +1,24 @@
+import os
+import sys
 import zmq
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+from protocol import FRONTEND_PORT, BACKEND_PORT
+
 def main():
     # 创建 ZMQ 上下文
-    context = zmq.Context()
+    config = ZmqConfig.from_env()
+    context = config.context()
     
     # 创建 ROUTER 套接字（前端）
     frontend = context.socket(zmq.ROUTER)
-    frontend.bind("tcp://*:5555")
+    frontend.bind(config.bind_endpoint(FRONTEND_PORT))
     
     # 创建 DEALER 套接字（后端）
     backend = context.socket(zmq.DEALER)
-    backend.bind("tcp://*:5556")
+    backend.bind(config.bind_endpoint(BACKEND_PORT))
     
     print("代理已启动...")
     
@@ -19,4 +26,4 @@ def main():
     zmq.proxy(frontend, backend)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
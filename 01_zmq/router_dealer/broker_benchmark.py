@@ -0,0 +1,142 @@
+import os
+import sys
+import zmq
+import time
+import argparse
+import threading
+
+import numpy as np
+
+from lru_broker import LruBroker
+from protocol import READY
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+FRONTEND = "inproc://frontend"
+BACKEND = "inproc://backend"
+
+def run_proxy_broker(context, ready, stats):
+    """原来的代理：ROUTER 前端 + DEALER 后端 + zmq.proxy"""
+    frontend = context.socket(zmq.ROUTER)
+    frontend.bind(FRONTEND)
+    backend = context.socket(zmq.DEALER)
+    backend.bind(BACKEND)
+    ready.set()
+    try:
+        zmq.proxy(frontend, backend)
+    except zmq.ContextTerminated:
+        pass
+    finally:
+        frontend.close()
+        backend.close()
+
+def run_lru_broker(context, ready, stats):
+    """负载均衡代理：ROUTER 前端 + ROUTER 后端"""
+    frontend = context.socket(zmq.ROUTER)
+    frontend.bind(FRONTEND)
+    backend = context.socket(zmq.ROUTER)
+    backend.bind(BACKEND)
+    broker = LruBroker(frontend, backend)
+    ready.set()
+    broker.run()
+    stats.update(broker.metrics())
+
+def worker_thread(context, service_ms, stop):
+    """模拟工作器：每个请求耗时 service_ms 毫秒"""
+    socket = context.socket(zmq.DEALER)
+    socket.connect(BACKEND)
+    socket.send(READY)
+    poller = zmq.Poller()
+    poller.register(socket, zmq.POLLIN)
+    while not stop.is_set():
+        if not poller.poll(100):
+            continue
+        frames = socket.recv_multipart()
+        time.sleep(service_ms / 1000)
+        socket.send_multipart(frames[:-1] + [b"done"])
+    socket.close()
+
+def client_thread(context, requests, latencies):
+    """模拟客户端：一问一答地发送请求并记录延迟"""
+    socket = context.socket(zmq.DEALER)
+    socket.connect(FRONTEND)
+    for i in range(requests):
+        start = time.perf_counter()
+        socket.send(f"请求 #{i}".encode('utf-8'))
+        socket.recv()
+        latencies.append(time.perf_counter() - start)
+    socket.close()
+
+def run_once(mode, args):
+    context = ZmqConfig.from_args(args).context()
+    broker_ready = threading.Event()
+    stats = {}
+    target = run_proxy_broker if mode == "proxy" else run_lru_broker
+    broker = threading.Thread(target=target, args=(context, broker_ready, stats))
+    broker.start()
+    broker_ready.wait()
+    
+    # 前 slow_workers 个工作器是慢工作器
+    stop = threading.Event()
+    workers = []
+    for i in range(args.workers):
+        service_ms = args.slow_ms if i < args.slow_workers else args.fast_ms
+        t = threading.Thread(target=worker_thread, args=(context, service_ms, stop))
+        t.start()
+        workers.append(t)
+    # 等待所有工作器连接到代理，避免请求都落到最先连接的工作器上
+    time.sleep(0.2)
+    
+    latencies = []
+    clients = [threading.Thread(target=client_thread, args=(context, args.requests, latencies))
+               for _ in range(args.clients)]
+    start = time.perf_counter()
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    makespan = time.perf_counter() - start
+    
+    stop.set()
+    for t in workers:
+        t.join()
+    # 终止 Context 会让代理线程退出
+    context.term()
+    broker.join()
+    
+    latencies = np.array(latencies) * 1000
+    result = {
+        "mode": mode,
+        "makespan": makespan,
+        "throughput": len(latencies) / makespan,
+        "p50": np.percentile(latencies, 50),
+        "p99": np.percentile(latencies, 99),
+        "max": latencies.max(),
+    }
+    if mode == "lru":
+        result["max_queue_depth"] = stats["max_queue_depth"]
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="zmq.proxy 与负载均衡代理在服务时间倾斜时的对比")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--slow-workers", type=int, default=1, help="慢工作器数量")
+    parser.add_argument("--fast-ms", type=float, default=5, help="快工作器每个请求的耗时（毫秒）")
+    parser.add_argument("--slow-ms", type=float, default=100, help="慢工作器每个请求的耗时（毫秒）")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50, help="每个客户端的请求数")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    print(f"{args.workers} 个工作器（其中 {args.slow_workers} 个慢工作器 {args.slow_ms}ms，"
+          f"其余 {args.fast_ms}ms），{args.clients} 个客户端 × {args.requests} 个请求")
+    print(f"{'代理':<8}{'总耗时(s)':>10}{'请求/秒':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    for mode in ("proxy", "lru"):
+        r = run_once(mode, args)
+        extra = f"  最大队列深度 {r['max_queue_depth']}" if "max_queue_depth" in r else ""
+        print(f"{r['mode']:<8}{r['makespan']:>10.2f}{r['throughput']:>10.1f}"
+              f"{r['p50']:>10.1f}{r['p99']:>10.1f}{r['max']:>10.1f}{extra}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,21 +1,20 @@
+import os
+import sys
 import zmq
 import time
 import random
+import argparse
+import statistics
 
-def main():
-    # 创建 ZMQ 上下文
-    context = zmq.Context()
-    
-    # 创建 DEALER 套接字
-    socket = context.socket(zmq.DEALER)
-    
-    # 连接到代理
-    socket.connect("tcp://localhost:5555")
-    
-    print("客户端已启动...")
-    
-    # 发送请求
-    for request in range(5):
+from protocol import FRONTEND_PORT
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+from zero_copy import STAMP_SIZE, BufferPool, stamp, send_zero_copy, frame_buffer
+
+def run_lockstep(socket, requests):
+    """一问一答：发送一个请求，等到响应后再发下一个"""
+    for request in range(requests):
         # 生成随机请求
         message = f"请求 #{request + 1}"
         print(f"发送请求: {message}")
@@ -29,5 +28,146 @@ def main():
         
         time.sleep(1)
 
+def run_pipelined(socket, requests, window, timeout):
+    """流水线：保持最多 window 个未完成的请求，响应可以乱序到达
+    
+    每个请求带一个关联 ID 帧：[关联 ID, 内容]，工作器原样带回，
+    客户端据此匹配响应并计算每个请求的延迟。
+    """
+    poller = zmq.Poller()
+    poller.register(socket, zmq.POLLIN)
+    
+    outstanding = {}
+    latencies = []
+    next_id = 0
+    out_of_order = 0
+    unknown = 0
+    # 在途请求数对时间的积分，用于计算时间加权的平均并发度
+    concurrency_area = 0.0
+    start = last_change = time.perf_counter()
+    
+    while len(latencies) < requests:
+        # 填满窗口
+        while len(outstanding) < window and next_id < requests:
+            now = time.perf_counter()
+            concurrency_area += len(outstanding) * (now - last_change)
+            last_change = now
+            corr_id = next_id.to_bytes(8, "big")
+            socket.send_multipart([corr_id, f"请求 #{next_id + 1}".encode('utf-8')])
+            outstanding[corr_id] = now
+            next_id += 1
+        
+        if not poller.poll(timeout * 1000):
+            print(f"{timeout} 秒内没有收到任何响应，放弃剩余的 {len(outstanding)} 个在途请求")
+            break
+        
+        # 一次取完已到达的响应
+        while True:
+            try:
+                corr_id, _ = socket.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            now = time.perf_counter()
+            sent_at = outstanding.get(corr_id)
+            if sent_at is None:
+                # 重复或过期的响应（例如代理重发过的请求）
+                unknown += 1
+                continue
+            if corr_id != next(iter(outstanding)):
+                out_of_order += 1
+            concurrency_area += len(outstanding) * (now - last_change)
+            last_change = now
+            del outstanding[corr_id]
+            latencies.append(now - sent_at)
+    
+    elapsed = time.perf_counter() - start
+    report(latencies, elapsed, concurrency_area / elapsed if elapsed else 0.0,
+           window, out_of_order, unknown, len(outstanding))
+
+def run_payload(socket, requests, size, window, zero_copy, timeout):
+    """大负载模式：每个请求是 size 字节的二进制负载，工作器（--zero-copy）原样发回
+    
+    保持最多 window 个在途请求，吞吐量按单程负载计算。zero_copy 时用 copy=False 发送并跟踪发送完成，
+    缓冲区要等发送完成后才复用；响应也用 copy=False 接收，直接检查收到的消息内存。
+    """
+    poller = zmq.Poller()
+    poller.register(socket, zmq.POLLIN)
+    pool = BufferPool(size, window + 1)
+    
+    sent = received = truncated = 0
+    start = time.perf_counter()
+    while received < requests:
+        while sent - received < window and sent < requests:
+            index, payload = pool.acquire()
+            stamp(payload, sent)
+            if zero_copy:
+                pool.track(index, send_zero_copy(socket, [], payload))
+            else:
+                socket.send(payload)
+            sent += 1
+        
+        if not poller.poll(timeout * 1000):
+            print(f"{timeout} 秒内没有收到任何响应，放弃剩余的 {sent - received} 个在途请求")
+            break
+        reply = frame_buffer(socket.recv(copy=not zero_copy))
+        if reply.nbytes != size:
+            truncated += 1
+        received += 1
+    elapsed = time.perf_counter() - start
+    
+    if received:
+        print(f"完成 {received} 个请求，每个 {size} 字节，耗时 {elapsed:.2f} 秒，"
+              f"{received * size / elapsed / 1e6:.1f} MB/s（单程）")
+    print(f"大小不符的响应 {truncated}，复用缓冲区时等待发送完成 {pool.waits} 次")
+
+def report(latencies, elapsed, avg_concurrency, window, out_of_order, unknown, lost):
+    """打印吞吐量、实际并发度和延迟分布"""
+    if not latencies:
+        print("没有完成任何请求")
+        return
+    ms = sorted(l * 1000 for l in latencies)
+    throughput = len(ms) / elapsed
+    quantiles = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else [ms[0]] * 99
+    print(f"完成 {len(ms)} 个请求，耗时 {elapsed:.2f} 秒，吞吐量 {throughput:.1f} 请求/秒")
+    print(f"窗口 {window}，时间加权平均并发 {avg_concurrency:.2f}，"
+          f"按利特尔定律估算 {throughput * statistics.mean(ms) / 1000:.2f}")
+    print(f"延迟(ms): 平均 {statistics.mean(ms):.1f}  p50 {quantiles[49]:.1f}  "
+          f"p90 {quantiles[89]:.1f}  p99 {quantiles[98]:.1f}  最大 {ms[-1]:.1f}")
+    print(f"乱序响应 {out_of_order}，重复/未知响应 {unknown}，未完成 {lost}")
+
+def main():
+    parser = argparse.ArgumentParser(description="ROUTER/DEALER 客户端")
+    parser.add_argument("--requests", type=int, default=5, help="请求总数")
+    parser.add_argument("--window", type=int, default=None,
+                        help="流水线模式下最多同时在途的请求数；不指定时一问一答")
+    parser.add_argument("--timeout", type=float, default=10.0, help="流水线模式下等待响应的超时（秒）")
+    parser.add_argument("--payload-size", type=int, default=0,
+                        help=f"大负载模式：每个请求的二进制负载字节数（至少 {STAMP_SIZE}），工作器要用 --zero-copy 启动")
+    parser.add_argument("--zero-copy", action="store_true",
+                        help="大负载模式下用 copy=False 发送和接收，跟踪发送完成后才复用缓冲区")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    if args.payload_size and args.payload_size < STAMP_SIZE:
+        parser.error(f"--payload-size 至少为 {STAMP_SIZE} 字节")
+    
+    # 创建 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    
+    # 创建 DEALER 套接字
+    socket = context.socket(zmq.DEALER)
+    
+    # 连接到代理
+    socket.connect(config.connect_endpoint(FRONTEND_PORT))
+    
+    print("客户端已启动...")
+    
+    if args.payload_size:
+        run_payload(socket, args.requests, args.payload_size, args.window or 1, args.zero_copy, args.timeout)
+    elif args.window:
+        run_pipelined(socket, args.requests, args.window, args.timeout)
+    else:
+        run_lockstep(socket, args.requests)
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
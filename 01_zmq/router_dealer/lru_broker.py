@@ -0,0 +1,207 @@
+import os
+import sys
+import zmq
+import time
+import argparse
+from collections import deque
+
+from protocol import READY, HEARTBEAT, HEARTBEAT_INTERVAL, HEARTBEAT_LIVENESS, FRONTEND_PORT, BACKEND_PORT
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+class LruBroker:
+    """负载均衡代理（ROUTER-ROUTER）
+    
+    zmq.proxy + DEALER 后端按轮询把请求分给工作器，不管工作器是否正忙，
+    一个慢工作器会拖住分给它的所有请求。这里的后端也是 ROUTER：
+    工作器发送 READY 或者返回响应时进入空闲队列，请求只发给空闲的工作器，
+    没有空闲工作器时请求在代理内部排队。
+    
+    同一个工作器可以在空闲队列中出现多次，表示它有多个空位（例如多线程工作器发送多次 READY）。
+    
+    代理记录每个工作器手上的请求。发过心跳的工作器如果连续 liveness 个心跳周期没有任何消息，
+    就认为它已经死亡：从空闲队列中删除，手上的请求放回队首重新分配。
+    不发心跳的工作器不会过期，与原来的行为一致。
+    """
+    
+    def __init__(self, frontend, backend, max_queue=10000,
+                 heartbeat_interval=HEARTBEAT_INTERVAL, liveness=HEARTBEAT_LIVENESS):
+        self.frontend = frontend
+        self.backend = backend
+        self.max_queue = max_queue
+        self.heartbeat_interval = heartbeat_interval
+        self.liveness = liveness
+        self.idle = deque()
+        # 等待空闲工作器的请求：(入队时间, 消息帧)
+        self.pending = deque()
+        # 工作器身份 -> {"expiry": 过期时间, "heartbeat": 是否发过心跳, "in_flight": [请求帧, ...]}
+        self.workers = {}
+        self.received = 0
+        self.dispatched = 0
+        self.replied = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.expired = 0
+        self.requeued = 0
+    
+    def handle_frontend(self):
+        """客户端请求：[客户端身份, (空帧,) 内容] 整体排队"""
+        frames = self.frontend.recv_multipart()
+        self.pending.append((time.monotonic(), frames))
+        self.received += 1
+        self.max_depth = max(self.max_depth, len(self.pending))
+        self.dispatch()
+    
+    def handle_backend(self):
+        """工作器消息：[工作器身份, READY]、[工作器身份, HEARTBEAT] 或 [工作器身份, 客户端身份, ..., 响应]"""
+        frames = self.backend.recv_multipart()
+        worker_id, body = frames[0], frames[1:]
+        worker = self.workers.get(worker_id)
+        
+        if body == [READY]:
+            if worker is None:
+                worker = self.workers[worker_id] = {"heartbeat": False, "in_flight": []}
+            self.idle.append(worker_id)
+        elif body == [HEARTBEAT]:
+            # 已过期的工作器收不到代理的心跳，会自己换新身份重连，这里忽略它的心跳
+            if worker is not None:
+                worker["heartbeat"] = True
+        else:
+            # 响应总是转发给客户端，过期后才到达的响应可能与重发请求的响应重复，由客户端按关联 ID 去重
+            self.frontend.send_multipart(body)
+            self.replied += 1
+            # 只有匹配到在途请求才归还空位，已过期工作器的迟到响应不会多算空位
+            if worker is not None and self.complete(worker, body[:-1]):
+                self.idle.append(worker_id)
+        
+        if worker is not None:
+            worker["expiry"] = time.monotonic() + self.heartbeat_interval * self.liveness
+        self.dispatch()
+    
+    def complete(self, worker, envelope):
+        """从工作器的在途请求中删除 envelope 相同的一个"""
+        in_flight = worker["in_flight"]
+        for i, frames in enumerate(in_flight):
+            if frames[:-1] == envelope:
+                del in_flight[i]
+                return True
+        return False
+    
+    def dispatch(self):
+        now = time.monotonic()
+        while self.idle and self.pending:
+            queued_at, frames = self.pending.popleft()
+            self.total_wait += now - queued_at
+            worker_id = self.idle.popleft()
+            self.workers[worker_id]["in_flight"].append(frames)
+            self.backend.send_multipart([worker_id] + frames)
+            self.dispatched += 1
+    
+    def send_heartbeats(self):
+        """只给发过心跳的工作器发心跳，旧的 worker.py 不认识 HEARTBEAT 消息"""
+        for worker_id, worker in self.workers.items():
+            if worker["heartbeat"]:
+                self.backend.send_multipart([worker_id, HEARTBEAT])
+    
+    def expire_workers(self):
+        """删除心跳超时的工作器，把它们手上的请求放回队首"""
+        now = time.monotonic()
+        for worker_id, worker in list(self.workers.items()):
+            if not worker["heartbeat"] or now < worker["expiry"]:
+                continue
+            del self.workers[worker_id]
+            self.idle = deque(w for w in self.idle if w != worker_id)
+            in_flight = worker["in_flight"]
+            for frames in reversed(in_flight):
+                self.pending.appendleft((now, frames))
+            self.expired += 1
+            self.requeued += len(in_flight)
+            print(f"工作器 {worker_id.hex()} 心跳超时，重新排队 {len(in_flight)} 个请求")
+        self.dispatch()
+    
+    def metrics(self):
+        """队列深度等指标"""
+        return {
+            "queue_depth": len(self.pending),
+            "max_queue_depth": self.max_depth,
+            "idle_slots": len(self.idle),
+            "in_flight": sum(len(w["in_flight"]) for w in self.workers.values()),
+            "workers": len(self.workers),
+            "received": self.received,
+            "replied": self.replied,
+            "expired_workers": self.expired,
+            "requeued": self.requeued,
+            "avg_queue_wait_ms": self.total_wait / self.dispatched * 1000 if self.dispatched else 0.0,
+        }
+    
+    def run(self, report_interval=None):
+        """运行代理循环，直到 Context 被终止"""
+        poll_both = zmq.Poller()
+        poll_both.register(self.frontend, zmq.POLLIN)
+        poll_both.register(self.backend, zmq.POLLIN)
+        # 队列满时只轮询后端，不再接收新请求，压力会反压到客户端
+        poll_backend = zmq.Poller()
+        poll_backend.register(self.backend, zmq.POLLIN)
+        
+        next_report = time.monotonic() + report_interval if report_interval else None
+        next_heartbeat = time.monotonic() + self.heartbeat_interval
+        try:
+            while True:
+                poller = poll_both if len(self.pending) < self.max_queue else poll_backend
+                timeout = max(0.0, next_heartbeat - time.monotonic())
+                events = dict(poller.poll(timeout * 1000))
+                if self.backend in events:
+                    self.handle_backend()
+                if self.frontend in events:
+                    self.handle_frontend()
+                
+                now = time.monotonic()
+                if now >= next_heartbeat:
+                    self.send_heartbeats()
+                    self.expire_workers()
+                    next_heartbeat = now + self.heartbeat_interval
+                
+                if next_report and now >= next_report:
+                    m = self.metrics()
+                    print(f"队列深度 {m['queue_depth']}（最大 {m['max_queue_depth']}），"
+                          f"空闲 {m['idle_slots']}，处理中 {m['in_flight']}，工作器 {m['workers']}，"
+                          f"已响应 {m['replied']}，平均排队 {m['avg_queue_wait_ms']:.1f}ms，"
+                          f"过期工作器 {m['expired_workers']}，重新排队 {m['requeued']}")
+                    next_report = now + report_interval
+        except zmq.ContextTerminated:
+            pass
+        finally:
+            self.frontend.close()
+            self.backend.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="负载均衡代理（只向空闲工作器分发请求）")
+    parser.add_argument("--max-queue", type=int, default=10000, help="代理内部最多排队的请求数")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="打印队列指标的间隔（秒）")
+    parser.add_argument("--heartbeat-interval", type=float, default=HEARTBEAT_INTERVAL, help="心跳间隔（秒）")
+    parser.add_argument("--liveness", type=int, default=HEARTBEAT_LIVENESS,
+                        help="连续多少个心跳周期收不到消息就认为工作器已死亡")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    # 创建 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    
+    # 创建 ROUTER 套接字（前端）
+    frontend = context.socket(zmq.ROUTER)
+    frontend.bind(config.bind_endpoint(FRONTEND_PORT))
+    
+    # 创建 ROUTER 套接字（后端），按工作器身份定向发送
+    backend = context.socket(zmq.ROUTER)
+    backend.bind(config.bind_endpoint(BACKEND_PORT))
+    
+    print("负载均衡代理已启动...")
+    
+    broker = LruBroker(frontend, backend, max_queue=args.max_queue,
+                       heartbeat_interval=args.heartbeat_interval, liveness=args.liveness)
+    broker.run(report_interval=args.report_interval)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""ROUTER/DEALER 示例中代理与工作器之间的控制消息
+
+工作器（DEALER）发送 [READY] 表示自己空闲、可以接收请求；
+负载均衡代理（lru_broker.py）只把请求发给发过 READY 或刚返回响应的工作器。
+旧的 zmq.proxy 代理（broker.py）会把 READY 转发给前端 ROUTER，
+由于没有身份为 READY 的客户端，ROUTER 会直接丢弃，不影响原有用法。
+
+心跳：工作器用 --heartbeat 启动时每隔 HEARTBEAT_INTERVAL 秒发送 [HEARTBEAT]，
+负载均衡代理也向这些工作器发送心跳。任何一方连续 HEARTBEAT_LIVENESS 个周期
+收不到对方的消息，就认为对方已失联：代理删除该工作器并把它手上的请求重新排队，
+工作器则断开重连（新的套接字、新的身份），重新发送 READY。
+工作器在处理线程里处理请求，心跳由另一个循环发送，所以处理时间可以超过
+HEARTBEAT_INTERVAL * HEARTBEAT_LIVENESS；如果自己实现工作器时在心跳循环里同步处理请求，
+代理的 --liveness 要大于最长的处理时间，否则请求会被当成失联重新分配，处理两次。
+"""
+
+import time
+
+READY = b"READY"
+HEARTBEAT = b"HEARTBEAT"
+
+# 代理的前端（客户端连接）和后端（工作器连接）端口，地址由 ZmqConfig 生成
+FRONTEND_PORT = 5555
+BACKEND_PORT = 5556
+
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT_LIVENESS = 3
+RECONNECT_INITIAL = 1.0
+RECONNECT_MAX = 32.0
+
+class WorkerHeartbeat:
+    """工作器端的心跳状态"""
+    
+    def __init__(self, interval=HEARTBEAT_INTERVAL, liveness=HEARTBEAT_LIVENESS):
+        self.interval = interval
+        self.max_liveness = liveness
+        self.liveness = liveness
+        self.reconnect_delay = RECONNECT_INITIAL
+        self.next_send = time.monotonic() + interval
+    
+    def on_message(self):
+        """收到代理的任何消息都说明代理还活着"""
+        self.liveness = self.max_liveness
+        self.reconnect_delay = RECONNECT_INITIAL
+    
+    def on_silence(self):
+        """一个心跳周期内没有收到代理的消息；返回 True 表示代理已失联"""
+        self.liveness -= 1
+        return self.liveness <= 0
+    
+    def should_send(self):
+        """到了发送心跳的时间就返回 True，并安排下一次"""
+        now = time.monotonic()
+        if now < self.next_send:
+            return False
+        self.next_send = now + self.interval
+        return True
+    
+    def wait_before_reconnect(self):
+        """重连前等待，等待时间指数退避"""
+        time.sleep(self.reconnect_delay)
+        self.reconnect_delay = min(self.reconnect_delay * 2, RECONNECT_MAX)
+        self.liveness = self.max_liveness
\ No newline at end of file
@@ -0,0 +1,126 @@
+import os
+import sys
+import zmq
+import time
+import hashlib
+import argparse
+import threading
+
+from protocol import READY, HEARTBEAT, BACKEND_PORT, WorkerHeartbeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+
+HANDLERS_ENDPOINT = "inproc://handlers"
+
+def handle_sleep(content, args):
+    """模拟 IO 型处理（time.sleep 会释放 GIL）"""
+    time.sleep(args.work_ms / 1000)
+    return f"已处理: {bytes(content).decode('utf-8')}".encode('utf-8')
+
+def handle_hash(content, args):
+    """模拟 CPU 型处理：pbkdf2_hmac 在计算期间释放 GIL，多个线程可以同时占满多个核"""
+    digest = hashlib.pbkdf2_hmac("sha256", bytes(content), b"router_dealer", args.iterations)
+    return digest.hex().encode('utf-8')
+
+HANDLERS = {"sleep": handle_sleep, "hash": handle_hash}
+
+def handler_thread(context, handler, args):
+    """处理线程：从 inproc DEALER 接收请求，保留 envelope 原样返回"""
+    socket = context.socket(zmq.DEALER)
+    socket.connect(HANDLERS_ENDPOINT)
+    name = threading.current_thread().name
+    while True:
+        try:
+            # copy=False：inproc 上的帧不复制，envelope 帧原样转发回去
+            frames = socket.recv_multipart(copy=False)
+        except zmq.ContextTerminated:
+            break
+        envelope, content = frames[:-1], frames[-1]
+        response = handler(content.buffer, args)
+        socket.send_multipart(envelope + [response], copy=False)
+        if args.verbose:
+            print(f"[{name}] 已处理: {content.bytes.decode('utf-8', errors='replace')}")
+    socket.close()
+
+def connect_frontend(context, endpoint, threads):
+    """DEALER 连接代理的后端，每个处理线程对应一个空位"""
+    frontend = context.socket(zmq.DEALER)
+    frontend.setsockopt(zmq.LINGER, 0)
+    frontend.connect(endpoint)
+    # 负载均衡代理会最多同时分配 threads 个请求给这个进程
+    for _ in range(threads):
+        frontend.send(READY)
+    return frontend
+
+def proxy_with_heartbeat(context, endpoint, backend, threads):
+    """代替 zmq.proxy 的转发循环：拦截代理的心跳，代理失联时重连前端
+    
+    重连后处理线程还没返回的响应会发到新的前端套接字上，代理按关联信息转发给客户端。
+    """
+    frontend = connect_frontend(context, endpoint, threads)
+    poller = zmq.Poller()
+    poller.register(frontend, zmq.POLLIN)
+    poller.register(backend, zmq.POLLIN)
+    heartbeat = WorkerHeartbeat()
+    
+    while True:
+        events = dict(poller.poll(heartbeat.interval * 1000))
+        if backend in events:
+            frontend.send_multipart(backend.recv_multipart(copy=False), copy=False)
+        if frontend in events:
+            frames = frontend.recv_multipart(copy=False)
+            heartbeat.on_message()
+            if len(frames) != 1 or frames[0].bytes != HEARTBEAT:
+                backend.send_multipart(frames, copy=False)
+        elif not events and heartbeat.on_silence():
+            print(f"代理失联，{heartbeat.reconnect_delay:.0f} 秒后重连...")
+            heartbeat.wait_before_reconnect()
+            poller.unregister(frontend)
+            frontend.close()
+            frontend = connect_frontend(context, endpoint, threads)
+            poller.register(frontend, zmq.POLLIN)
+        
+        if heartbeat.should_send():
+            frontend.send(HEARTBEAT)
+
+def main():
+    parser = argparse.ArgumentParser(description="多线程工作器：一个进程内 N 个处理线程")
+    parser.add_argument("--threads", type=int, default=4, help="处理线程数")
+    parser.add_argument("--handler", choices=sorted(HANDLERS), default="sleep", help="处理函数")
+    parser.add_argument("--work-ms", type=float, default=1000, help="sleep 处理函数的耗时（毫秒）")
+    parser.add_argument("--iterations", type=int, default=100000, help="hash 处理函数的迭代次数")
+    parser.add_argument("--verbose", action="store_true", help="打印每个请求")
+    parser.add_argument("--heartbeat", action="store_true",
+                        help="与负载均衡代理互发心跳，代理失联时自动重连")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    # 创建 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    endpoint = config.connect_endpoint(BACKEND_PORT)
+    
+    # 对内：DEALER 绑定 inproc 地址，把请求轮流分给处理线程
+    backend = context.socket(zmq.DEALER)
+    backend.bind(HANDLERS_ENDPOINT)
+    
+    handler = HANDLERS[args.handler]
+    for i in range(args.threads):
+        threading.Thread(target=handler_thread, args=(context, handler, args),
+                         name=f"handler-{i}", daemon=True).start()
+    
+    print(f"多线程工作器已启动，{args.threads} 个处理线程，处理函数: {args.handler}...")
+    
+    if args.heartbeat:
+        proxy_with_heartbeat(context, endpoint, backend, args.threads)
+        return
+    
+    # 对外：DEALER 连接代理的后端，与单线程 worker.py 相同
+    frontend = connect_frontend(context, endpoint, args.threads)
+    
+    # 在两个套接字之间转发消息，转发在 libzmq 内部完成，不经过 Python
+    zmq.proxy(frontend, backend)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,39 +1,141 @@
+import os
+import sys
 import zmq
 import time
+import argparse
+import threading
 
-def main():
-    # 创建 ZMQ 上下文
-    context = zmq.Context()
-    
+from protocol import READY, HEARTBEAT, BACKEND_PORT, WorkerHeartbeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from zmq_config import ZmqConfig
+from zero_copy import frame_buffer
+
+HANDLER_ENDPOINT = "inproc://worker-handler"
+
+def connect_worker(context, endpoint):
+    """创建 DEALER 套接字连接代理，并告诉代理自己已空闲"""
     # 创建 DEALER 套接字
     socket = context.socket(zmq.DEALER)
+    socket.setsockopt(zmq.LINGER, 0)
     
     # 连接到代理
-    socket.connect("tcp://localhost:5556")
+    socket.connect(endpoint)
     
-    print("工作器已启动...")
+    # 告诉代理自己已空闲（负载均衡代理 lru_broker.py 依赖这条消息，旧代理会忽略它）
+    socket.send(READY)
+    return socket
+
+def handle_request(socket, frames):
+    """处理一个请求并发送响应"""
+    # 接收多帧消息（envelope + 内容）
+    # envelope 是内容之前的所有帧：客户端身份，以及流水线客户端附带的关联 ID
+    if len(frames) < 2:
+        print("收到的消息帧数不足，忽略。")
+        return
+    envelope, content = frames[:-1], frames[-1]
+    try:
+        request = content.decode('utf-8')
+    except Exception as e:
+        print(f"内容解码失败: {e}")
+        return
+    print(f"收到请求: {request}")
+    
+    # 处理请求
+    time.sleep(1)
     
+    # 发送响应（带上 envelope）
+    response = f"已处理: {request}".encode('utf-8')
+    socket.send_multipart(envelope + [response])
+    print(f"已发送响应: {response.decode('utf-8')}")
+
+def handle_payload(socket, frames):
+    """大负载模式：copy=False 收到的请求，负载帧不解码，以 zmq.Frame 原样发回，不复制数据"""
+    if len(frames) < 2:
+        print("收到的消息帧数不足，忽略。")
+        return
+    envelope, payload = frames[:-1], frames[-1]
+    print(f"收到负载: {frame_buffer(payload).nbytes} 字节")
+    socket.send_multipart(envelope + [payload], copy=False)
+
+def is_heartbeat(frames):
+    """frames 可以是 bytes，也可以是 copy=False 收到的 zmq.Frame"""
+    return len(frames) == 1 and bytes(frames[0]) == HEARTBEAT
+
+def handler_loop(context, handler, copy):
+    """处理线程：从 inproc PAIR 接收请求并调用 handler，响应经同一个套接字交回心跳循环"""
+    socket = context.socket(zmq.PAIR)
+    socket.connect(HANDLER_ENDPOINT)
     while True:
-        # 接收多帧消息（envelope + 内容）
-        frames = socket.recv_multipart()
-        if len(frames) < 2:
-            print("收到的消息帧数不足，忽略。")
-            continue
-        identity, content = frames[0], frames[1]
         try:
-            request = content.decode('utf-8')
-        except Exception as e:
-            print(f"内容解码失败: {e}")
-            continue
-        print(f"收到请求: {request}")
-        
-        # 处理请求
-        time.sleep(1)
+            frames = socket.recv_multipart(copy=copy)
+        except zmq.ContextTerminated:
+            break
+        handler(socket, frames)
+    socket.close()
+
+def run_with_heartbeat(context, endpoint, handler=handle_request, copy=True):
+    """带心跳的工作循环：代理失联时断开重连
+    
+    handler 在单独的处理线程里运行，心跳循环只负责转发，处理一个很慢的请求时也能按时发送心跳，
+    代理不会把正在工作的工作器当成失联、把它手上的请求重新分配（那样请求会被处理两次）。
+    """
+    pipe = context.socket(zmq.PAIR)
+    pipe.bind(HANDLER_ENDPOINT)
+    threading.Thread(target=handler_loop, args=(context, handler, copy), daemon=True).start()
+    
+    socket = connect_worker(context, endpoint)
+    poller = zmq.Poller()
+    poller.register(socket, zmq.POLLIN)
+    poller.register(pipe, zmq.POLLIN)
+    heartbeat = WorkerHeartbeat()
+    
+    while True:
+        events = dict(poller.poll(heartbeat.interval * 1000))
+        if pipe in events:
+            # 处理线程的响应；重连后会发到新的套接字上
+            socket.send_multipart(pipe.recv_multipart(copy=False), copy=False)
+        if socket in events:
+            frames = socket.recv_multipart(copy=False)
+            heartbeat.on_message()
+            if not is_heartbeat(frames):
+                pipe.send_multipart(frames, copy=False)
+        elif not events and heartbeat.on_silence():
+            print(f"代理失联，{heartbeat.reconnect_delay:.0f} 秒后重连...")
+            heartbeat.wait_before_reconnect()
+            poller.unregister(socket)
+            socket.close()
+            socket = connect_worker(context, endpoint)
+            poller.register(socket, zmq.POLLIN)
         
-        # 发送响应（带上 envelope）
-        response = f"已处理: {request}".encode('utf-8')
-        socket.send_multipart([identity, response])
-        print(f"已发送响应: {response.decode('utf-8')}")
+        if heartbeat.should_send():
+            socket.send(HEARTBEAT)
+
+def main():
+    parser = argparse.ArgumentParser(description="ROUTER/DEALER 工作器")
+    parser.add_argument("--heartbeat", action="store_true",
+                        help="与负载均衡代理互发心跳，代理失联时自动重连")
+    parser.add_argument("--zero-copy", action="store_true",
+                        help="大负载模式：用 copy=False 接收请求，把负载原样发回（配合客户端的 --payload-size）")
+    ZmqConfig.add_arguments(parser)
+    args = parser.parse_args()
+    
+    # 创建 ZMQ 上下文
+    config = ZmqConfig.from_args(args)
+    context = config.context()
+    endpoint = config.connect_endpoint(BACKEND_PORT)
+    
+    print("工作器已启动...")
+    
+    handler = handle_payload if args.zero_copy else handle_request
+    copy = not args.zero_copy
+    if args.heartbeat:
+        run_with_heartbeat(context, endpoint, handler, copy)
+        return
+    
+    socket = connect_worker(context, endpoint)
+    while True:
+        handler(socket, socket.recv_multipart(copy=copy))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
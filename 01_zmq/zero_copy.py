@@ -0,0 +1,87 @@
+"""大消息的零拷贝收发，push_pull 和 router_dealer 的大负载模式以及 benchmark/payload_bench.py 共用
+
+send_string / send(bytes) 会把负载复制一份到 libzmq 的消息里。copy=False 时 libzmq 直接引用
+Python 对象的内存（bytes、memoryview、NumPy 数组等支持缓冲区协议的对象），
+代价是发送完成之前这块内存不能被修改：track=True 返回 zmq.MessageTracker，
+tracker.done 为 True 说明 libzmq 已经释放了这条消息（写进了内核，或者 inproc 的对端已经释放），
+这之后才能往缓冲区里写新数据。BufferPool 按这个规则轮流复用一组缓冲区。
+
+接收端 recv_multipart(copy=False) 返回 zmq.Frame，frame.buffer 是指向 libzmq 消息内存的 memoryview，
+np.frombuffer(frame.buffer, ...) 也不复制；只要还持有 Frame 或者由它得到的 memoryview / 数组，
+消息内存就不会被释放。收到的 Frame 可以用 copy=False 原样转发，同样不复制数据。
+
+小于 zmq.COPY_THRESHOLD（pyzmq 默认 64KB）的帧即使指定 copy=False 也会被复制，
+零拷贝需要的引用计数和释放回调对小消息来说比复制还贵，这时返回的 tracker 总是已完成。
+"""
+
+import numpy as np
+import zmq
+
+# 负载开头 8 字节写入序号（小端），接收端据此检查数据是否被发送端提前改写
+STAMP_SIZE = 8
+
+# 接收端检查负载时每隔一页读一个字节
+PAGE_SIZE = 4096
+
+def make_buffer(size):
+    """分配一个 size 字节的发送缓冲区
+    
+    写满一遍让每一页都真正分配；np.zeros 的大缓冲区在写入前只映射到共享的零页，读起来比真实数据便宜。
+    """
+    return np.full(size, 0xA5, dtype=np.uint8)
+
+def stamp(buffer, seq):
+    """把序号写进缓冲区开头"""
+    buffer[:STAMP_SIZE] = np.frombuffer(seq.to_bytes(STAMP_SIZE, "little"), dtype=np.uint8)
+
+def read_stamp(buffer):
+    """读出缓冲区开头的序号；buffer 可以是 bytes、memoryview 或 NumPy 数组"""
+    return int.from_bytes(bytes(buffer[:STAMP_SIZE]), "little")
+
+class BufferPool:
+    """一组轮流复用的发送缓冲区
+    
+    acquire 取下一个缓冲区，它上一次的发送还没完成时先等待，避免改写 libzmq 还在引用的内存；
+    track 记录这次发送的 MessageTracker。waits 统计复用时需要等待的次数，
+    一直很高说明缓冲区数量比在途消息少，发送端被卡在等待发送完成上。
+    """
+    
+    def __init__(self, size, count=4):
+        self.buffers = [make_buffer(size) for _ in range(count)]
+        self.trackers = [None] * count
+        self.next = 0
+        self.waits = 0
+    
+    def acquire(self, timeout=-1):
+        """返回 (编号, 缓冲区)；timeout 是等待发送完成的秒数，-1 表示一直等"""
+        index = self.next
+        self.next = (index + 1) % len(self.buffers)
+        tracker = self.trackers[index]
+        if tracker is not None and not tracker.done:
+            self.waits += 1
+            tracker.wait(timeout)
+        self.trackers[index] = None
+        return index, self.buffers[index]
+    
+    def track(self, index, tracker):
+        self.trackers[index] = tracker
+    
+    def wait_all(self, timeout=-1):
+        """等待所有在途的发送完成"""
+        for tracker in self.trackers:
+            if tracker is not None:
+                tracker.wait(timeout)
+
+def send_zero_copy(socket, frames, payload, flags=0):
+    """发送 frames + [payload]，不复制负载，返回负载的 MessageTracker"""
+    return socket.send_multipart(list(frames) + [payload], flags, copy=False, track=True)
+
+def touch_pages(buffer):
+    """每页读一个字节并求和，确认接收端真的访问了负载内存，而不只是拿到了指针"""
+    return int(np.frombuffer(buffer, dtype=np.uint8)[::PAGE_SIZE].sum())
+
+def frame_buffer(frame):
+    """帧内容的 memoryview；frame 是 zmq.Frame 时不复制，bytes 时包装成 memoryview"""
+    if isinstance(frame, zmq.Frame):
+        return frame.buffer
+    return memoryview(frame)
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""所有 01_zmq 示例共用的 ZMQ Context / 套接字 / 地址配置
+
+每个示例都通过 ZmqConfig 创建 Context、拼出绑定和连接的地址，配置来自环境变量或命令行，命令行优先：
+
+    环境变量                        命令行                      对应的 ZMQ 选项
+    ZMQ_DEMO_IO_THREADS            --zmq-io-threads            Context 的 IO 线程数
+    ZMQ_DEMO_SNDHWM                --zmq-sndhwm                ZMQ_SNDHWM
+    ZMQ_DEMO_RCVHWM                --zmq-rcvhwm                ZMQ_RCVHWM
+    ZMQ_DEMO_LINGER                --zmq-linger                ZMQ_LINGER（毫秒）
+    ZMQ_DEMO_TCP_KEEPALIVE         --zmq-tcp-keepalive         ZMQ_TCP_KEEPALIVE（1 开启，0 关闭）
+    ZMQ_DEMO_TCP_KEEPALIVE_IDLE    --zmq-tcp-keepalive-idle    ZMQ_TCP_KEEPALIVE_IDLE（秒）
+    ZMQ_DEMO_TCP_KEEPALIVE_INTVL   --zmq-tcp-keepalive-intvl   ZMQ_TCP_KEEPALIVE_INTVL（秒）
+    ZMQ_DEMO_TCP_KEEPALIVE_CNT     --zmq-tcp-keepalive-cnt     ZMQ_TCP_KEEPALIVE_CNT
+    ZMQ_DEMO_SNDBUF                --zmq-sndbuf                ZMQ_SNDBUF（内核发送缓冲区，字节）
+    ZMQ_DEMO_RCVBUF                --zmq-rcvbuf                ZMQ_RCVBUF（内核接收缓冲区，字节）
+    ZMQ_DEMO_HOST                  --zmq-host                  连接的主机，默认 localhost
+    ZMQ_DEMO_BIND_HOST             --zmq-bind-host             绑定的网卡地址，默认 *（所有网卡）
+
+没有设置的选项保持 libzmq 的默认值。套接字选项通过 Context.setsockopt 设置为 Context 的默认值，
+这个 Context 创建的每个套接字都会自动带上（对某种套接字不适用的选项会被 pyzmq 忽略），
+示例代码里单独设置的选项（例如 worker 的 LINGER 0）在创建之后设置，仍然优先。
+
+每个角色的端口仍由示例自己决定（例如推送者 5555、收集器 5556），地址统一用
+config.bind_endpoint(port) / config.connect_endpoint(port) 生成，把发布者、代理和工作器
+部署到不同机器时只需要设置 ZMQ_DEMO_HOST，不用修改每个文件。
+
+示例脚本在 01_zmq 的子目录里，用下面两行导入这个模块（pub_sub/demo_0x 下的脚本多嵌套一层，再多一个 os.path.dirname）：
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from zmq_config import ZmqConfig
+"""
+
+import os
+
+import zmq
+
+ENV_PREFIX = "ZMQ_DEMO_"
+
+# 字段名 -> 对应的套接字选项；io_threads 是 Context 选项，单独处理
+SOCKET_OPTIONS = {
+    "sndhwm": zmq.SNDHWM,
+    "rcvhwm": zmq.RCVHWM,
+    "linger": zmq.LINGER,
+    "tcp_keepalive": zmq.TCP_KEEPALIVE,
+    "tcp_keepalive_idle": zmq.TCP_KEEPALIVE_IDLE,
+    "tcp_keepalive_intvl": zmq.TCP_KEEPALIVE_INTVL,
+    "tcp_keepalive_cnt": zmq.TCP_KEEPALIVE_CNT,
+    "sndbuf": zmq.SNDBUF,
+    "rcvbuf": zmq.RCVBUF,
+}
+# 地址字段是字符串，其余字段都是整数
+ADDRESS_FIELDS = {
+    "host": "localhost",
+    "bind_host": "*",
+}
+FIELDS = ["io_threads"] + list(SOCKET_OPTIONS) + list(ADDRESS_FIELDS)
+
+HELP = {
+    "io_threads": "Context 的 IO 线程数",
+    "sndhwm": "发送高水位（每个连接最多排队的消息数）",
+    "rcvhwm": "接收高水位",
+    "linger": "关闭套接字时等待未发送消息的时间（毫秒），-1 表示一直等",
+    "tcp_keepalive": "TCP keepalive：1 开启，0 关闭，-1 使用系统默认",
+    "tcp_keepalive_idle": "连接空闲多少秒后开始发送 keepalive 探测",
+    "tcp_keepalive_intvl": "keepalive 探测间隔（秒）",
+    "tcp_keepalive_cnt": "连续多少次探测失败后断开连接",
+    "sndbuf": "内核发送缓冲区大小（字节）",
+    "rcvbuf": "内核接收缓冲区大小（字节）",
+    "host": "连接的主机名或 IP，默认 localhost",
+    "bind_host": "绑定的网卡地址，默认 * 表示所有网卡",
+}
+
+class ZmqConfig:
+    """ZMQ Context 和套接字选项；值为 None 的选项不设置"""
+    
+    def __init__(self, **options):
+        unknown = set(options) - set(FIELDS)
+        if unknown:
+            raise TypeError(f"未知的 ZMQ 选项: {', '.join(sorted(unknown))}")
+        for field in FIELDS:
+            setattr(self, field, options.get(field))
+    
+    @classmethod
+    def from_env(cls, environ=None):
+        """从 ZMQ_DEMO_* 环境变量读取配置"""
+        environ = os.environ if environ is None else environ
+        options = {}
+        for field in FIELDS:
+            name = ENV_PREFIX + field.upper()
+            value = environ.get(name)
+            if value in (None, ""):
+                continue
+            if field in ADDRESS_FIELDS:
+                options[field] = value
+                continue
+            try:
+                options[field] = int(value)
+            except ValueError:
+                raise ValueError(f"环境变量 {name} 必须是整数，当前值为 {value!r}") from None
+        return cls(**options)
+    
+    @staticmethod
+    def add_arguments(parser):
+        """给 argparse 解析器加上 --zmq-* 参数"""
+        group = parser.add_argument_group("ZMQ 选项（也可以用 ZMQ_DEMO_* 环境变量设置）")
+        for field in FIELDS:
+            group.add_argument(f"--zmq-{field.replace('_', '-')}", dest=f"zmq_{field}",
+                               type=str if field in ADDRESS_FIELDS else int, default=None, help=HELP[field])
+    
+    @classmethod
+    def from_args(cls, args, environ=None):
+        """环境变量作为默认值，命令行参数覆盖"""
+        config = cls.from_env(environ)
+        for field in FIELDS:
+            value = getattr(args, f"zmq_{field}", None)
+            if value is not None:
+                setattr(config, field, value)
+        return config
+    
+    def socket_options(self):
+        """[(套接字选项, 值), ...]，只包含设置过的选项"""
+        return [(option, getattr(self, field)) for field, option in SOCKET_OPTIONS.items()
+                if getattr(self, field) is not None]
+    
+    def bind_endpoint(self, port):
+        """绑定地址，例如 tcp://*:5555"""
+        return f"tcp://{self.bind_host or ADDRESS_FIELDS['bind_host']}:{port}"
+    
+    def connect_endpoint(self, port):
+        """连接地址，例如 tcp://localhost:5555"""
+        return f"tcp://{self.host or ADDRESS_FIELDS['host']}:{port}"
+    
+    def context(self, context_class=zmq.Context):
+        """按配置创建 Context；context_class 可以是 zmq.asyncio.Context 等子类"""
+        if self.io_threads is not None:
+            context = context_class(io_threads=self.io_threads)
+        else:
+            context = context_class()
+        for option, value in self.socket_options():
+            context.setsockopt(option, value)
+        return context
+    
+    def as_dict(self):
+        """设置过的选项"""
+        return {field: getattr(self, field) for field in FIELDS if getattr(self, field) is not None}
+    
+    def effective_dict(self):
+        """实际生效的全部选项（包括没有设置、取 libzmq 默认值的），用于基准测试报告
+        
+        按配置创建一个临时的 Context 和套接字，把每个选项读回来，不同报告之间可以直接比较。
+        """
+        context = self.context()
+        try:
+            socket = context.socket(zmq.DEALER)
+            try:
+                options = {"io_threads": context.get(zmq.IO_THREADS)}
+                options.update((field, socket.getsockopt(option)) for field, option in SOCKET_OPTIONS.items())
+            finally:
+                socket.close(linger=0)
+        finally:
+            context.term()
+        options.update((field, getattr(self, field) or default) for field, default in ADDRESS_FIELDS.items())
+        return options
+    
+    def __repr__(self):
+        options = ", ".join(f"{k}={v}" for k, v in self.as_dict().items())
+        return f"ZmqConfig({options})"
\ No newline at end of file
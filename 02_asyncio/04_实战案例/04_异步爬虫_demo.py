@@ -3,27 +3,245 @@
 """
 异步爬虫演示
 需要安装: pip install aiohttp beautifulsoup4
+使用 lxml 解析器还需要: pip install lxml
 """
 
 import asyncio
 import aiohttp
 import time
+import math
+import zlib
+import codecs
+import sqlite3
+import hashlib
+import concurrent.futures
+from collections import deque, Counter
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
 import json
 import os
 
+# 解析方式：inline 在事件循环里直接解析；thread 放到默认线程池；process 放到进程池
+PARSE_BACKENDS = ['inline', 'thread', 'process']
+
+# 去重方式：set 精确但每个 URL 占上百字节；bloom 每个 URL 约 2 字节，适合百万级 URL
+DEDUP_BACKENDS = ['set', 'bloom']
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 默认只下载这些类型（按前缀匹配 Content-Type），图片、视频、压缩包等二进制内容在下载正文之前就跳过
+TEXT_CONTENT_TYPES = ('text/', 'application/xhtml+xml', 'application/xml', 'application/json')
+
+
+def normalize_url(url, base=None):
+    """规范化 URL，使指向同一页面的不同写法得到同一个字符串；不是 http/https 链接时返回 None
+    
+    相对链接按 base 补全；协议和主机名转小写；去掉默认端口和 #片段；空路径补成 /；查询参数按名字排序
+    """
+    if base:
+        url = urljoin(base, url)
+    parts = urlparse(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    
+    netloc = parts.hostname
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunparse((scheme, netloc, parts.path or '/', parts.params, query, ''))
+
+
+class BloomFilter:
+    """布隆过滤器：用固定大小的位数组记录见过的 URL，接口与 set 相同（add / in）
+    
+    误判只会是把没见过的 URL 当成见过（概率约为 error_rate，少爬这个页面），不会重复爬取。
+    capacity 个 URL、误判率 0.1% 时约占 capacity * 1.8 字节，而 set 里每个 URL 字符串要上百字节。
+    """
+    
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item):
+        # 一次哈希得到两个 64 位数，组合出 hash_count 个位置（双重哈希）
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+    
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    def __len__(self):
+        return self.count
+
+
+def extract_page(url, content, parser='html.parser'):
+    """从 HTML 中提取标题、链接和文本统计
+    
+    纯函数，不依赖爬虫对象，可以直接调用，也可以交给线程池 / 进程池执行（进程池要求函数定义在模块顶层）
+    """
+    soup = BeautifulSoup(content, parser)
+    
+    # 提取标题
+    title = soup.find('title')
+    
+    # 提取链接
+    links = soup.find_all('a', href=True)
+    
+    # 提取文本内容（简化版）
+    text_content = soup.get_text()
+    
+    return {
+        'title': title.get_text().strip() if title else '无标题',
+        'links': [urljoin(url, link['href']) for link in links],
+        'text_length': len(text_content),
+        'word_count': len(text_content.split())
+    }
+
+
+class ResponseCache:
+    """磁盘上的响应缓存（SQLite），以 URL 为键，用于条件请求和增量重新爬取
+    
+    保存页面的 ETag / Last-Modified、zlib 压缩后的正文和解析结果。再次爬取时带上 If-None-Match /
+    If-Modified-Since，服务器返回 304 就直接使用缓存的解析结果，不用重新下载也不用重新解析。
+    压缩后的正文总大小超过 max_bytes 时，按最近访问时间淘汰最久没用过的条目（LRU）。
+    """
+    
+    def __init__(self, path='crawler_cache.sqlite3', max_bytes=100 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_type TEXT, '
+            'body BLOB, size INTEGER, stored_size INTEGER, parsed TEXT, accessed REAL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self.hits = 0
+        self.evictions = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def get(self, url):
+        """返回缓存的校验信息和解析结果（不含正文），没有缓存时返回 None"""
+        row = self.db.execute(
+            'SELECT etag, last_modified, content_type, size, parsed FROM responses WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, content_type, size, parsed = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': content_type,
+            'size': size,
+            'parsed': json.loads(parsed)
+        }
+    
+    def validators(self, url):
+        """条件请求头：有缓存时服务器可以用 304 回答"""
+        entry = self.get(url)
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return entry, headers
+    
+    def touch(self, url):
+        """服务器返回 304：记一次命中，更新访问时间"""
+        self.hits += 1
+        with self.db:
+            self.db.execute('UPDATE responses SET accessed = ? WHERE url = ?', (time.time(), url))
+    
+    def load_body(self, url):
+        """解压并返回缓存的正文"""
+        row = self.db.execute('SELECT body FROM responses WHERE url = ?', (url,)).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+    
+    def put(self, url, content, etag, last_modified, content_type, parsed, size=None):
+        """保存一个响应，size 是原始正文的字节数；没有 ETag 和 Last-Modified 的响应无法条件请求，不缓存"""
+        if not etag and not last_modified:
+            return
+        raw = content.encode('utf-8')
+        body = zlib.compress(raw)
+        if len(body) > self.max_bytes:
+            return
+        with self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, content_type, body, size or len(raw), len(body),
+                 json.dumps(parsed, ensure_ascii=False), time.time()))
+            self.evict()
+    
+    def total_bytes(self):
+        return self.db.execute('SELECT COALESCE(SUM(stored_size), 0) FROM responses').fetchone()[0]
+    
+    def evict(self):
+        """从最久没访问的条目开始删除，直到总大小不超过 max_bytes"""
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+        for url, stored_size in self.db.execute('SELECT url, stored_size FROM responses ORDER BY accessed').fetchall():
+            self.db.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self.evictions += 1
+            excess -= stored_size
+            if excess <= 0:
+                break
+    
+    def close(self):
+        self.db.close()
+
 
 class AsyncWebCrawler:
     """异步网络爬虫"""
     
-    def __init__(self, max_concurrent=10, timeout=30):
+    def __init__(self, max_concurrent=10, timeout=30, parse_backend='inline', parser='html.parser',
+                 parse_workers=None, per_host_limit=None, dedup='set', expected_urls=1000000, cache=None,
+                 max_body_size=10 * 1024 * 1024, content_types=TEXT_CONTENT_TYPES, chunk_size=64 * 1024):
+        """
+        parse_backend: inline / thread / process，见 PARSE_BACKENDS。BeautifulSoup 解析是 CPU 密集的同步代码，
+        inline 解析大页面时会阻塞事件循环里所有进行中的请求；process 在进程池里解析，不占用事件循环，多核时还能并行。
+        parser: 传给 BeautifulSoup 的解析器，'lxml' 比默认的 'html.parser' 快数倍。
+        parse_workers: 同时解析的页面数，process 模式下也是进程数，默认 inline 为 1，其他为 CPU 核数。
+        per_host_limit: 每个主机同时进行的请求数上限（在全局的 max_concurrent 之内），默认不单独限制。
+            只有 crawl_recursive 按主机轮流调度；crawl_stream / crawl_urls 里它只是上限，不保证主机之间公平（见 crawl_stream）。
+        dedup: 递归爬取时 visited_urls 的去重方式，见 DEDUP_BACKENDS；bloom 按 expected_urls 个 URL 分配位数组。
+        cache: ResponseCache，设置后对缓存过的页面发条件请求，304 时直接使用缓存的解析结果。
+        max_body_size: 正文的最大字节数，超过时停止下载并放弃这个页面，None 表示不限制。
+        content_types: 允许下载的 Content-Type 前缀，None 表示不过滤。
+        chunk_size: 流式读取正文时每次读取的字节数。
+        """
+        if parse_backend not in PARSE_BACKENDS:
+            raise ValueError(f"未知的解析方式: {parse_backend}，可选: {PARSE_BACKENDS}")
+        if dedup not in DEDUP_BACKENDS:
+            raise ValueError(f"未知的去重方式: {dedup}，可选: {DEDUP_BACKENDS}")
         self.max_concurrent = max_concurrent
         self.timeout = timeout
+        self.parse_backend = parse_backend
+        self.parser = parser
+        self.parse_workers = parse_workers or (1 if parse_backend == 'inline' else os.cpu_count() or 1)
         self.session = None
+        self.executor = None
         self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.per_host_limit = per_host_limit or max_concurrent
+        self.host_semaphores = {}
         self.results = []
-        self.visited_urls = set()
+        self.visited_urls = set() if dedup == 'set' else BloomFilter(expected_urls)
+        self.cache = cache
+        self.max_body_size = max_body_size
+        self.content_types = content_types
+        self.chunk_size = chunk_size
     
     async def __aenter__(self):
         """异步上下文管理器入口"""
@@ -34,27 +252,68 @@ class AsyncWebCrawler:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
         )
+        if self.parse_backend == 'process':
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.parse_workers)
+        elif self.parse_backend == 'thread':
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.parse_workers)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """异步上下文管理器出口"""
         if self.session:
             await self.session.close()
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+    
+    def host_semaphore(self, url):
+        """每个主机一个信号量，限制对同一主机的并发请求"""
+        host = urlparse(url).netloc
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self.host_semaphores[host]
     
     async def fetch_page(self, url):
         """获取页面内容"""
-        async with self.semaphore:  # 限制并发数
+        # 先占主机的名额再占全局名额，等待繁忙的主机时不占用全局并发
+        async with self.host_semaphore(url), self.semaphore:  # 限制并发数
             try:
                 print(f"正在获取: {url}")
-                async with self.session.get(url, ssl=False) as response:
-                    if response.status == 200:
-                        content = await response.text()
+                # 缓存过的页面带上 If-None-Match / If-Modified-Since
+                entry, headers = self.cache.validators(url) if self.cache else (None, {})
+                async with self.session.get(url, ssl=False, headers=headers) as response:
+                    if response.status == 304 and entry:
+                        # 页面没有变化：不传输正文，沿用缓存的解析结果，parse_page 会跳过没有 content 的页面
+                        self.cache.touch(url)
+                        return {
+                            'url': url,
+                            'status': 200,
+                            'not_modified': True,
+                            'content_type': entry['content_type'],
+                            'size': entry['size'],
+                            **entry['parsed']
+                        }
+                    elif response.status == 200:
+                        content, size, error = await self.read_body(response)
+                        if error:
+                            # 与其他失败一样状态记为 0，统计和演示不会把跳过的页面算作成功；原始状态码保留在 http_status
+                            return {
+                                'url': url,
+                                'status': 0,
+                                'http_status': response.status,
+                                'skipped': True,
+                                'content_type': response.headers.get('content-type', ''),
+                                'size': size,
+                                'error': error
+                            }
                         return {
                             'url': url,
                             'status': response.status,
                             'content': content,
                             'content_type': response.headers.get('content-type', ''),
-                            'size': len(content)
+                            'etag': response.headers.get('etag'),
+                            'last_modified': response.headers.get('last-modified'),
+                            'size': size
                         }
                     else:
                         return {
@@ -69,54 +328,199 @@ class AsyncWebCrawler:
                     'error': str(e)
                 }
     
+    async def read_body(self, response):
+        """流式读取并解码正文，返回 (内容, 字节数, 错误)；跳过时内容为 None，错误说明原因
+        
+        response.text() 会把整个正文读进内存再解码，一个超大的资源就能占满内存、长时间占用一个并发名额。
+        这里先看响应头：Content-Type 不在 content_types 里、或 Content-Length 已经超过 max_body_size 的，
+        不下载正文直接放弃；否则按 chunk_size 分块读取，用增量解码器逐块解码（多字节字符跨块也能正确处理），
+        累计字节数超过 max_body_size 时立即停止，关闭响应会断开连接，释放并发名额。
+        """
+        content_type = response.headers.get('content-type', '')
+        if self.content_types is not None and not content_type.lower().startswith(self.content_types):
+            return None, 0, f"跳过非文本内容: {content_type or '未知类型'}"
+        
+        limit = self.max_body_size
+        if limit is not None and response.content_length is not None and response.content_length > limit:
+            return None, 0, f"正文 {response.content_length} 字节，超过上限 {limit} 字节"
+        
+        decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+        parts = []
+        size = 0
+        async for chunk in response.content.iter_chunked(self.chunk_size):
+            size += len(chunk)
+            if limit is not None and size > limit:
+                return None, size, f"正文超过上限 {limit} 字节，已停止下载"
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b'', final=True))
+        return ''.join(parts), size, None
+    
     async def parse_page(self, page_data):
         """解析页面内容"""
         if page_data['status'] != 200 or 'content' not in page_data:
             return page_data
         
         try:
-            soup = BeautifulSoup(page_data['content'], 'html.parser')
-            
-            # 提取标题
-            title = soup.find('title')
-            page_data['title'] = title.get_text().strip() if title else '无标题'
-            
-            # 提取链接
-            links = soup.find_all('a', href=True)
-            page_data['links'] = [urljoin(page_data['url'], link['href']) for link in links]
-            
-            # 提取文本内容（简化版）
-            text_content = soup.get_text()
-            page_data['text_length'] = len(text_content)
-            page_data['word_count'] = len(text_content.split())
-            
+            if self.executor:
+                # 在线程池 / 进程池里解析，事件循环可以继续处理其他请求
+                loop = asyncio.get_running_loop()
+                fields = await loop.run_in_executor(
+                    self.executor, extract_page, page_data['url'], page_data['content'], self.parser)
+            else:
+                fields = extract_page(page_data['url'], page_data['content'], self.parser)
+            page_data.update(fields)
+            if self.cache:
+                # 正文和解析结果一起缓存，下次 304 时两者都不用重新计算
+                self.cache.put(page_data['url'], page_data['content'], page_data.get('etag'),
+                               page_data.get('last_modified'), page_data['content_type'], fields, page_data['size'])
             return page_data
         except Exception as e:
             page_data['parse_error'] = str(e)
             return page_data
     
-    async def crawl_urls(self, urls):
-        """爬取多个URL"""
-        print(f"开始爬取 {len(urls)} 个URL...")
-        start_time = time.time()
+    async def crawl_stream(self, urls, queue_size=None, keep_content=False):
+        """流式爬取：获取 → 解析 → 输出 三个阶段用有界的 asyncio.Queue 连接，以异步生成器逐个产出结果
+        
+        解析和网络 IO 重叠进行，不用等所有页面都下载完。urls 可以是任意（包括惰性的）可迭代对象，
+        结果按完成顺序产出，不保证与 urls 的顺序一致。每个队列最多 queue_size 个元素（默认等于 max_concurrent），
+        调用方处理得慢时会一级级反压到获取阶段，所以同时在内存里的页面不超过
+        max_concurrent + 2 * queue_size + parse_workers 个，与 URL 总数无关。keep_content 为 False 时解析完就丢掉页面正文，只保留解析结果。
+        
+        URL 按 urls 的顺序交给 max_concurrent 个获取协程，协程取到 URL 后才等待所在主机的 per_host_limit 名额，
+        等待期间一直占着自己的位置。urls 里连续一长串同一主机的 URL 会让所有获取协程都卡在这个主机上，
+        排在后面的空闲主机的 URL 也只能等着。需要按主机公平调度时用 crawl_recursive(urls, max_pages=len(urls), max_depth=0)，只爬给定的 URL，
+        或者调用前把 urls 按主机交错排列。
+        """
+        queue_size = queue_size or self.max_concurrent
+        url_queue = asyncio.Queue(queue_size)
+        page_queue = asyncio.Queue(queue_size)
+        result_queue = asyncio.Queue(queue_size)
+        
+        async def produce():
+            for url in urls:
+                await url_queue.put(url)
+            # 每个获取协程一个结束标记
+            for _ in range(self.max_concurrent):
+                await url_queue.put(None)
+        
+        async def fetch_worker():
+            while True:
+                url = await url_queue.get()
+                if url is None:
+                    break
+                await page_queue.put(await self.fetch_page(url))
+        
+        async def fetch():
+            await asyncio.gather(*(fetch_worker() for _ in range(self.max_concurrent)))
+            await page_queue.put(None)
         
-        # 创建获取任务
-        fetch_tasks = [self.fetch_page(url) for url in urls]
+        async def parse_worker():
+            while True:
+                page = await page_queue.get()
+                if page is None:
+                    # 把结束标记传给下一个解析协程
+                    await page_queue.put(None)
+                    break
+                result = await self.parse_page(page)
+                if not keep_content:
+                    result.pop('content', None)
+                await result_queue.put(result)
+        
+        async def parse():
+            await asyncio.gather(*(parse_worker() for _ in range(self.parse_workers)))
+            await result_queue.put(None)
+        
+        async def run_stage(stage):
+            # 某个阶段出错时把异常交给调用方，否则下游会一直等结束标记
+            try:
+                await stage()
+            except Exception as e:
+                await result_queue.put(e)
+        
+        tasks = [asyncio.create_task(run_stage(stage)) for stage in (produce, fetch, parse)]
+        try:
+            while True:
+                result = await result_queue.get()
+                if result is None:
+                    break
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            # 调用方提前退出（break 或异常）时取消还在运行的阶段
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def crawl_recursive(self, start_urls, max_pages=100, max_depth=2, same_host=True, keep_content=False):
+        """递归爬取：从 start_urls 出发，沿页面里的链接广度优先爬取，以异步生成器逐个产出结果
         
-        # 并发获取页面
-        pages = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+        待爬取的 URL（frontier）按主机分成多个队列，每次从还没达到 per_host_limit 的主机里轮流取 URL，
+        一个繁忙的主机不会占满全局的 max_concurrent，主机越多吞吐量越高，单个主机的压力不变。
+        链接先规范化（见 normalize_url），再用 visited_urls 去重，最多爬取 max_pages 个页面、max_depth 层链接。
+        same_host 为 True 时只跟随与 start_urls 相同主机的链接。
+        """
+        frontier = {}  # 主机 -> deque[(url, 深度)]
+        active = Counter()  # 主机 -> 正在进行的请求数
+        running = {}  # 任务 -> (主机, 深度)
+        scheduled = 0
         
-        # 解析页面
-        parse_tasks = []
-        for page in pages:
-            if isinstance(page, dict):
-                parse_tasks.append(self.parse_page(page))
+        def enqueue(url, depth, base=None):
+            nonlocal scheduled
+            url = normalize_url(url, base)
+            if url is None or scheduled >= max_pages or url in self.visited_urls:
+                return
+            host = urlparse(url).netloc
+            if same_host and depth and host not in start_hosts:
+                return
+            self.visited_urls.add(url)
+            frontier.setdefault(host, deque()).append((url, depth))
+            scheduled += 1
         
-        # 并发解析页面
-        results = await asyncio.gather(*parse_tasks, return_exceptions=True)
+        async def crawl_page(url):
+            return await self.parse_page(await self.fetch_page(url))
         
-        # 过滤有效结果
-        self.results = [r for r in results if isinstance(r, dict)]
+        start_urls = [url for url in map(normalize_url, start_urls) if url]
+        start_hosts = {urlparse(url).netloc for url in start_urls}
+        for url in start_urls:
+            enqueue(url, 0)
+        
+        try:
+            while frontier or running:
+                # 轮流从各个主机取 URL，跳过已经达到并发上限的主机
+                for host in list(frontier):
+                    queue = frontier[host]
+                    while queue and active[host] < self.per_host_limit and len(running) < self.max_concurrent:
+                        url, depth = queue.popleft()
+                        active[host] += 1
+                        running[asyncio.create_task(crawl_page(url))] = (host, depth)
+                    if not queue:
+                        del frontier[host]
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    host, depth = running.pop(task)
+                    active[host] -= 1
+                    result = task.result()
+                    result['depth'] = depth
+                    if depth < max_depth:
+                        for link in result.get('links', []):
+                            enqueue(link, depth + 1, result['url'])
+                    if not keep_content:
+                        result.pop('content', None)
+                    yield result
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+    
+    async def crawl_urls(self, urls):
+        """爬取多个URL，收集全部结果后一起返回（按完成顺序）；URL 很多时直接用 crawl_stream 逐个处理"""
+        print(f"开始爬取 {len(urls)} 个URL...")
+        start_time = time.time()
+        
+        # 获取和解析流水线进行，结果保留页面正文
+        self.results = [result async for result in self.crawl_stream(urls, keep_content=True)]
         
         end_time = time.time()
         print(f"爬取完成，耗时: {end_time - start_time:.2f}秒")
@@ -124,7 +528,6 @@ class AsyncWebCrawler:
         
         return self.results
 
-
 async def demo_basic_crawler():
     """演示基本爬虫功能"""
     print("=== 基本爬虫功能 ===")
@@ -190,7 +593,7 @@ async def demo_error_handling():
             if result.get('status') == 200:
                 print(f"✓ {result['url']} - 成功")
             else:
-                print(f"✗ {result['url']} - 错误: {result.get('error', f'HTTP {result.get("status")}')}")
+                print(f"✗ {result['url']} - 错误: {result.get('error', 'HTTP %s' % result.get('status'))}")
 
 
 async def demo_concurrent_control():
@@ -249,6 +652,92 @@ async def demo_data_extraction():
         print(f"提取了 {len(extracted_data)} 个页面的数据")
 
 
+async def demo_streaming_pipeline():
+    """演示流式爬取：边爬边写，内存占用与 URL 总数无关"""
+    print("\n=== 流式爬取 ===")
+    
+    # 生成器形式的 URL 列表，不需要一次性放进内存
+    urls = (f'https://httpbin.org/links/10/{i}' for i in range(20))
+    
+    count = 0
+    async with AsyncWebCrawler(max_concurrent=5) as crawler:
+        with open('crawled_stream.jsonl', 'w', encoding='utf-8') as f:
+            async for result in crawler.crawl_stream(urls, queue_size=5):
+                # 每个结果解析完立即写出，不在内存中累积
+                f.write(json.dumps({
+                    'url': result['url'],
+                    'status': result.get('status'),
+                    'title': result.get('title', 'N/A'),
+                    'links': len(result.get('links', [])),
+                    'size': result.get('size', 0)
+                }, ensure_ascii=False) + '\n')
+                count += 1
+    
+    print(f"流式爬取完成，{count} 个页面写入 crawled_stream.jsonl")
+
+
+async def demo_recursive_crawl():
+    """演示递归爬取：沿链接广度优先爬取，URL 去重，限制每个主机的并发"""
+    print("\n=== 递归爬取 ===")
+    
+    # httpbin 的 /links/n/k 页面包含 n 个指向 /links/n/0..n-1 的链接
+    start_urls = ['https://httpbin.org/links/10/0']
+    
+    async with AsyncWebCrawler(max_concurrent=10, per_host_limit=3) as crawler:
+        async for result in crawler.crawl_recursive(start_urls, max_pages=15, max_depth=2):
+            print(f"  深度 {result['depth']} {result['url']} - 链接数: {len(result.get('links', []))}")
+        
+        print(f"共发现 {len(crawler.visited_urls)} 个不重复的URL")
+    
+    # 百万级 URL 时用布隆过滤器去重
+    bloom = BloomFilter(1000000)
+    print(f"布隆过滤器: 100万个URL占 {len(bloom.bits) / 1e6:.1f}MB，{bloom.hash_count} 个哈希函数")
+
+
+async def demo_response_cache():
+    """演示响应缓存：第二次爬取时发条件请求，没有变化的页面返回 304，不重新下载和解析"""
+    print("\n=== 响应缓存 ===")
+    
+    # 这些地址都会返回 ETag 或 Last-Modified，并支持条件请求
+    urls = [
+        'https://httpbin.org/cache',
+        'https://httpbin.org/etag/demo-etag',
+        'https://httpbin.org/html'
+    ]
+    
+    with ResponseCache('crawler_cache.sqlite3', max_bytes=10 * 1024 * 1024) as cache:
+        for round_name in ['第一次', '第二次']:
+            async with AsyncWebCrawler(max_concurrent=3, cache=cache) as crawler:
+                results = await crawler.crawl_urls(urls)
+            
+            not_modified = len([r for r in results if r.get('not_modified')])
+            print(f"{round_name}爬取: {len(results)} 个页面，{not_modified} 个未变化（304）")
+        
+        print(f"缓存大小: {cache.total_bytes()} 字节（压缩后），命中 {cache.hits} 次")
+
+
+async def demo_body_limits():
+    """演示流式读取：跳过二进制内容，限制正文大小"""
+    print("\n=== 正文类型过滤和大小限制 ===")
+    
+    urls = [
+        'https://httpbin.org/image/png',  # 图片，下载正文之前就跳过
+        'https://httpbin.org/bytes/1024',  # application/octet-stream，跳过
+        'https://httpbin.org/html',  # 约 3.7KB，超过 2KB 上限
+        'https://httpbin.org/stream/100',  # 没有 Content-Length 的分块响应，读到上限时停止
+        'https://httpbin.org/links/5/0'  # 正常下载
+    ]
+    
+    async with AsyncWebCrawler(max_concurrent=5, max_body_size=2048) as crawler:
+        results = await crawler.crawl_urls(urls)
+        
+        for result in results:
+            if 'content' in result or 'title' in result:
+                print(f"✓ {result['url']} - 大小: {result['size']} 字节")
+            else:
+                print(f"✗ {result['url']} - {result.get('error', '未知错误')}")
+
+
 async def demo_performance_comparison():
     """演示性能对比（同步 vs 异步）"""
     print("\n=== 性能对比 ===")
@@ -313,5 +802,9 @@ if __name__ == "__main__":
     asyncio.run(demo_error_handling())
     asyncio.run(demo_concurrent_control())
     asyncio.run(demo_data_extraction())
+    asyncio.run(demo_streaming_pipeline())
+    asyncio.run(demo_recursive_crawl())
+    asyncio.run(demo_response_cache())
+    asyncio.run(demo_body_limits())
     asyncio.run(demo_performance_comparison())
-    asyncio.run(demo_custom_headers()) 
\ No newline at end of file
+    asyncio.run(demo_custom_headers())
\ No newline at end of file
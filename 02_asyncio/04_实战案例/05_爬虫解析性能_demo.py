@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+爬虫解析方式性能对比：页面越大解析越贵，比较不同 parse_backend / parser 的吞吐量（页/秒）
+以及解析期间事件循环被阻塞的最长时间
+需要安装: pip install aiohttp beautifulsoup4 lxml
+
+在子进程里启动本地 aiohttp 服务器，返回指定大小的 HTML 页面，不依赖外网。
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import importlib.util
+import multiprocessing
+from pathlib import Path
+
+from aiohttp import web
+
+# 爬虫模块的文件名不是合法的模块名，按路径加载；注册到 sys.modules 后进程池才能找到 extract_page
+spec = importlib.util.spec_from_file_location('async_crawler', Path(__file__).with_name('04_异步爬虫_demo.py'))
+async_crawler = importlib.util.module_from_spec(spec)
+sys.modules['async_crawler'] = async_crawler
+spec.loader.exec_module(async_crawler)
+
+
+def make_page(size):
+    """生成大约 size 字节的 HTML：每段一个链接和一些文字"""
+    paragraph = '<p><a href="/item/{0}">item {0}</a> ' + 'lorem ipsum dolor sit amet ' * 8 + '</p>\n'
+    count = max(1, size // len(paragraph.format(0)))
+    body = ''.join(paragraph.format(i) for i in range(count))
+    return f'<html><head><title>{size} 字节的页面</title></head><body>{body}</body></html>'
+
+
+def run_server(port, sizes):
+    """测试服务器：/page/<size>/<n> 返回 size 字节的页面"""
+    pages = {size: make_page(size) for size in sizes}
+    
+    async def page(request):
+        return web.Response(text=pages[int(request.match_info['size'])], content_type='text/html')
+    
+    app = web.Application()
+    app.router.add_get('/page/{size}/{n}', page)
+    web.run_app(app, host='127.0.0.1', port=port, print=None)
+
+
+async def wait_for_server(url, timeout=10):
+    async with async_crawler.aiohttp.ClientSession() as session:
+        deadline = time.time() + timeout
+        while True:
+            try:
+                async with session.get(url) as response:
+                    await response.read()
+                    return
+            except async_crawler.aiohttp.ClientConnectionError:
+                if time.time() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+
+async def monitor_lag(interval, lags):
+    """每 interval 秒醒来一次，记录比预期晚了多久：事件循环被同步代码阻塞时延迟会变大"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run_once(base_url, size, pages, backend, parser, concurrency):
+    urls = [f'{base_url}/page/{size}/{i}' for i in range(pages)]
+    lags = []
+    monitor = asyncio.create_task(monitor_lag(0.005, lags))
+    async with async_crawler.AsyncWebCrawler(max_concurrent=concurrency, parse_backend=backend,
+                                             parser=parser) as crawler:
+        start = time.perf_counter()
+        count = 0
+        async for result in crawler.crawl_stream(urls):
+            if 'title' in result:
+                count += 1
+        elapsed = time.perf_counter() - start
+    monitor.cancel()
+    return {
+        'pages_per_sec': count / elapsed,
+        'parsed': count,
+        'max_lag_ms': max(lags, default=0) * 1000
+    }
+
+
+async def benchmark(args, sizes, combos):
+    base_url = f'http://127.0.0.1:{args.port}'
+    await wait_for_server(f'{base_url}/page/{sizes[0]}/0')
+    
+    print(f"每种组合爬取 {args.pages} 个页面，并发 {args.concurrency}")
+    print(f"{'页面大小':>10}{'解析方式':>10}{'解析器':>14}{'页/秒':>10}{'最长阻塞(ms)':>14}")
+    for size in sizes:
+        for backend, parser in combos:
+            r = await run_once(base_url, size, args.pages, backend, parser, args.concurrency)
+            assert r['parsed'] == args.pages, r
+            print(f"{size:>12}{backend:>12}{parser:>14}{r['pages_per_sec']:>12.1f}{r['max_lag_ms']:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫解析方式性能对比")
+    parser.add_argument('--sizes', default='10000,100000,500000', help="逗号分隔的页面大小（字节）")
+    parser.add_argument('--pages', type=int, default=40, help="每种组合爬取的页面数")
+    parser.add_argument('--concurrency', type=int, default=10, help="同时进行的请求数")
+    parser.add_argument('--backends', default=','.join(async_crawler.PARSE_BACKENDS), help="逗号分隔的解析方式")
+    parser.add_argument('--parsers', default='html.parser,lxml', help="逗号分隔的 BeautifulSoup 解析器")
+    parser.add_argument('--port', type=int, default=8765, help="本地测试服务器端口")
+    args = parser.parse_args()
+    
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    combos = [(backend, name) for name in args.parsers.split(',') if name
+              for backend in args.backends.split(',') if backend]
+    
+    server = multiprocessing.Process(target=run_server, args=(args.port, sizes), daemon=True)
+    server.start()
+    try:
+        asyncio.run(benchmark(args, sizes, combos))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file